@@ -1,124 +1,324 @@
 # GUI lógica (Python)
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QTreeWidget, QTreeWidgetItem, 
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTabWidget, QFileDialog, QMessageBox, QInputDialog, QMenu,
-    QDialog, QFormLayout, QLineEdit, QListWidget, QListWidgetItem, QDialogButtonBox, QColorDialog, QCheckBox, QStatusBar, QDoubleSpinBox)
-from PyQt5.QtGui import QColor, QIcon
+    QDialog, QFormLayout, QLineEdit, QListWidget, QListWidgetItem, QDialogButtonBox, QColorDialog, QCheckBox, QStatusBar, QDoubleSpinBox,
+    QComboBox, QShortcut)
+from PyQt5.QtGui import QColor, QIcon, QKeySequence
 
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QObject, QTimer, QFileSystemWatcher
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
+from matplotlib.lines import Line2D
 import os
 import sys, os
-
-# possible_paths = [
-#     r"C:\Program Files\PTI\PSSE35\PSSBIN",
-#     r"C:\Program Files (x86)\PTI\PSSE35\PSSBIN",
-#     r'C:\Program Files\PTI\PSSE35\35.6\PSSPY39'
-# ]
-
-# psse_found = False
-
-# for path in possible_paths:
-#     if os.path.exists(path):
-#         sys.path.append(path)
-#         os.environ['PATH'] = path + ";" + os.environ['PATH']
-#         psse_found = True
-#         break
-# if not psse_found:
-#     print("Error: No se encontró la instalación de PSS®E 35 en la ruta predeterminada.")
-#     input("Presione Enter para salir...")
-#     sys.exit()
-
-# sys.path.append(r"C:\Program Files\PTI\PSSE35\35.6\PSSPY39")  # Ruta típica, verifica la tuya
-sys.path.append(r".\PSSPY39")  # 
-import psse35
-import dyntools as dy
-import pandas as pd
-import subprocess
 import json
+from readers import (get_channels_from_out, get_channels_from_csv, group_requests_by_file, load_series_batch,
+    read_file_parallel, LoadTimings, DEFAULT_CSV_INIT_TIME)
+from csv_tail import CsvTail
+from lod import TraceLOD, get_lod, update_lines_lod
+from redraw import get_redraw_scheduler
+from loader import get_background_loader
+from channel_index import get_channel_index
+from channel_browser import ChannelBrowserDialog
+from derived import DERIVED_CACHE, ExpressionError, line_data_key, line_requests, parse_expression, series_for_line
+from alignment import ALIGNMENT_CACHE, AlignmentError, event_offsets, reference_differences
+from metrics import METRICS_CACHE
+from metrics_dialog import MetricsDialog
+from cases import CaseBinding, CaseCache, make_generic, unbind_template
+from trace_store import TRACE_STORE
+from line_registry import LINE_REGISTRY
+from data_store import DATA_STORE
+from sidecar_cache import SIDECAR_CACHE
+from profiling import PROFILER
+from performance_panel import PerformancePanel
+from metrics import template_plot_traces
+from render import (DEFAULT_EXPORT, REPORT_NAME, export_points, figure_size, plot_view, render_files, render_in_pool,
+    render_report, safe_file_name, template_views)
+from export_dialog import ExportDialog
+from workspace import WORKSPACE_FILTER, WorkspaceError, current_signature, open_workspace, save_workspace
+import copy
+import functools
+import multiprocessing
+import time
+import weakref
 
 
 __version__ = "1.0.1"
-
-# Simulación de lectura de canales desde archivo .out
-def get_channel_data_from_out(filepath, channel_name):
-    # Read .OUT and extract time and data for a specific column
-    try:
-        chnfobj = dy.CHNF(filepath)
-        short_title, ch_id, ch_data = chnfobj.get_data()
-        time = ch_data['time']
-        for key, name in ch_id.items():
-            if name == channel_name:
-                return time, ch_data[key]
-    except Exception as e:
-        print(f"[WARN] Falló dyntools moderno: {e}")
-        print("[INFO] Intentando con Python 2.7 para extraer datos...")
-
-        # import subprocess, json
-        result = subprocess.run(
-            ['C:/Python27/python.exe', 'lector_out_legacy.py', filepath, channel_name],
-            capture_output=True,
-            text=True
-        )
-        if result.returncode == 0:
-            parsed = json.loads(result.stdout)
-            return parsed["time"], parsed["valores"]
-        else:
-            print(f"[ERROR] Fallback falló: {result.stderr}")
-            return [], []
-
-
-def get_channels_from_out(filepath):
-    # Read .OUT and extract time and data for a specific column
-    channels = []
-    try:
-        chnfobj = dy.CHNF(filepath)
-        _, ch_id_dict, _ = chnfobj.get_data()
-        channels = list(ch_id_dict.values())
-    except Exception as e:
-        print(f"[WARN] Falló lectura con dyntools moderno: {e}")
-        print("[INFO] Intentando fallback con Python 2.7...")
-
-        # Fallback: ejecuta script de lectura en Python 2.7
-        try:
-            result = subprocess.run(
-                ['C:/Python27/python.exe', 'lector_out_legacy.py', filepath],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                parsed = json.loads(result.stdout)
-                channels = parsed.get("canales", {}).values()
-                print("[INFO] Lectura con Python 2.7 exitosa.")
+PREFETCH_NEIGHBOR_TABS = os.environ.get("VIEWER_PREFETCH_TABS", "1") != "0"  # leer las pestañas vecinas de la visible
+TAB_MEMORY_BUDGET = int(os.environ.get("VIEWER_TAB_MEMORY_MB", "1024")) * 1024 ** 2  # curvas en RAM antes de liberar pestañas ocultas
+
+def load_series_in_background(description, requests, on_file_loaded, on_finished=None, timings=None):
+    ## Used for read series in the background loader, one task per file
+    ## on_file_loaded(file, results) and on_finished(cancelled) run in the GUI thread
+    ## With timings (LoadTimings) the files are parsed in the process pool, in parallel
+    read = functools.partial(read_file_parallel, timings=timings) if timings is not None else load_series_batch
+    tasks = [(file, os.path.basename(file), functools.partial(read, file_requests))
+             for file, file_requests in group_requests_by_file(requests).items()]
+    job = get_background_loader().submit(description, tasks)
+    job.result_ready.connect(on_file_loaded)
+    if on_finished:
+        job.finished.connect(on_finished)
+    return job
+
+def pending_tab_views(plots, known, densities):
+    ## Used for the export views {n_points: [view]} of a tab not built yet, in a
+    ## loader thread: the series not in memory (known) are read here
+    requests = [request for plot_info in plots for line_info in plot_info["lines"] for request in line_requests(line_info)]
+    series = dict(known)
+    missing = [request for request in requests if request not in series and os.path.isfile(request[0])]
+    if missing:
+        series.update(load_series_batch(missing))
+    return {n_points: template_views(plots, series, n_points) for n_points in densities}
+
+def export_tab_files(base_path, options, figsize, densities, get_views):
+    ## Used for write the files of one tab, in a loader thread: the views are
+    ## prepared here and drawn in the export processes
+    ## densities: {format: points per line}, "report" for the pages of the report
+    views = get_views()
+    jobs = [(f"{base_path}.{fmt}", fmt, views[densities[fmt]]) for fmt in options.formats]
+    written = render_in_pool(render_files, jobs, options.dpi, figsize) if jobs else []
+    return written, views[densities["report"]] if "report" in densities else None
+
+class SeriesCollector:
+    # Calls each consumer once every file it needs has been read
+    def __init__(self, timings=None):
+        self.timings = timings
+        self.series = {}
+        self.loaded_files = set()
+        self._waiting = []  # (archivos, callback)
+
+    def add(self, requests, callback):
+        self._waiting.append(({request[0] for request in requests}, callback))
+
+    def preload(self, series, files):
+        ## Used for start with series already in memory (cached case)
+        self.series.update(series)
+        self.loaded_files.update(files)
+
+    def requests_done(self):
+        self._notify_ready()
+
+    def file_loaded(self, file, results):
+        self.loaded_files.add(file)
+        self.series.update(results)
+        self._notify_ready()
+
+    def finish(self, cancelled):
+        # Files that failed are never loaded, their consumers get what exists
+        if not cancelled:
+            self.loaded_files.update(f for files, _ in self._waiting for f in files)
+            self._notify_ready()
+        self._waiting = []
+
+    def _notify_ready(self):
+        ready = [w for w in self._waiting if w[0] <= self.loaded_files]
+        self._waiting = [w for w in self._waiting if not w[0] <= self.loaded_files]
+        for _, callback in ready:
+            start = time.perf_counter()
+            try:
+                callback(self.series)
+            except RuntimeError:
+                pass  # el gráfico fue eliminado mientras se cargaba
+            if self.timings is not None:
+                self.timings.add('render', time.perf_counter() - start)
+
+class TabLoadContext:
+    # Series shared by the tabs of the template last applied, which are built
+    # the first time they are shown: the ones known before reading (case
+    # cache, workspace snapshot) and the ones prefetched for neighboring tabs
+    def __init__(self, cached_series=None, signatures=None, on_loaded=None, on_tab_loaded=None):
+        self.cached = dict(cached_series or {})
+        self.signatures = signatures  # versiones de los archivos de una instantánea
+        self.on_loaded = on_loaded  # se llama una vez, al cargar la primera pestaña
+        self.on_tab_loaded = on_tab_loaded  # se llama con las series de cada pestaña cargada
+        self.prefetched = {}
+        self.prefetching = set()  # pestañas que se están leyendo
+        # Version of its file each series in memory was read from
+        self.versions = {}
+        current = {}
+        for request in self.cached:
+            if signatures is not None:
+                self.versions[request] = signatures.get(request)
             else:
-                print(f"[ERROR] Python 2.7 falló: {result.stderr}")
-        except Exception as ex:
-            print(f"[ERROR] Fallback Python 2.7 no ejecutado correctamente: {ex}")
-    
-    return list(channels)
-
-def get_channels_from_csv(filepath):
-    # Read CSV and extract time and data for a specific column
-    try:
-        df = pd.read_csv(filepath)
-        return list(df.columns[1:])  # Ignora la primera columna (tiempo)
-    except Exception as e:
-        print(f"Error leyendo CSV: {e}")
-        return []
-
-def get_time_and_data_from_csv(filepath, column, init_time = 2):
-    # Read CSV and extract time and data for a specific column
-    try:
-        df = pd.read_csv(filepath)
-        df = df[df.iloc[:, 0] >= init_time].copy()
-        df.iloc[:, 0] -= init_time
-        return df.iloc[:, 0], df[column]  # Primera columna es tiempo
-    except Exception as e:
-        print(f"Error leyendo datos de CSV: {e}")
-        return [], []
-
-from PyQt5.QtWidgets import QSplitter, QLabel
+                if request[0] not in current:
+                    current[request[0]] = current_signature(request[0])
+                self.versions[request] = current[request[0]]
+
+    def add_prefetched(self, results):
+        current = {}
+        for request in results:
+            if request[0] not in current:
+                current[request[0]] = current_signature(request[0])
+            self.versions[request] = current[request[0]]
+        self.prefetched.update(results)
+
+    def known_series(self, requests, take=False):
+        ## Used for the series of requests already in memory
+        ## take: the prefetched ones are handed over and forgotten
+        series = {}
+        for request in requests:
+            if request in self.cached:
+                series[request] = self.cached[request]
+            elif request in self.prefetched:
+                series[request] = self.prefetched.pop(request) if take else self.prefetched[request]
+        return series
+
+    def forget_files(self, files=None):
+        ## Used for drop the series of files that changed (all with None)
+        for store in (self.cached, self.prefetched):
+            for request in [request for request in store if files is None or request[0] in files]:
+                del store[request]
+                self.versions.pop(request, None)
+
+    def forget_changed(self, files=None):
+        ## Used for drop the series whose file changed on disk since they were read
+        ## (of files, all with None); a missing file keeps its series, there is
+        ## nothing newer to read
+        current = {}
+        changed = set()
+        for store in (self.cached, self.prefetched):
+            for request in list(store):
+                file = request[0]
+                if files is not None and file not in files:
+                    continue
+                if file not in current:
+                    current[file] = current_signature(file)
+                if current[file] is not None and current[file] != self.versions.get(request):
+                    del store[request]
+                    self.versions.pop(request, None)
+                    changed.add(file)
+        return changed
+
+class LiveFollower(QObject):
+    # Follows the PSCAD CSVs that are still being written: every poll parses
+    # only the rows appended since the last one and appends them to the lines
+    def __init__(self, get_files, on_file_reset, interval_ms=1000, parent=None):
+        super().__init__(parent)
+        self.get_files = get_files
+        self.on_file_reset = on_file_reset
+        self.tails = {}  # archivo -> CsvTail
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(lambda _: self._soon.start())
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.poll)
+        # Several change notifications in a row produce a single poll
+        self._soon = QTimer(self)
+        self._soon.setSingleShot(True)
+        self._soon.setInterval(100)
+        self._soon.timeout.connect(self.poll)
+
+    def start(self):
+        started = self._sync_files()
+        self.timer.start()
+        return started
+
+    def stop(self):
+        self.timer.stop()
+        self._soon.stop()
+        if self.watcher.files():
+            self.watcher.removePaths(self.watcher.files())
+        self.tails.clear()
+
+    def _sync_files(self):
+        # Follow the CSVs of the file tree; new ones start at their current end
+        files = [f for f in self.get_files() if f.endswith('.csv') and os.path.isfile(f)]
+        for file in list(self.tails):
+            if file not in files:
+                del self.tails[file]
+        started = []
+        for file in files:
+            if file not in self.tails:
+                try:
+                    tail = CsvTail(file)
+                    tail.skip_to_end()
+                except (OSError, ValueError) as e:
+                    print(f"[WARN] No se puede seguir {file}: {e}")
+                    continue
+                self.tails[file] = tail
+                started.append(file)
+            if file not in self.watcher.files():
+                self.watcher.addPath(file)  # se pierde si el archivo se reemplaza
+        return started
+
+    def poll(self):
+        started = self._sync_files()
+        if started:
+            self.on_file_reset(started)
+        for file, tail in self.tails.items():
+            if file in started:
+                continue
+            lines = LINE_REGISTRY.lines_of(file)
+            columns = {line.channel_name for _, line in lines
+                       if getattr(line, 'source_file', None) == file and getattr(line, 'channel_name', None)}
+            try:
+                if not columns:
+                    tail.skip_to_end()
+                    continue
+                new_rows = tail.read_new(columns)
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Error leyendo filas nuevas de {file}: {e}")
+                continue
+            if new_rows is None:
+                # Archivo reescrito (nueva simulación): se recarga completo
+                tail.skip_to_end()
+                self.on_file_reset([file])
+                continue
+            time, data = new_rows
+            if len(time):
+                for canvas in dict.fromkeys(plot for plot, _ in lines):
+                    canvas.append_live_data(file, time, data)
+
+class WorkspaceSync(QObject):
+    # Reloads in the background the lines of a workspace whose source files
+    # changed after their data was read. Files are checked on change
+    # notifications and on a timer (network shares do not always notify)
+    def __init__(self, on_changed, interval_ms=5000, parent=None):
+        super().__init__(parent)
+        self.on_changed = on_changed
+        self.signatures = {}  # archivo -> firma de los datos dibujados
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.fileChanged.connect(lambda _: self._soon.start())
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.check)
+        # A file being written produces many notifications, a single check follows them
+        self._soon = QTimer(self)
+        self._soon.setSingleShot(True)
+        self._soon.setInterval(500)
+        self._soon.timeout.connect(self.check)
+
+    def start(self, signatures):
+        ## signatures: {(file, channel, init_time): signature of the plotted data}
+        ## Files already synchronized keep the version they were reloaded with
+        self.stop()
+        for request, signature in signatures.items():
+            self.signatures.setdefault(request[0], signature)
+        files = [file for file in self.signatures if os.path.isfile(file)]
+        if files:
+            self.watcher.addPaths(files)
+        self.timer.start()
+        self.check()
+
+    def stop(self):
+        self.timer.stop()
+        self._soon.stop()
+        if self.watcher.files():
+            self.watcher.removePaths(self.watcher.files())
+
+    def check(self):
+        changed = []
+        for file, signature in self.signatures.items():
+            current = current_signature(file)
+            if current is not None and current != signature:
+                self.signatures[file] = current
+                changed.append(file)
+                if file not in self.watcher.files():
+                    self.watcher.addPath(file)  # se pierde si el archivo se reemplaza
+        if changed:
+            self.on_changed(changed)
+
+from PyQt5.QtWidgets import QSplitter, QLabel, QProgressBar
 class DropTreeWidget(QTreeWidget):
     def __init__(self, parent=None, on_file_deleted=None):
         super().__init__(parent)
@@ -161,6 +361,17 @@ class DropTreeWidget(QTreeWidget):
                 if self.on_file_deleted:
                     self.on_file_deleted(filepath)
                     
+class TimedFigureCanvas(FigureCanvas):
+    # Figure canvas that reports every full render to the profiler
+    def __init__(self, figure, name_callback):
+        super().__init__(figure)
+        self.name_callback = name_callback
+
+    def draw(self):
+        with PROFILER.span("canvas.draw", "dibujo", self.name_callback()):
+            super().draw()
+
+
 class PlotCanvas(QWidget):
     def __init__(self, get_file_list_callback, status_callback=None, parent_tab=None):
         super().__init__()
@@ -172,7 +383,7 @@ class PlotCanvas(QWidget):
         layout.setContentsMargins(0, 0, 0, 0)  # Elimina márgenes alrededor del layout
         self.synchronizing = False
 
-        self.canvas = FigureCanvas(Figure(figsize=(5, 3)))
+        self.canvas = TimedFigureCanvas(Figure(figsize=(5, 3)), self.profile_name)
         self.canvas.setFocusPolicy(Qt.ClickFocus)
         self.canvas.setFocus()
         self.ax = self.canvas.figure.add_subplot(111)
@@ -189,6 +400,16 @@ class PlotCanvas(QWidget):
         self.btn_add_channel.setToolTip("Agregar canal")
         self.btn_add_channel.clicked.connect(self.add_channel)
 
+        self.btn_add_derived = QPushButton("ƒ")
+        self.btn_add_derived.setFixedSize(25, 25)
+        self.btn_add_derived.setToolTip("Agregar canal derivado (expresión)")
+        self.btn_add_derived.clicked.connect(self.add_derived_channel)
+
+        self.btn_align = QPushButton("⇔")
+        self.btn_align.setFixedSize(25, 25)
+        self.btn_align.setToolTip("Alinear curvas en el tiempo y comparar")
+        self.btn_align.clicked.connect(self.align_lines)
+
         self.btn_edit_title = QPushButton("🖉")
         self.btn_edit_title.setFixedSize(25, 25)
         self.btn_edit_title.setToolTip("Editar gráfico")
@@ -211,6 +432,12 @@ class PlotCanvas(QWidget):
         self.btn_delete.clicked.connect(self.delete_self)     
         
         self.canvas.mpl_connect("motion_notify_event", self.on_mouse_move)  
+        self.canvas.mpl_connect("resize_event", lambda event: self.update_lod())
+        self.canvas.mpl_connect("draw_event", self.on_draw)
+        self.canvas.mpl_connect("axes_leave_event", lambda event: self.blit_cursor(None))
+        self._background = None
+        self._cursor_line = None
+        self._lod_stale = False  # xlim cambió desde el último update_lod
         self.ax.callbacks.connect("xlim_changed", self.on_xlim_changed)
 
         btn_container = QVBoxLayout()
@@ -218,6 +445,8 @@ class PlotCanvas(QWidget):
         btn_container.setSpacing(0)
         # btn_container.setSpacing(0)
         btn_container.addWidget(self.btn_add_channel, alignment=Qt.AlignCenter | Qt.AlignHCenter)
+        btn_container.addWidget(self.btn_add_derived, alignment=Qt.AlignCenter | Qt.AlignHCenter)
+        btn_container.addWidget(self.btn_align, alignment=Qt.AlignCenter | Qt.AlignHCenter)
         btn_container.addWidget(self.btn_edit_title, alignment=Qt.AlignCenter | Qt.AlignHCenter)
         btn_container.addWidget(self.btn_reset_zoom, alignment=Qt.AlignCenter | Qt.AlignHCenter)
         btn_container.addWidget(self.btn_clear, alignment=Qt.AlignCenter | Qt.AlignHCenter)
@@ -229,7 +458,115 @@ class PlotCanvas(QWidget):
 
         layout.addWidget(btn_widget)
     
+    def profile_name(self):
+        # Name of the plot in the performance panel: "tab / title"
+        tab = self.parent_tab
+        stack = tab.parentWidget() if tab is not None else None
+        tabs = stack.parentWidget() if stack is not None else None
+        tab_name = tabs.tabText(tabs.indexOf(tab)) if isinstance(tabs, QTabWidget) else "?"
+        return f"{tab_name} / {self.ax.get_title() or 'sin título'}"
+
+    def lod_points(self):
+        # About 2 points per horizontal pixel of the axes
+        return max(int(2 * self.ax.bbox.width), 200)
+
+    def update_lod(self):
+        # Feed matplotlib only the points needed for the visible window
+        self._lod_stale = False
+        with PROFILER.span("LOD", "dibujo", self.profile_name()):
+            update_lines_lod(self.ax, self.lod_points())
+
+    def plot_line(self, time, values, time_offset=0.0, request=None, multiplier=1.0, signature=None, **kwargs):
+        # Plot a trace through the LOD layer. The first view covers the whole
+        # trace so autoscale sees its full range; the caller cuts it to the
+        # window with a single update_lod once all its lines are added
+        # request: (file, channel, init_time) of the series, its arrays are
+        # shared through TRACE_STORE with the other plots that show it
+        # signature: version of the file of a workspace snapshot
+        if request is not None:
+            time, values = TRACE_STORE.acquire(request, time, values, signature)
+        lod = TraceLOD(time, values, multiplier, time_offset)
+        x_range = (lod.x[0] + time_offset, lod.x[-1] + time_offset) if len(lod) else (0, 1)
+        with PROFILER.span("ax.plot", "dibujo", self.profile_name(), puntos=len(lod)):
+            line = self.ax.plot(*lod.view(x_range[0], x_range[1], self.lod_points()), **kwargs)[0]
+        line._lod = lod
+        if request is not None:
+            # Also released if the line is garbage collected without remove_line
+            line._release_trace = weakref.finalize(line, TRACE_STORE.release, request)
+        return line
+
+    @staticmethod
+    def release_line(line):
+        ## Used for give back the shared data of a line that is not drawn anymore
+        release = getattr(line, '_release_trace', None)
+        if release is not None:
+            release()
+        line._lod = None
+        LINE_REGISTRY.unregister(line)
+
+    def replace_line_data(self, line, time, values, request=None):
+        ## Used for give a line new data in place, keeping its style, time offset
+        ## and multiplier; the new version is acquired before the old one is released
+        lod = get_lod(line)
+        old_release = getattr(line, '_release_trace', None)
+        if request is not None:
+            time, values = TRACE_STORE.acquire(request, time, values)
+            line._release_trace = weakref.finalize(line, TRACE_STORE.release, request)
+        else:
+            line._release_trace = None
+        if old_release is not None:
+            old_release()
+        line._lod = TraceLOD(time, values, lod.scale if lod is not None else 1.0, lod.offset if lod is not None else 0.0)
+
+    def refresh_legend(self):
+        # Legend of the labeled lines, removed when none is left
+        if any(line.get_label() and not line.get_label().startswith('_') for line in self.ax.get_lines()):
+            self.ax.legend().set_picker(True)
+        elif self.ax.get_legend() is not None:
+            self.ax.get_legend().remove()
+
+    def remove_line(self, line):
+        line.remove()
+        self.release_line(line)
+
+    def release_lines(self):
+        ## Used for give back the data of every line before the axes are cleared
+        for line in self.ax.get_lines():
+            self.release_line(line)
+
+    def request_redraw(self):
+        # Repaint in the next frame, several requests are coalesced
+        get_redraw_scheduler().request(self)
+
+    def redraw_now(self):
+        # The LOD of a pan or zoom is computed here, once per frame
+        if self._lod_stale:
+            self.update_lod()
+        self.canvas.draw()
+
+    def on_draw(self, event):
+        # Cache the rendered axes to blit the cursor line on top of it
+        self._background = self.canvas.copy_from_bbox(self.ax.bbox)
+        if self._lod_stale:
+            self.request_redraw()  # dibujado directo tras cambiar xlim: se corrige en el próximo frame
+
+    def blit_cursor(self, x):
+        # Vertical cursor line drawn over the cached background, without rendering the plot
+        if self._background is None or get_redraw_scheduler().is_pending(self):
+            return
+        if self._cursor_line is None:
+            self._cursor_line = Line2D([0, 0], [0, 1], color='0.5', linewidth=0.8, animated=True)
+            self._cursor_line.set_figure(self.canvas.figure)
+        self._cursor_line.set_transform(self.ax.get_xaxis_transform())
+        self.canvas.restore_region(self._background)
+        if x is not None:
+            self._cursor_line.set_xdata([x, x])
+            self.ax.draw_artist(self._cursor_line)
+        self.canvas.blit(self.ax.bbox)
+
     def on_xlim_changed(self, ax):
+        # Only marked: pan and zoom events come faster than frames
+        self._lod_stale = True
         if self.synchronizing:
             return
         if self.parent_tab:
@@ -240,74 +577,192 @@ class PlotCanvas(QWidget):
             x = f"{event.xdata:.5f}"
             y = f"{event.ydata:.5f}"
             self.status_callback(f"x = {x}, y = {y}")
-
-    def reload_plot_if_needed(self):
-        # Verify if the plot has lines to reload
-        if not hasattr(self, 'ax') or not self.ax.get_lines():
+        if event.button is None:
+            self.blit_cursor(event.xdata if event.inaxes is self.ax else None)
+
+    def append_live_data(self, file, time, data):
+        ## Used for append the new rows of a followed CSV to the lines that show them
+        lods = [get_lod(line) for line in self.ax.get_lines() if get_lod(line) is not None]
+        old_end = max((lod.x[-1] + lod.offset for lod in lods if len(lod)), default=None)
+        changed = False
+        for line in self.ax.get_lines():
+            lod = get_lod(line)
+            if lod is None or getattr(line, 'source_file', None) != file or getattr(line, 'channel_name', None) not in data:
+                continue
+            init_time = DEFAULT_CSV_INIT_TIME if getattr(line, 'init_time', None) is None else line.init_time
+            x = time - init_time
+            keep = time >= init_time
+            if len(lod):
+                keep &= x > lod.x[-1]  # filas ya leídas al cargar la línea
+            if keep.any():
+                lod.extend(x[keep], data[line.channel_name][keep])
+                changed = True
+        if not changed:
             return
-
-        prev_title = self.ax.get_title()
-        prev_xlabel = self.ax.get_xlabel()
-        prev_ylabel = self.ax.get_ylabel()
+        # Autoscroll when the view was showing the end of the data
+        new_end = max(lod.x[-1] + lod.offset for lod in lods if len(lod))
+        xmin, xmax = self.ax.get_xlim()
+        if old_end is not None and xmax >= old_end and new_end > old_end:
+            self.ax.set_xlim(xmin + new_end - old_end, xmax + new_end - old_end)
+        self.update_lod()
+        self.request_redraw()
+
+    def line_template_info(self, line):
+        ## Used for describe the data source of a line as in the templates
+        if getattr(line, 'expression', None):
+            info = {"file": None, "channel": None, "init_time": None,
+                    "expression": line.expression, "inputs": line.inputs}
+        else:
+            info = {"file": getattr(line, 'source_file', None), "channel": getattr(line, 'channel_name', None),
+                    "init_time": getattr(line, 'init_time', None)}
+        lod = get_lod(line)
+        if lod is not None and lod.offset:
+            info["time_offset"] = lod.offset
+        if lod is not None and lod.scale != 1.0:
+            info["multiplier"] = lod.scale
+        return info
+
+    def template_info(self):
+        ## Used for describe this plot and its lines as in the templates
         grid_on = self.ax.xaxis._major_tick_kw.get('gridOn', False) and self.ax.yaxis._major_tick_kw.get('gridOn', False)
-        # Save current lines information
-        lines_info = []
+        plot_info = {
+            "title": self.ax.get_title(),
+            "xlabel": self.ax.get_xlabel(),
+            "ylabel": self.ax.get_ylabel(),
+            "lines": [],
+            "xlim": self.ax.get_xlim(),
+            "ylim": self.ax.get_ylim(),
+            "grid": grid_on
+        }
         for line in self.ax.get_lines():
-            lines_info.append({
-                'label': line.get_label(),
-                'color': line.get_color(),
-                'visible': line.get_visible(),
-                'source': getattr(line, 'source_file', None),
-                'channel': getattr(line, 'channel_name', None)
+            line_info = self.line_template_info(line)
+            line_info.update({
+                "label": line.get_label(),
+                "color": line.get_color(),
+                "visible": line.get_visible(),
             })
-        xlim = self.ax.get_xlim()
-        self.ax.cla()
-        print(lines_info)
-        for info in lines_info:
-            file = info['source']
-            print(file)
-            channel = info['channel']
-
-            if file and channel and os.path.isfile(file):
-                try:
-                    if file.endswith('.out'):
-                        time, values = get_channel_data_from_out(file, channel)
-                    elif file.endswith('.csv'):
-                        time, values = get_time_and_data_from_csv(file, channel)
-                    else:
-                        continue
-
-                    print(f"Recargando {channel} desde {file}")
-                    line = self.ax.plot(time, values, label=info['label'], color=info['color'])[0]
-                    line.set_visible(info['visible'])
-                    line.source_file = file
-                    line.channel_name = channel
-                    self.ax.set_xlim(xlim)
-                    self.ax.callbacks.connect("xlim_changed", self.on_xlim_changed)
-                except Exception as e:
-                    print(f"Error recargando gráfico para {channel} en {file}: {e}")
-            else:
-                print(f"Archivo no encontrado o canal inválido: {file}, canal: {channel}")
-                msg = f"Archivo no encontrado o canal inválido:\n{file}\nCanal: {channel}"
-                print(msg)  # Sigue siendo útil para depuración en consola
-                QMessageBox.warning(self, "Error al recargar", msg)
-
-        self.ax.set_title(prev_title)
-        self.ax.set_xlabel(prev_xlabel)
-        self.ax.set_ylabel(prev_ylabel)
-        self.ax.grid(grid_on)
-
-        # Solo crea la leyenda si hay líneas con etiquetas válidas
-        valid_lines = [line for line in self.ax.get_lines()
-                    if line.get_label() and not line.get_label().startswith('_')]
-        if valid_lines:
-            self.ax.legend().set_picker(True)
-
+            plot_info["lines"].append(line_info)
+        return plot_info
+
+    @staticmethod
+    def trace_request(line_info):
+        ## Used for the (file, channel, init_time) shared in TRACE_STORE, None for derived lines
+        if line_info.get("expression") or not line_info.get("file"):
+            return None
+        return (line_info["file"], line_info["channel"], line_info.get("init_time"))
+
+    def reload_requests(self, lines=None):
+        ## Used for get the (file, channel, init_time) requests of the lines of this plot
+        ## lines: only the requests of these lines
+        lines = self.ax.get_lines() if lines is None else lines
+        return self.reload_requests_of([self.line_template_info(line) for line in lines])
+
+    def reload_plot_if_needed(self, series=None, lines=None):
+        # Give the lines of this plot their data read again, in place: style,
+        # time offsets, multipliers, legend and zoom are kept and the plot is
+        # drawn once. Lines whose file is gone keep the data they had
+        # series: already read data {(file, channel, init_time): (time, values)}
+        # lines: reload only these lines (the ones of the files that changed),
+        # by default the lines whose files changed on disk
+        if lines is None:
+            current = {}
+            lines = [line for line in self.ax.get_lines() if not self.line_is_current(line, current)]
+        lines = [line for line in lines if line.axes is self.ax]
+        if not lines:
+            return
+        lines_info = [(line, self.line_template_info(line)) for line in lines]
+        if series is None:
+            series = load_series_batch(self.reload_requests_of([info for _, info in lines_info]))
+        missing = []
+        for line, info in lines_info:
+            requests = line_requests(info)
+            if not requests:
+                continue
+            data = series_for_line(info, series) if all(os.path.isfile(request[0]) for request in requests) else None
+            if data is None:
+                missing.append(f"{info.get('channel') or info.get('expression')} ({info.get('file') or requests[0][0]})")
+                continue
+            self.replace_line_data(line, *data, request=self.trace_request(info))
+            line._source_versions = self.source_versions(info)
+        if missing:
+            msg = "Archivo no encontrado o canal inválido, se conservan los datos anteriores:\n" + "\n".join(missing)
+            print(f"[WARN] {msg}")
+            QMessageBox.warning(self, "Error al recargar", msg)
+        self.update_lod()
+        # The x range is kept; y follows the new data unless it was zoomed
+        self.ax.relim(visible_only=True)
+        self.ax.autoscale_view(scalex=False)
         self.canvas.draw()
 
+    @staticmethod
+    def reload_requests_of(lines_info):
+        return [request for info in lines_info for request in line_requests(info) if os.path.isfile(request[0])]
+
+    @staticmethod
+    def source_versions(line_info, signatures=None):
+        ## Used for {file: version} of the data of a line: the versions of a
+        ## workspace snapshot if given, else the versions on disk now
+        versions = {}
+        for request in line_requests(line_info):
+            if signatures is not None and request in signatures:
+                versions[request[0]] = signatures[request]
+            elif request[0] not in versions:
+                versions[request[0]] = current_signature(request[0])
+        return versions
+
+    @staticmethod
+    def line_is_current(line, current):
+        ## Used for know if a line shows the version of its files on disk, so
+        ## reloading it would read the same data again
+        ## current: {file: version} of the files already checked in this reload
+        versions = getattr(line, '_source_versions', None)
+        if versions is None:
+            return False
+        for file, version in versions.items():
+            if file not in current:
+                current[file] = current_signature(file)
+            if current[file] is None or current[file] != version:
+                return False  # cambiado, o no encontrado (se avisa al recargar)
+        return True
+
+    def set_line_source(self, line, line_info, signatures=None):
+        ## Used for store the data source of a template line in the Line2D
+        ## and index the line under its files
+        ## signatures: {request: file version} when the data comes from a workspace
+        line.source_file = line_info.get("file")
+        line.channel_name = line_info.get("channel")
+        line.init_time = line_info.get("init_time")
+        if line_info.get("expression"):
+            line.expression = line_info["expression"]
+            line.inputs = line_info.get("inputs", {})
+        line._source_versions = self.source_versions(line_info, signatures)
+        LINE_REGISTRY.register(line, self, line_requests(line_info))
+
+    def apply_template_lines(self, plot_info, series, signatures=None):
+        ## Used for plot the lines of a template plot with already read series
+        ## signatures: {request: file version} of the series of a workspace
+        for line_info in plot_info["lines"]:
+            data = series_for_line(line_info, series)
+            if data is not None:
+                time, values = data
+                request = self.trace_request(line_info)
+                signature = signatures.get(request) if signatures and request else None
+                line = self.plot_line(time, values, line_info.get("time_offset", 0.0), request,
+                                      line_info.get("multiplier", 1.0), signature,
+                                      label=line_info["label"], color=line_info["color"])
+                line.set_visible(line_info.get("visible", True))
+                self.set_line_source(line, line_info, signatures)
+        if "xlim" in plot_info:
+            self.ax.set_xlim(plot_info["xlim"])
+        if "ylim" in plot_info:
+            self.ax.set_ylim(plot_info["ylim"])
+        self.update_lod()
+        self.ax.legend().set_picker(True)
+        self.canvas.draw()
 
     def delete_self(self):
         # Remove this widget from its parent layout and delete it
+        self.release_lines()
         parent_layout = self.parentWidget().layout
         if parent_layout:
             parent_layout.removeWidget(self)
@@ -329,40 +784,50 @@ class PlotCanvas(QWidget):
             return
 
         if file.endswith(".out"):
-            channels = get_channels_from_out(file)
+            list_channels = get_channels_from_out
         elif file.endswith(".csv"):
-            channels = get_channels_from_csv(file)
+            list_channels = get_channels_from_csv
         else:
             QMessageBox.warning(self, "Archivo inválido", "El archivo debe ser .out o .csv")
             return
 
-        channel, ok = QInputDialog.getItem(self, "Seleccionar canal", "Canal:", channels, 0, False)
-        if not ok:
-            return
+        # The channel index is built in the background (once per file version),
+        # the dialog opens when it arrives
+        job = get_background_loader().submit(f"Leyendo canales de {os.path.basename(file)}",
+                                             [(file, os.path.basename(file), functools.partial(get_channel_index, file, list_channels))])
+        job.result_ready.connect(lambda _, index: self.choose_channel(file, index))
 
-        new_label, ok = QInputDialog.getText(self, "Etiqueta de canal", f"Etiqueta para '{channel}':", text=channel)
-        if not ok:
+    def choose_channel(self, file, index):
+        # Second step of add_channel: choose the channels and read them in one batch
+        dialog = ChannelBrowserDialog(os.path.basename(file), index, ask_init_time=file.endswith(".csv"), parent=self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        channels, labels, init_time = dialog.get_data()
+        if not channels:
             return
 
-        if file.endswith(".out"):
-            time, values = get_channel_data_from_out(file, channel)
-            if not time or not values:
-                QMessageBox.warning(self, "Error", "No se pudieron extraer datos del canal.")
-                return
-            line = self.ax.plot(time, values, label=new_label)[0]
-            line.source_file = file
-            line.channel_name = channel
-            self.ax.set_xlabel('(s)', horizontalalignment='right', x=1.02, labelpad=-10)
-            
-        else:
-            init_time, ok = QInputDialog.getDouble(self, "Tiempo de inicialización", "Ignorar tiempo menor a:", 0.0, 0)
-            if not ok:
+        requests = [(file, channel, init_time) for channel in channels]
+        description = f"Leyendo {channels[0]}" if len(channels) == 1 else f"Leyendo {len(channels)} canales"
+        load_series_in_background(description, requests,
+                                  lambda _, results: self.plot_new_channels(requests, labels, results))
+
+    def plot_new_channels(self, requests, labels, results):
+        # Last step of add_channel: plot the data read in the background
+        missing = []
+        for request, new_label in zip(requests, labels):
+            file, channel, init_time = request
+            if request not in results or len(results[request][0]) == 0:
+                missing.append(channel)
+                continue
+            time, values = results[request]
+            line = self.plot_line(time, values, request=request, label=new_label)
+            self.set_line_source(line, {"file": file, "channel": channel, "init_time": init_time})
+        if missing:
+            QMessageBox.warning(self, "Error", "No se pudieron extraer datos del canal:\n" + "\n".join(missing))
+            if len(missing) == len(requests):
                 return
-            time, values = get_time_and_data_from_csv(file, channel, init_time = init_time)
-            line = self.ax.plot(time, values, label=new_label)[0]
-            line.source_file = file
-            line.channel_name = channel
-            self.ax.set_xlabel('(s)', horizontalalignment='right', x=1.02, labelpad=-10)
+        self.ax.set_xlabel('(s)', horizontalalignment='right', x=1.02, labelpad=-10)
+        self.update_lod()
 
         # self.ax.set_title("Channel plot")
         self.ax.legend().set_picker(True)
@@ -374,6 +839,91 @@ class PlotCanvas(QWidget):
         self._last_mouse_pos = None
         self.canvas.draw()
 
+    def add_derived_channel(self):
+        # Plot a channel computed from the lines of this plot with an expression
+        sources = [line for line in self.ax.get_lines()
+                   if getattr(line, 'source_file', None) and getattr(line, 'channel_name', None)]
+        if not sources:
+            QMessageBox.information(self, "Sin canales", "Agregue primero los canales que usa la expresión.")
+            return
+        dialog = DerivedChannelDialog([line.get_label() for line in sources], self)
+        if not dialog.exec_():
+            return
+        expression, label = dialog.get_data()
+        _, names = parse_expression(expression)  # ya validada por el diálogo
+        inputs = {}
+        for name in names:
+            line = sources[DerivedChannelDialog.variable_index(name)]
+            inputs[name] = {"file": line.source_file, "channel": line.channel_name, "init_time": line.init_time}
+            if get_lod(line) is not None and get_lod(line).offset:
+                inputs[name]["time_offset"] = get_lod(line).offset  # misma alineación que la curva
+        line_info = {"file": None, "channel": None, "init_time": None, "expression": expression, "inputs": inputs}
+
+        def on_loaded(_, results):
+            data = series_for_line(line_info, results)
+            if data is None:
+                QMessageBox.warning(self, "Error", f"No se pudo calcular '{expression}'.")
+                return
+            line = self.plot_line(*data, label=label or expression)
+            self.set_line_source(line, line_info)
+            self.update_lod()
+            self.ax.legend().set_picker(True)
+            self.canvas.draw()
+
+        # The inputs are read in one batch (usually from memory) and evaluated here
+        requests = line_requests(line_info)
+        job = get_background_loader().submit(f"Calculando {expression}",
+                                             [("derived", expression, functools.partial(load_series_batch, requests))])
+        job.result_ready.connect(on_loaded)
+
+    def line_data_key(self, line):
+        ## Used for identify the data of a line and the version of its files
+        info = self.line_template_info(line)
+        info.pop("time_offset", None)  # la alineación recibe los desplazamientos aparte
+        info.pop("multiplier", None)  # y las métricas el multiplicador
+        return line_data_key(info) or id(get_lod(line))
+
+    def metric_traces(self):
+        ## Used for the (key, label, time, values) of the lines as drawn (offset and multiplier applied)
+        traces = []
+        for line in self.ax.get_lines():
+            lod = get_lod(line)
+            if lod is not None and len(lod):
+                traces.append(((self.line_data_key(line), lod.offset, lod.scale), line.get_label()) + lod.full_data())
+        return traces
+
+    def align_lines(self):
+        # Shift the lines in time (PSCAD init offset, event alignment) and
+        # compare them with a reference line on a common grid
+        lines = [line for line in self.ax.get_lines() if get_lod(line) is not None]
+        if len(lines) < 2:
+            QMessageBox.information(self, "Alinear", "Se necesitan al menos dos curvas.")
+            return
+        traces = [(get_lod(line).x, get_lod(line).y) for line in lines]
+        dialog = AlignDialog([line.get_label() for line in lines], [get_lod(line).offset for line in lines],
+                             functools.partial(event_offsets, traces), self)
+        if not dialog.exec_():
+            return
+        offsets, reference = dialog.get_data()
+        for line, offset in zip(lines, offsets):
+            get_lod(line).offset = offset
+        self.update_lod()
+        self.request_redraw()
+
+        # Error of every line against the reference on the grid of the slowest one
+        keys = [self.line_data_key(line) for line in lines]
+        try:
+            grid, aligned = ALIGNMENT_CACHE.align(keys, traces, offsets)
+        except AlignmentError as e:
+            QMessageBox.warning(self, "Alinear", str(e))
+            return
+        # Each line with its own multiplier (p. u. against kV, for example)
+        differences = reference_differences(aligned, [get_lod(line).scale for line in lines], reference)
+        summary = [f"{lines[index].get_label()}: máx |Δ| {max_abs:.4g}, RMS Δ {rms:.4g}"
+                   for index, (max_abs, rms) in differences.items()]
+        if self.status_callback:
+            self.status_callback(f"Comparado con {lines[reference].get_label()} ({len(grid)} puntos): " + "; ".join(summary))
+
     def edit_title(self):
         # Open a dialog to edit the title, x-label, y-label, and legend labels/colors and multipliers
         current_title = self.ax.get_title()
@@ -383,7 +933,7 @@ class PlotCanvas(QWidget):
         current_labels = [line.get_label() for line in lines]
         current_colors = [line.get_color() for line in lines]
         grid_enabled = self.ax.xaxis._major_tick_kw.get('gridOn', False) and self.ax.yaxis._major_tick_kw.get('gridOn', False)
-        current_multipliers = [getattr(line, "_multiplier", 1.0) for line in lines]
+        current_multipliers = [get_lod(line).scale if get_lod(line) is not None else 1.0 for line in lines]
         
         dialog = EditLabelsDialog(current_title, current_xlabel, current_ylabel, current_labels, current_colors, grid_enabled,self,current_multipliers)
         if dialog.exec_():
@@ -398,16 +948,16 @@ class PlotCanvas(QWidget):
             ## Keep the lines that are in new_labels
             while len(lines) > len(new_labels):
                 line_to_remove = lines.pop()
-                line_to_remove.remove()
+                self.remove_line(line_to_remove)
 
             for line, new_label, new_color, multiplier in zip(lines, new_labels, new_colors, multipliers):
                 line.set_label(new_label)
                 line.set_color(new_color)
-                if not hasattr(line, "_original_ydata"):
-                    line._original_ydata = line.get_ydata()
-                line.set_ydata(line._original_ydata * multiplier)
-                line._multiplier = multiplier  # Guarda el multiplicador actual
+                lod = get_lod(line)
+                if lod is not None:
+                    lod.scale = multiplier  # se aplica al refrescar los datos visibles, sin copiar la curva
 
+            self.update_lod()
             self.ax.legend().set_picker(True)
             self.canvas.draw()
 
@@ -415,10 +965,12 @@ class PlotCanvas(QWidget):
     def reset_zoom(self):
         # Reset the x and y limits to their original state
         self.ax.autoscale()
+        self.update_lod()
         self.canvas.draw()
 
     def clear_plot(self):
         # Clear the plot and reset the axes
+        self.release_lines()
         self.ax.cla()
         self.ax.callbacks.connect("xlim_changed", self.on_xlim_changed)
         self.ax.set_title("")
@@ -451,7 +1003,7 @@ class PlotCanvas(QWidget):
 
             ax.set_xlim(x0 - dx * scale_x, x1 - dx * scale_x)
             ax.set_ylim(y0 - dy * scale_y, y1 - dy * scale_y)
-            self.canvas.draw()
+            self.request_redraw()
             return
 
         if event.button == 3 and event.xdata and event.ydata:
@@ -476,7 +1028,7 @@ class PlotCanvas(QWidget):
                 height = (ylim[1] - ylim[0]) * factor
                 ax.set_ylim(center - height / 2, center + height / 2)
 
-            self.canvas.draw()
+            self.request_redraw()
             self._last_mouse_pos = (event.x, event.y)
         else:
             self._last_mouse_pos = None
@@ -504,7 +1056,7 @@ class PlotCanvas(QWidget):
 
         ax.set_xlim([xdata - new_width * relx, xdata + new_width * (1 - relx)])
         ax.set_ylim([ydata - new_height * rely, ydata + new_height * (1 - rely)])
-        self.canvas.draw()
+        self.request_redraw()
 
     def on_pick_legend(self, event):
         # Toggle visibility of lines based on legend item pick
@@ -541,33 +1093,45 @@ class PlotTab(QWidget):
         button_layout.addWidget(self.btn_set_xlim)
 
         self.layout.addLayout(button_layout)
-
-    def export_plots_combined(self, directory, base_name):
-        # Export all plots in this tab as a single PNG file
-        plots = [self.layout.itemAt(i).widget() for i in range(self.layout.count()) if isinstance(self.layout.itemAt(i).widget(), PlotCanvas)]
-        if not plots:
-            return
-
-        fig, axs = plt.subplots(len(plots), 1, figsize=(10, 4 * len(plots)))
-        if len(plots) == 1:
-            axs = [axs]
-        for ax, plot in zip(axs, plots):
-            lines = plot.ax.get_lines()
-            for line in lines:
-                ax.plot(line.get_xdata(), line.get_ydata(), label=line.get_label(), color=line.get_color())
-            ax.set_xlim(plot.ax.get_xlim())
-            ax.set_ylim(plot.ax.get_ylim())
-            ax.set_title(plot.ax.get_title())
-            ax.set_xlabel(plot.ax.get_xlabel(), horizontalalignment='right', x=1.02, labelpad=-10)
-            ax.set_ylabel(plot.ax.get_ylabel())
-            # ax.grid(True)
-            xgrid = any(line.get_visible() for line in plot.ax.get_xgridlines())
-            ygrid = any(line.get_visible() for line in plot.ax.get_ygridlines())
-            ax.grid(xgrid and ygrid)            
-            ax.legend()
-        fig.tight_layout()
-        fig.savefig(os.path.join(directory, f"{base_name}.png"))
-        plt.close(fig)
+        self.spec = None  # plantilla de la pestaña mientras no se construye
+        self.loading = False
+
+    @property
+    def pending(self):
+        # True while the tab is a placeholder: its plots are only template data
+        return self.spec is not None
+
+    def plot_canvases(self):
+        return [self.layout.itemAt(i).widget() for i in range(self.layout.count())
+                if isinstance(self.layout.itemAt(i).widget(), PlotCanvas)]
+
+    def template_plots(self):
+        ## Used for the plots of the tab as in the templates, built or not
+        if self.spec is not None:
+            return self.spec.get("plots", [])
+        return [canvas.template_info() for canvas in self.plot_canvases()]
+
+    def release_canvases(self):
+        ## Used for turn a hidden tab back into a placeholder, freeing its figures and data
+        plots = self.template_plots()
+        for canvas in self.plot_canvases():
+            canvas.release_lines()
+            self.layout.removeWidget(canvas)
+            canvas.setParent(None)
+            canvas.deleteLater()
+        self.spec = {"plots": plots}
+
+    def export_views(self, densities):
+        ## Used for the export views {n_points: [view]} of the plots of this tab,
+        ## with the zoom and style shown and the data of the lines in memory
+        plots = []
+        for canvas in self.plot_canvases():
+            plot_info = canvas.template_info()
+            traces = [(get_lod(line), line_info) for line, line_info in zip(canvas.ax.get_lines(), plot_info["lines"])
+                      if get_lod(line) is not None]
+            plots.append((plot_info, traces))
+        return {n_points: [plot_view(plot_info, traces, n_points) for plot_info, traces in plots]
+                for n_points in densities}
 
     def add_plot_canvas(self):
         # Create a new PlotCanvas and add it to the layout
@@ -578,6 +1142,13 @@ class PlotTab(QWidget):
         # Ask for confirmation before closing the tab
         if self.close_callback:
             self.close_callback(self)
+
+    def release_lines(self):
+        # Give back the shared data of every plot of the tab before it is deleted
+        for i in range(self.layout.count()):
+            widget = self.layout.itemAt(i).widget()
+            if isinstance(widget, PlotCanvas):
+                widget.release_lines()
             
     def reload_all_plots(self):
         # Reload all PlotCanvas widgets in this tab
@@ -594,7 +1165,7 @@ class PlotTab(QWidget):
             if isinstance(widget, PlotCanvas) and widget.ax != source_ax:
                 widget.synchronizing = True
                 widget.ax.set_xlim(new_xlim)
-                widget.canvas.draw()
+                widget.request_redraw()  # todas se repintan juntas en el próximo frame
                 widget.synchronizing = False
 
     def set_xlim_for_all_plots(self):
@@ -610,7 +1181,7 @@ class PlotTab(QWidget):
             widget = self.layout.itemAt(i).widget()
             if isinstance(widget, PlotCanvas):
                 widget.ax.set_xlim(min_val, max_val)
-                widget.canvas.draw()
+                widget.request_redraw()
             
 class DualDropWidget(QWidget):
     def __init__(self, on_file_deleted=None):
@@ -732,6 +1303,115 @@ class EditLabelsDialog(QDialog):
             # También elimina el spinbox correspondiente
             self.mult_spinboxes.pop(row)
 
+class AlignDialog(QDialog):
+    # Time offset of every line; the offsets can be detected from the events
+    def __init__(self, line_labels, offsets, detect_offsets, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Alinear curvas")
+        self.detect_offsets = detect_offsets
+
+        self.reference = QComboBox()
+        self.reference.addItems(line_labels)
+        self.offset_spins = []
+        layout = QFormLayout(self)
+        layout.addRow("Curva de referencia:", self.reference)
+        for label, offset in zip(line_labels, offsets):
+            spin = QDoubleSpinBox()
+            spin.setDecimals(6)
+            spin.setRange(-1e6, 1e6)
+            spin.setSingleStep(0.001)
+            spin.setSuffix(" s")
+            spin.setValue(offset)
+            self.offset_spins.append(spin)
+            layout.addRow(f"{label}:", spin)
+
+        self.btn_detect = QPushButton("Detectar eventos")
+        self.btn_detect.setToolTip("Desplaza cada curva para que su evento coincida con el de la referencia")
+        self.btn_detect.clicked.connect(self.detect)
+        self.btn_reset = QPushButton("Sin desplazamiento")
+        self.btn_reset.clicked.connect(lambda: [spin.setValue(0.0) for spin in self.offset_spins])
+        self.error_label = QLabel()
+        self.error_label.setStyleSheet("color: red")
+        row = QHBoxLayout()
+        row.addWidget(self.btn_detect)
+        row.addWidget(self.btn_reset)
+        layout.addRow(row)
+        layout.addRow(self.error_label)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def detect(self):
+        try:
+            offsets = self.detect_offsets(reference=self.reference.currentIndex())
+        except AlignmentError as e:
+            self.error_label.setText(str(e))
+            return
+        self.error_label.clear()
+        for spin, offset in zip(self.offset_spins, offsets):
+            spin.setValue(offset)
+
+    def get_data(self):
+        ## Returns (offsets, reference index)
+        return [spin.value() for spin in self.offset_spins], self.reference.currentIndex()
+
+class DerivedChannelDialog(QDialog):
+    # Expression over the lines of a plot, each line is a variable a, b, c...
+    def __init__(self, line_labels, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Canal derivado")
+        self.variables = [self.variable_name(i) for i in range(len(line_labels))]
+
+        self.variables_list = QListWidget()
+        for name, label in zip(self.variables, line_labels):
+            self.variables_list.addItem(f"{name} = {label}")
+        self.variables_list.itemDoubleClicked.connect(
+            lambda item: self.expression_edit.insert(item.text().split(" = ")[0]))
+        self.expression_edit = QLineEdit()
+        self.expression_edit.setPlaceholderText("a * b,  a - b,  a / 230e3,  rms(a, 0.02)")
+        self.label_edit = QLineEdit()
+        self.error_label = QLabel()
+        self.error_label.setStyleSheet("color: red")
+
+        layout = QFormLayout(self)
+        layout.addRow("Variables (doble clic para insertar):", self.variables_list)
+        layout.addRow("Expresión:", self.expression_edit)
+        layout.addRow(QLabel("Funciones: abs, sqrt, exp, log, sin, cos, degrees, minimum, maximum, where, "
+                             "rms(x, ventana_s), avg(x, ventana_s), deriv(x)"))
+        layout.addRow("Etiqueta:", self.label_edit)
+        layout.addRow(self.error_label)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.validate_and_accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    @staticmethod
+    def variable_name(index):
+        # a ... z, a1 ... z1, ...
+        return chr(ord('a') + index % 26) + (str(index // 26) if index >= 26 else "")
+
+    @staticmethod
+    def variable_index(name):
+        return (ord(name[0]) - ord('a')) + 26 * (int(name[1:]) if name[1:] else 0)
+
+    def validate_and_accept(self):
+        try:
+            _, names = parse_expression(self.expression_edit.text())
+        except ExpressionError as e:
+            self.error_label.setText(str(e))
+            return
+        unknown = [name for name in names if name not in self.variables]
+        if unknown or not names:
+            self.error_label.setText(f"Variables desconocidas: {', '.join(unknown)}" if unknown
+                                     else "La expresión debe usar al menos un canal")
+            return
+        self.accept()
+
+    def get_data(self):
+        return self.expression_edit.text().strip(), self.label_edit.text().strip()
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -748,6 +1428,10 @@ class MainWindow(QMainWindow):
         self.tabs = QTabWidget()
         self.tabs.setTabsClosable(False)
         self.tabs.tabBarDoubleClicked.connect(self.rename_tab)
+        # Tabs of a template are built when first shown
+        self.tab_context = TabLoadContext()
+        self._shown_tabs = []  # pestañas construidas, la última mostrada al final
+        self.tabs.currentChanged.connect(self.on_tab_shown)
 
         # Botón para agregar nueva pestaña
         self.btn_new_tab = QPushButton("+ Nueva pestaña")
@@ -757,7 +1441,13 @@ class MainWindow(QMainWindow):
         self.btn_reload = QPushButton("↻ Recargar archivos")
         self.btn_reload.setMinimumWidth(180)
         # self.btn_reload.setEnabled(False)
-        self.btn_reload.clicked.connect(self.reload_files)
+        self.btn_reload.clicked.connect(lambda: self.reload_files())
+
+        self.btn_follow = QPushButton("⏵ Seguir CSV")
+        self.btn_follow.setCheckable(True)
+        self.btn_follow.setToolTip("Agregar a los gráficos las filas nuevas de los CSV de PSCAD en ejecución")
+        self.btn_follow.toggled.connect(self.toggle_live_follow)
+        self.live_follower = LiveFollower(lambda: self.get_pscad_files(), self.reload_files, parent=self)
         
         self.btn_save_template = QPushButton("💾 Guardar plantilla")
         self.btn_save_template.setMaximumWidth(140)
@@ -765,7 +1455,52 @@ class MainWindow(QMainWindow):
         self.btn_load_template = QPushButton("📂 Cargar plantilla")
         self.btn_load_template.setMaximumWidth(140)
         self.btn_load_template.clicked.connect(self.load_template)
+
+        # Espacio de trabajo: plantilla más los datos dibujados
+        self.workspace = None
+        self.workspace_sync = WorkspaceSync(lambda files: self.reload_files(files), parent=self)
+        self.btn_workspace = QPushButton("🗂 Espacio de trabajo")
+        self.btn_workspace.setMaximumWidth(160)
+        self.btn_workspace.setToolTip("Guardar o abrir la plantilla junto con los datos dibujados")
+        workspace_menu = QMenu(self)
+        workspace_menu.addAction("Guardar espacio de trabajo…", self.save_workspace)
+        workspace_menu.addAction("Abrir espacio de trabajo…", self.open_workspace)
+        workspace_menu.addSeparator()
+        self.action_resync = workspace_menu.addAction("Resincronizar con los archivos de origen")
+        self.action_resync.setCheckable(True)
+        self.action_resync.setToolTip("Recargar en segundo plano las curvas cuyos archivos cambiaron")
+        self.action_resync.toggled.connect(self.toggle_workspace_sync)
+        self.btn_workspace.setMenu(workspace_menu)
        
+        # Plantilla vinculada a una carpeta de casos
+        self.case_binding = None
+        self.case_cache = CaseCache()
+        self.export_dir = ""
+        self.export_options = DEFAULT_EXPORT
+        self._prefetching = set()
+        self.btn_cases = QPushButton("📁 Casos")
+        self.btn_cases.setMaximumWidth(140)
+        self.btn_cases.setToolTip("Vincular la plantilla a una carpeta de casos y cambiar entre ellos")
+        self.btn_cases.clicked.connect(self.bind_case_directory)
+        self.case_selector = QComboBox()
+        self.case_selector.setMinimumWidth(160)
+        self.case_selector.setToolTip("Caso activo (Ctrl+RePág / Ctrl+AvPág)")
+        self.case_selector.currentTextChanged.connect(self.show_case)
+        self.case_selector.hide()
+        QShortcut(QKeySequence("Ctrl+PgDown"), self, lambda: self.step_case(1))
+        QShortcut(QKeySequence("Ctrl+PgUp"), self, lambda: self.step_case(-1))
+
+        self.btn_metrics = QPushButton("📏 Métricas")
+        self.btn_metrics.setMaximumWidth(140)
+        self.btn_metrics.setToolTip("Tiempo de subida, establecimiento, sobrepico y error contra la referencia")
+        self.btn_metrics.clicked.connect(self.show_metrics)
+
+        self.btn_performance = QPushButton("⏱ Rendimiento")
+        self.btn_performance.setMaximumWidth(140)
+        self.btn_performance.setToolTip("Tiempos de lectura y dibujo por archivo y gráfico, aciertos de las cachés")
+        self.btn_performance.clicked.connect(self.show_performance)
+        self.performance_panel = None
+
         self.btn_export = QPushButton("🖼 Exportar gráficos")
         self.btn_export.setMaximumWidth(140)
         self.btn_export.clicked.connect(self.export_all_plots)
@@ -777,17 +1512,23 @@ class MainWindow(QMainWindow):
         btn_layout.setSpacing(10)
         btn_layout.addWidget(self.btn_new_tab)
         btn_layout.addWidget(self.btn_reload)
+        btn_layout.addWidget(self.btn_follow)
         
         top_layout = QVBoxLayout()
         # top_layout.addWidget(self.btn_new_tab)
         top_layout.addLayout(btn_layout)
         top_layout.addWidget(self.tabs)
         btn_layout.addWidget(self.btn_export)
+        btn_layout.addWidget(self.btn_metrics)
+        btn_layout.addWidget(self.btn_performance)
 
         tabs_widget = QWidget()
         tabs_widget.setLayout(top_layout)
         btn_layout.addWidget(self.btn_save_template)
         btn_layout.addWidget(self.btn_load_template)
+        btn_layout.addWidget(self.btn_workspace)
+        btn_layout.addWidget(self.btn_cases)
+        btn_layout.addWidget(self.case_selector)
         
         # Diseño principal
         central = QWidget()
@@ -800,9 +1541,53 @@ class MainWindow(QMainWindow):
         self.status_bar.setLayoutDirection(Qt.RightToLeft)
         self.setStatusBar(self.status_bar)
 
+        # Progreso de las cargas en segundo plano
+        self.load_progress = QProgressBar()
+        self.load_progress.setMaximumWidth(160)
+        self.btn_cancel_load = QPushButton("Cancelar carga")
+        self.btn_cancel_load.clicked.connect(get_background_loader().cancel_all)
+        self.status_bar.addPermanentWidget(self.btn_cancel_load)
+        self.status_bar.addPermanentWidget(self.load_progress)
+        self.load_progress.hide()
+        self.btn_cancel_load.hide()
+        loader = get_background_loader()
+        loader.job_started.connect(self.on_load_progress)
+        loader.job_progress.connect(self.on_load_progress)
+        loader.job_finished.connect(self.on_load_progress)
+
         # Agrega la primera pestaña
         self.add_new_tab()
 
+    def on_load_progress(self, job, *args):
+        ## Used for show the progress of the background loads in the status bar
+        jobs = get_background_loader().jobs
+        total = sum(j.total for j in jobs)
+        done = sum(j.done_count for j in jobs)
+        self.load_progress.setVisible(bool(jobs))
+        self.btn_cancel_load.setVisible(bool(jobs))
+        if jobs:
+            self.load_progress.setMaximum(max(total, 1))
+            self.load_progress.setValue(done)
+            if len(args) == 3:
+                self.status_bar.showMessage(f"{job.description}: {args[0]}/{args[1]} {args[2]}")
+
+    def get_pscad_files(self):
+        ## Used for get the CSV files loaded in the PSCAD tree
+        tree = self.dual_tree.tree_pscad
+        return [tree.topLevelItem(i).toolTip(0) for i in range(tree.topLevelItemCount())]
+
+    def toggle_live_follow(self, enabled):
+        ## Used for start/stop following the PSCAD CSVs that are being written
+        if enabled:
+            files = self.live_follower.start()
+            # Lines loaded before following may lack the rows written since then
+            if files:
+                self.reload_files(files)
+            self.statusBar().showMessage(f"Siguiendo {len(files)} archivos CSV.", 3000)
+        else:
+            self.live_follower.stop()
+            self.statusBar().showMessage("Seguimiento de CSV detenido.", 3000)
+
     def get_loaded_files(self):
         ## Used for get all files loaded in the dual tree
         return self.dual_tree.get_all_files()
@@ -820,6 +1605,7 @@ class MainWindow(QMainWindow):
             index = self.tabs.indexOf(tab_widget)
             if index != -1:
                 self.tabs.removeTab(index)
+                tab_widget.release_lines()
 
     def rename_tab(self, index):
         ## Used for rename the tab
@@ -829,65 +1615,189 @@ class MainWindow(QMainWindow):
             if ok and new_name:
                 self.tabs.setTabText(index, new_name)
 
-    def reload_files(self):
-        ## Used for reload all plots in the tabs
+    def all_plot_canvases(self):
+        ## Used for get the PlotCanvas widgets of every tab
+        canvases = []
         for i in range(self.tabs.count()):
             tab = self.tabs.widget(i)
-            if hasattr(tab, 'reload_all_plots'):
-                tab.reload_all_plots()
+            if hasattr(tab, 'layout'):
+                for j in range(tab.layout.count()):
+                    widget = tab.layout.itemAt(j).widget()
+                    if isinstance(widget, PlotCanvas):
+                        canvases.append(widget)
+        return canvases
+
+    def reload_files(self, files=None):
+        ## Used for reload all plots in the tabs, files are read in the background
+        ## and every plot is refreshed as soon as its files are read
+        ## files: reload only the plots that show any of these files
+        ## Files unchanged on disk since their lines were read are not read again
+        self.tab_context.forget_changed(files)  # las pestañas aún no construidas leerán los archivos
+        timings = LoadTimings()
+        collector = SeriesCollector(timings)
+        requests = []
+        # Only the lines of the files (found in LINE_REGISTRY) are reloaded
+        if files is None:
+            targets = {canvas: canvas.ax.get_lines() for canvas in self.all_plot_canvases()}
+        else:
+            targets = LINE_REGISTRY.plots_of(files)
+        current = {}  # versión de cada archivo, consultada una vez
+        stale = 0
+        for canvas, lines in targets.items():
+            lines = [line for line in lines if not canvas.line_is_current(line, current)]
+            if not lines:
+                continue
+            stale += len(lines)
+            canvas_requests = canvas.reload_requests(lines)
+            collector.add(canvas_requests, functools.partial(canvas.reload_plot_if_needed, lines=lines))
+            requests.extend(canvas_requests)
+        if not stale:
+            self.statusBar().showMessage("Los archivos no cambiaron, no hay nada que recargar", 10000)
+            return
+        unchanged = sum(1 for version in current.values() if version is not None) - len({r[0] for r in requests})
+        def on_finished(cancelled):
+            collector.finish(cancelled)
+            if not cancelled:
+                skipped = f" ({unchanged} sin cambios)" if unchanged > 0 else ""
+                self.statusBar().showMessage(f"Archivos recargados{skipped}: {timings.summary()}", 10000)
+
+        load_series_in_background("Recargando archivos", requests, collector.file_loaded, on_finished, timings)
+        collector.requests_done()
+    def metric_plots(self, all_tabs=False):
+        ## Used for the [(tab name, plot title, traces)] measured by the metrics dialog
+        indexes = range(self.tabs.count()) if all_tabs else [self.tabs.currentIndex()]
+        plots = []
+        for i in indexes:
+            tab = self.tabs.widget(i)
+            if not hasattr(tab, 'layout'):
+                continue
+            if tab.pending:
+                series = self.read_pending_series(tab.spec["plots"])
+                for j, plot_info in enumerate(tab.spec["plots"]):
+                    traces = template_plot_traces(plot_info, series)
+                    if traces:
+                        plots.append((self.tabs.tabText(i), plot_info.get("title") or str(j + 1), traces))
+                continue
+            for j in range(tab.layout.count()):
+                widget = tab.layout.itemAt(j).widget()
+                if isinstance(widget, PlotCanvas):
+                    traces = widget.metric_traces()
+                    if traces:
+                        plots.append((self.tabs.tabText(i), widget.ax.get_title() or str(j + 1), traces))
+        return plots
+
+    def show_metrics(self):
+        ## Used for open the compliance metrics of the plotted lines
+        MetricsDialog(self.metric_plots, self).exec_()
+
+    def show_performance(self):
+        ## Used for open the performance panel (non modal, refreshed while visible)
+        if self.performance_panel is None:
+            caches = [("Archivos en memoria", DATA_STORE), ("Caché sidecar", SIDECAR_CACHE),
+                      ("Curvas compartidas", TRACE_STORE), ("Canales derivados", DERIVED_CACHE),
+                      ("Alineación", ALIGNMENT_CACHE), ("Casos", self.case_cache), ("Métricas", METRICS_CACHE)]
+            self.performance_panel = PerformancePanel(caches, self)
+        self.performance_panel.show()
+        self.performance_panel.raise_()
+
     def export_all_plots(self):
-        ## Used for export all plots in the tabs as PNG files
-        save_dir = QFileDialog.getExistingDirectory(self, "Seleccionar carpeta para exportar", "")
-        if save_dir:
-            for i in range(self.tabs.count()):
-                tab = self.tabs.widget(i)
-                tab_name = self.tabs.tabText(i)
-                if hasattr(tab, 'export_plots_combined'):
-                    tab.export_plots_combined(save_dir, tab_name) 
-                    self.statusBar().showMessage(f"Exportación completada: {tab_name}.png", 5000) 
+        ## Used for export all plots in the tabs with the options of the export dialog
+        dialog = ExportDialog(self.export_dir, self.export_options, self)
+        if dialog.exec_() != QDialog.Accepted:
+            return
+        self.export_dir, self.export_options = dialog.get_data()
+        self.export_tabs(self.export_dir, self.export_options)
+
+    def export_tabs(self, save_dir, options=DEFAULT_EXPORT):
+        ## Used for export the tabs in the background: the lines of the built tabs
+        ## are decimated here, the tabs not built yet are read in the loader
+        ## threads and every tab is drawn in parallel in the export processes
+        start = time.perf_counter()
+        tasks = []
+        for i in range(self.tabs.count()):
+            tab = self.tabs.widget(i)
+            if not isinstance(tab, PlotTab):
+                continue
+            name = self.tabs.tabText(i)
+            n_plots = len(tab.spec["plots"]) if tab.pending else len(tab.plot_canvases())
+            if not n_plots:
+                continue
+            figsize = figure_size(n_plots, options.page_size, options.landscape)
+            densities = {fmt: export_points(fmt, figsize[0], options.dpi) for fmt in options.formats}
+            if options.report:
+                densities["report"] = export_points("pdf", figsize[0], options.dpi)
+            if tab.pending:
+                plots = tab.spec["plots"]
+                known = self.tab_context.known_series(
+                    [request for plot_info in plots for line_info in plot_info["lines"]
+                     for request in line_requests(line_info)])
+                get_views = functools.partial(pending_tab_views, plots, known, set(densities.values()))
+            else:
+                get_views = functools.partial(dict, tab.export_views(set(densities.values())))
+            tasks.append((i, name, functools.partial(export_tab_files, os.path.join(save_dir, safe_file_name(name)),
+                                                     options, figsize, densities, get_views)))
+
+        written = []
+        pages = {}
+
+        def on_tab_exported(i, result):
+            files, views = result
+            written.extend(files)
+            if views:
+                pages[i] = (self.tabs.tabText(i), views)
+
+        def on_finished(cancelled):
+            if cancelled:
+                self.statusBar().showMessage("Exportación cancelada.", 5000)
+            elif options.report and pages:
+                report_path = os.path.join(save_dir, REPORT_NAME)
+                job = get_background_loader().submit("Exportando informe", [(
+                    report_path, REPORT_NAME, functools.partial(
+                        render_in_pool, render_report, [pages[i] for i in sorted(pages)], report_path, options.dpi,
+                        options.page_size, options.landscape))])
+                job.result_ready.connect(lambda path, count: written.append(path))
+                job.finished.connect(on_report_finished)
+            else:
+                on_report_finished(False)
+
+        def on_report_finished(cancelled):
+            if cancelled:
+                self.statusBar().showMessage("Exportación del informe cancelada.", 5000)
+                return
+            print(f"[INFO] {len(written)} archivos exportados en {save_dir}")
+            self.statusBar().showMessage(f"Exportación completada: {len(written)} archivos en "
+                                         f"{time.perf_counter() - start:.1f} s ({save_dir})", 10000)
+
+        job = get_background_loader().submit("Exportando gráficos", tasks)
+        job.result_ready.connect(on_tab_exported)
+        job.finished.connect(on_finished)
+        return job
+
+    def build_template_data(self):
+        ## Used for describe the tabs, plots and files of the window as a template
+        template = []
+        for i in range(self.tabs.count()):
+            template.append({"name": self.tabs.tabText(i), "plots": copy.deepcopy(self.tabs.widget(i).template_plots())})
+
+        return {
+            "tabs": template,
+            "files": {
+                "psse": [self.dual_tree.tree_psse.topLevelItem(i).toolTip(0) for i in range(self.dual_tree.tree_psse.topLevelItemCount())],
+                "pscad": [self.dual_tree.tree_pscad.topLevelItem(i).toolTip(0) for i in range(self.dual_tree.tree_pscad.topLevelItemCount())]
+            }
+        }
 
     def save_template(self):
         ## Used for save templates in JSON format
         path, _ = QFileDialog.getSaveFileName(self, "Guardar plantilla", "", "Plantilla JSON (*.json)")
         if not path:
             return
-        template = []
-        for i in range(self.tabs.count()):
-            tab = self.tabs.widget(i)
-            tab_data = {"name": self.tabs.tabText(i), "plots": []}
-            for j in range(tab.layout.count()):
-                widget = tab.layout.itemAt(j).widget()
-                if isinstance(widget, PlotCanvas):
-                    grid_on = widget.ax.xaxis._major_tick_kw.get('gridOn', False) and widget.ax.yaxis._major_tick_kw.get('gridOn', False)
-                    plot_info = {
-                        "title": widget.ax.get_title(),
-                        "xlabel": widget.ax.get_xlabel(),
-                        "ylabel": widget.ax.get_ylabel(),
-                        "lines": [],
-                        "xlim": widget.ax.get_xlim(),
-                        "ylim": widget.ax.get_ylim(),
-                        "grid": widget.ax.xaxis._major_tick_kw.get('gridOn', False) and widget.ax.yaxis._major_tick_kw.get('gridOn', False)
-                    }
-                    for line in widget.ax.get_lines():
-                        plot_info["lines"].append({
-                            "file": getattr(line, "source_file", None),
-                            "channel": getattr(line, "channel_name", None),
-                            "label": line.get_label(),
-                            "color": line.get_color(),
-                            "visible": line.get_visible(),
-                        })
-                    tab_data["plots"].append(plot_info)
-            template.append(tab_data)
-
-
-            template_data = {
-                "tabs": template,
-                "files": {
-                    "psse": [self.dual_tree.tree_psse.topLevelItem(i).toolTip(0) for i in range(self.dual_tree.tree_psse.topLevelItemCount())],
-                    "pscad": [self.dual_tree.tree_pscad.topLevelItem(i).toolTip(0) for i in range(self.dual_tree.tree_pscad.topLevelItemCount())]
-                }
-            }
-                
+        template_data = self.build_template_data()
+        binding = self.case_binding
+        if binding is not None and binding.current is not None:
+            # Los archivos del caso activo se guardan con sus alias
+            template_data = unbind_template(template_data, binding.aliases, binding.current, binding.case_dir)
+
         with open(path, "w", encoding="utf-8") as f:
             json.dump(template_data, f, indent=2)
         self.statusBar().showMessage("Plantilla guardada.", 3000)
@@ -901,6 +1811,24 @@ class MainWindow(QMainWindow):
         with open(path, "r", encoding="utf-8") as f:
             template_data = json.load(f)
 
+        if template_data.get("aliases"):
+            # Plantilla con alias: se vincula a una carpeta de casos
+            case_dir = QFileDialog.getExistingDirectory(self, "Seleccionar carpeta de casos", os.path.dirname(path))
+            if case_dir:
+                self.set_case_binding(CaseBinding(template_data, case_dir))
+            return
+        self.set_case_binding(None)
+        self.apply_template(template_data)
+
+    def apply_template(self, template_data, cached_series=None, on_loaded=None, signatures=None, on_tab_loaded=None):
+        ## Used for rebuild the trees and tabs from template data with concrete files
+        ## cached_series: series already in memory, only the rest is read
+        ## on_loaded(series) runs once the files of the tab shown were read (not if cancelled)
+        ## on_tab_loaded(series) runs with the series of every tab built and read
+        ## signatures: file versions of cached_series when they are a workspace snapshot
+        if signatures is None:
+            self.close_workspace()  # una plantilla o un caso reemplazan al espacio de trabajo
+
         # Limpiar los árboles
         self.dual_tree.tree_psse.clear()
         self.dual_tree.tree_pscad.clear()
@@ -919,65 +1847,338 @@ class MainWindow(QMainWindow):
                     self.dual_tree.tree_pscad.addTopLevelItem(item)
         except AttributeError as e:
             QMessageBox.warning(self, "Error al cargar archivos", f"No se pudieron cargar algunos archivos:\n{e}")
-        # Restaurar las pestañas y gráficos como antes
+        # Las pestañas se restauran como marcadores con su plantilla; cada una
+        # se construye y lee sus datos la primera vez que se muestra
+        current_tab = self.tabs.currentIndex()
+        for i in range(self.tabs.count()):
+            self.tabs.widget(i).release_lines()
+        self.tabs.blockSignals(True)
         self.tabs.clear()
+        self.tab_context = TabLoadContext(cached_series, signatures, on_loaded, on_tab_loaded)
+        self._shown_tabs = []
         for tab_data in template_data["tabs"]:
             tab = PlotTab(close_callback=self.remove_tab, get_file_list_callback=self.get_loaded_files, status_callback=self.status_bar.showMessage)
+            tab.spec = copy.deepcopy(tab_data)
             self.tabs.addTab(tab, tab_data["name"])
-            for plot_info in tab_data["plots"]:
-                plot_canvas = PlotCanvas(self.get_loaded_files, self.status_bar.showMessage, parent_tab=tab)
-                tab.layout.addWidget(plot_canvas)
-                plot_canvas.ax.set_title(plot_info.get("title", ""))
-                plot_canvas.ax.set_xlabel(plot_info.get("xlabel", ""), horizontalalignment='right', x=1.02, labelpad=-10)
-                plot_canvas.ax.set_ylabel(plot_info.get("ylabel", ""))
-                plot_canvas.ax.grid(plot_info.get("grid", False))
-                
-                ## Conect events
-                plot_canvas.canvas.mpl_connect("pick_event", plot_canvas.on_pick_legend)
-                plot_canvas.canvas.mpl_connect("scroll_event", plot_canvas.on_scroll)
-                plot_canvas.canvas.mpl_connect("motion_notify_event", plot_canvas.on_mouse_drag)
-                plot_canvas.canvas.mpl_connect("button_press_event", plot_canvas.on_mouse_press)
-                plot_canvas.canvas.mpl_connect("button_release_event", plot_canvas.on_mouse_release)
-                plot_canvas._last_mouse_pos = None                
-                
-                for line_info in plot_info["lines"]:
-                    file = line_info["file"]
-                    channel = line_info["channel"]
-                    if file and channel and os.path.isfile(file):
-                        if file.endswith(".out"):
-                            time, values = get_channel_data_from_out(file, channel)
-                        elif file.endswith(".csv"):
-                            time, values = get_time_and_data_from_csv(file, channel)
-                        else:
-                            continue
-                        line = plot_canvas.ax.plot(time, values, label=line_info["label"], color=line_info["color"])[0]
-                        line.set_visible(line_info.get("visible", True))
-                        line.source_file = file
-                        line.channel_name = channel
-                if "xlim" in plot_info:
-                    plot_canvas.ax.set_xlim(plot_info["xlim"])
-                if "ylim" in plot_info:
-                    plot_canvas.ax.set_ylim(plot_info["ylim"])
-                plot_canvas.ax.legend().set_picker(True)
-                plot_canvas.canvas.draw()
-        self.statusBar().showMessage("Plantilla cargada.", 3000)
+        if 0 <= current_tab < self.tabs.count():
+            self.tabs.setCurrentIndex(current_tab)  # al cambiar de caso se sigue en la misma pestaña
+        self.tabs.blockSignals(False)
+        self.on_tab_shown(self.tabs.currentIndex())
+
+    def on_tab_shown(self, index):
+        ## Used for build a placeholder tab when it is shown and free hidden tabs if memory is tight
+        tab = self.tabs.widget(index)
+        if not isinstance(tab, PlotTab):
+            return
+        if tab in self._shown_tabs:
+            self._shown_tabs.remove(tab)
+        self._shown_tabs.append(tab)
+        if tab.pending:
+            self.materialize_tab(tab)
+        self.release_hidden_tabs()
+
+    def materialize_tab(self, tab):
+        ## Used for build the plots of a placeholder tab, its data is read in the
+        ## background and every plot is completed as soon as its files arrive
+        tab_data, tab.spec = tab.spec, None
+        context = self.tab_context
+        name = self.tabs.tabText(self.tabs.indexOf(tab))
+        timings = LoadTimings()
+        collector = SeriesCollector(timings)
+        requests = []
+        for plot_info in tab_data.get("plots", []):
+            plot_canvas = PlotCanvas(self.get_loaded_files, self.status_bar.showMessage, parent_tab=tab)
+            tab.layout.addWidget(plot_canvas)
+            plot_canvas.ax.set_title(plot_info.get("title", ""))
+            plot_canvas.ax.set_xlabel(plot_info.get("xlabel", ""), horizontalalignment='right', x=1.02, labelpad=-10)
+            plot_canvas.ax.set_ylabel(plot_info.get("ylabel", ""))
+            plot_canvas.ax.grid(plot_info.get("grid", False))
+
+            ## Conect events
+            plot_canvas.canvas.mpl_connect("pick_event", plot_canvas.on_pick_legend)
+            plot_canvas.canvas.mpl_connect("scroll_event", plot_canvas.on_scroll)
+            plot_canvas.canvas.mpl_connect("motion_notify_event", plot_canvas.on_mouse_drag)
+            plot_canvas.canvas.mpl_connect("button_press_event", plot_canvas.on_mouse_press)
+            plot_canvas.canvas.mpl_connect("button_release_event", plot_canvas.on_mouse_release)
+            plot_canvas._last_mouse_pos = None
+
+            # Files that are gone still count: a workspace snapshot may have their series
+            plot_requests = [request for line_info in plot_info["lines"] for request in line_requests(line_info)]
+            requests.extend(plot_requests)
+            collector.add(plot_requests, functools.partial(plot_canvas.apply_template_lines, plot_info,
+                                                           signatures=context.signatures))
+
+        known = context.known_series(requests, take=True)
+        if known:
+            missing_files = {request[0] for request in requests if request not in known}
+            collector.preload(known, {request[0] for request in requests} - missing_files)
+            requests = [request for request in requests if request[0] in missing_files]
+        requests = [request for request in requests if os.path.isfile(request[0])]
+
+        def on_finished(cancelled):
+            tab.loading = False
+            collector.finish(cancelled)
+            if cancelled:
+                self.statusBar().showMessage(f"Carga de {name} cancelada.", 3000)
+                return
+            self.statusBar().showMessage(f"{name} cargada: {timings.summary()}", 10000)
+            if context.on_tab_loaded is not None:
+                context.on_tab_loaded(collector.series)
+            if context.on_loaded is not None:
+                on_loaded, context.on_loaded = context.on_loaded, None
+                on_loaded(collector.series)
+            if context is self.tab_context:
+                self.prefetch_neighbor_tabs(tab)
+
+        tab.loading = True
+        load_series_in_background(f"Cargando {name}", requests, collector.file_loaded, on_finished, timings)
+        collector.requests_done()
+
+    def prefetch_neighbor_tabs(self, tab):
+        ## Used for read in the background the data of the placeholder tabs next to tab
+        if not PREFETCH_NEIGHBOR_TABS:
+            return
+        context = self.tab_context
+        index = self.tabs.indexOf(tab)
+        for neighbor in (self.tabs.widget(index + 1), self.tabs.widget(index - 1)):
+            if not isinstance(neighbor, PlotTab) or not neighbor.pending or neighbor in context.prefetching:
+                continue
+            requests = [request for plot_info in neighbor.spec.get("plots", [])
+                        for request in PlotCanvas.reload_requests_of(plot_info["lines"])
+                        if request not in context.cached and request not in context.prefetched]
+            if not requests:
+                continue
+            context.prefetching.add(neighbor)
+            load_series_in_background(f"Precargando {self.tabs.tabText(self.tabs.indexOf(neighbor))}", requests,
+                                      lambda file, results: context.add_prefetched(results),
+                                      lambda cancelled, neighbor=neighbor: context.prefetching.discard(neighbor))
+
+    def release_hidden_tabs(self):
+        ## Used for turn the least recently shown tabs back into placeholders
+        ## while the plotted data held in memory exceeds TAB_MEMORY_BUDGET
+        current = self.tabs.currentWidget()
+        self._shown_tabs = [tab for tab in self._shown_tabs if self.tabs.indexOf(tab) != -1]
+        for tab in list(self._shown_tabs):
+            if TRACE_STORE.memory_used() <= TAB_MEMORY_BUDGET:
+                break
+            if tab is not current and not tab.pending and not tab.loading:
+                tab.release_canvases()
+                self._shown_tabs.remove(tab)
+
+    def read_pending_series(self, plots):
+        ## Used for the series of the plots of a placeholder tab (metrics, export):
+        ## the ones in memory plus a direct read of the rest
+        requests = [request for plot_info in plots for line_info in plot_info["lines"]
+                    for request in line_requests(line_info)]
+        series = self.tab_context.known_series(requests)
+        missing = [request for request in requests if request not in series and os.path.isfile(request[0])]
+        if missing:
+            series.update(load_series_batch(missing))
+        return series
+
+    def plotted_series(self):
+        ## Used for the series drawn in every plot and the version of the file of each
+        ## Returns ({request: (time, values)}, {request: signature}); plain lines
+        ## give their own arrays (with the rows appended while following a CSV),
+        ## the inputs of derived lines and the tabs not built yet take the series
+        ## in memory (workspace snapshot, case cache) or are read
+        series = {}
+        signatures = {}
+        inputs = []
+        for i in range(self.tabs.count()):
+            tab = self.tabs.widget(i)
+            if tab.pending:
+                inputs.extend(request for plot_info in tab.spec.get("plots", [])
+                              for line_info in plot_info["lines"] for request in line_requests(line_info))
+                continue
+            for canvas in tab.plot_canvases():
+                for line in canvas.ax.get_lines():
+                    info = canvas.line_template_info(line)
+                    request = canvas.trace_request(info)
+                    lod = get_lod(line)
+                    if request is not None and lod is not None:
+                        series[request] = (lod.x, lod.y)
+                        signatures[request] = TRACE_STORE.signature(request)
+                    else:
+                        inputs.extend(line_requests(info))
+        context = self.tab_context
+        inputs = [request for request in dict.fromkeys(inputs) if request not in series]
+        missing = []
+        for request, data in context.known_series(inputs).items():
+            series[request] = data
+            if context.signatures and request in context.cached:
+                signatures[request] = context.signatures.get(request)
+            else:
+                signatures[request] = current_signature(request[0])
+        for request in inputs:
+            if request not in series and os.path.isfile(request[0]):
+                missing.append(request)
+        if missing:
+            series.update(load_series_batch(missing))
+            for request in missing:
+                signatures[request] = current_signature(request[0])
+        return series, signatures
+
+    def save_workspace(self):
+        ## Used for save the template and the plotted data in a single file
+        path, selected = QFileDialog.getSaveFileName(self, "Guardar espacio de trabajo", "",
+                                                     f"{WORKSPACE_FILTER};;Espacio de trabajo comprimido (*.vws)")
+        if not path:
+            return
+        if not path.lower().endswith(".vws"):
+            path += ".vws"
+        series, signatures = self.plotted_series()
+        try:
+            count = save_workspace(path, self.build_template_data(), series, signatures,
+                                   compress=selected.startswith("Espacio de trabajo comprimido"))
+        except OSError as e:
+            QMessageBox.warning(self, "Espacio de trabajo", f"No se pudo guardar {path}:\n{e}")
+            return
+        self.statusBar().showMessage(f"Espacio de trabajo guardado: {count} series, "
+                                     f"{os.path.getsize(path) / 1024 ** 2:.1f} MB.", 5000)
+
+    def open_workspace(self):
+        ## Used for restore a workspace from its snapshot, without reading the source files
+        path, _ = QFileDialog.getOpenFileName(self, "Abrir espacio de trabajo", "", WORKSPACE_FILTER)
+        if not path:
+            return
+        try:
+            workspace = open_workspace(path)
+        except (OSError, WorkspaceError) as e:
+            QMessageBox.warning(self, "Espacio de trabajo", str(e))
+            return
+        self.close_workspace()
+        self.set_case_binding(None)
+
+        def on_loaded(series):
+            self.statusBar().showMessage(f"Espacio de trabajo abierto: {len(workspace.series)} series "
+                                         f"desde {os.path.basename(path)}.", 10000)
+
+        self.apply_template(workspace.template, workspace.series, on_loaded, workspace.signatures)
+        self.workspace = workspace
+        self.setWindowTitle(f"PSSE/PSCAD ViEEwer - {os.path.basename(path)}")
+        if self.action_resync.isChecked():
+            self.workspace_sync.start(workspace.signatures)
+
+    def close_workspace(self):
+        if self.workspace is not None:
+            self.workspace = None
+            self.workspace_sync.stop()
+            self.workspace_sync.signatures.clear()
+
+    def toggle_workspace_sync(self, enabled):
+        ## Used for start/stop reloading the workspace lines whose files change
+        if enabled and self.workspace is not None:
+            self.workspace_sync.start(self.workspace.signatures)
+        else:
+            self.workspace_sync.stop()
+
+    def bind_case_directory(self):
+        ## Used for bind the current template to a directory of cases
+        if self.case_binding is not None:
+            template_data = self.case_binding.template
+            start_dir = self.case_binding.case_dir
+        else:
+            generic = make_generic(self.build_template_data())
+            if generic is None:
+                QMessageBox.warning(self, "Casos", "La plantilla no tiene un archivo .out o .csv que se pueda reemplazar por caso.")
+                return
+            template_data, _, start_dir = generic
+        case_dir = QFileDialog.getExistingDirectory(self, "Seleccionar carpeta de casos", start_dir)
+        if case_dir:
+            self.set_case_binding(CaseBinding(template_data, case_dir))
+
+    def set_case_binding(self, binding):
+        ## Used for bind a generic template to a directory and show its first case
+        self.case_binding = binding
+        self.case_cache.clear()
+        self._prefetching.clear()
+        self.case_selector.blockSignals(True)
+        self.case_selector.clear()
+        if binding is not None:
+            self.case_selector.addItems(binding.cases)
+        self.case_selector.blockSignals(False)
+        self.case_selector.setVisible(binding is not None)
+        if binding is None:
+            return
+        if not binding.cases:
+            QMessageBox.warning(self, "Casos", f"No se encontraron casos en {binding.case_dir}\nAlias: {binding.aliases}")
+            return
+        self.show_case(binding.cases[0])
+
+    def step_case(self, step):
+        ## Used for move to the next/previous case of the bound directory
+        count = self.case_selector.count()
+        if self.case_binding is not None and count:
+            self.case_selector.setCurrentIndex((self.case_selector.currentIndex() + step) % count)
+
+    def show_case(self, case):
+        ## Used for show the bound template with the files of a case
+        ## Cached cases are drawn without reading, the neighbors are prefetched
+        binding = self.case_binding
+        if binding is None or not case:
+            return
+        if self.case_selector.currentText() != case:
+            self.case_selector.blockSignals(True)
+            self.case_selector.setCurrentText(case)
+            self.case_selector.blockSignals(False)
+        binding.current = case
+        requests = binding.requests(case)
+        cached = self.case_cache.get(case, requests)
+
+        def on_tab_loaded(series):
+            # Tabs are read when shown: the cache gets the series of each one
+            if binding is self.case_binding:
+                self.case_cache.put(case, requests, series)
+
+        def on_loaded(series):
+            for neighbor in binding.neighbors(case):
+                self.prefetch_case(neighbor)
+
+        self.apply_template(binding.bind(case), cached, on_loaded, on_tab_loaded=on_tab_loaded)
+        self.setWindowTitle(f"PSSE/PSCAD ViEEwer - {case}")
+
+    def prefetch_case(self, case):
+        ## Used for read the data of a case in the background before it is shown
+        binding = self.case_binding
+        if case in self.case_cache or case in self._prefetching:
+            return
+        requests = binding.requests(case)
+        series = {}
+        self._prefetching.add(case)
+
+        def on_finished(cancelled):
+            self._prefetching.discard(case)
+            if not cancelled and binding is self.case_binding:
+                self.case_cache.put(case, requests, series)
+
+        load_series_in_background(f"Precargando {case}", requests, lambda file, results: series.update(results), on_finished)
         
     def remove_series_from_all_plots(self, filepath):
         # Remove series from all PlotCanvas widgets in all tabs based on the source file
+        # Tabs not built yet only drop the lines from their template
         for i in range(self.tabs.count()):
             tab = self.tabs.widget(i)
-            if hasattr(tab, 'layout'):
-                for j in range(tab.layout.count()):
-                    widget = tab.layout.itemAt(j).widget()
-                    if isinstance(widget, PlotCanvas):
-                        lines = list(widget.ax.get_lines())
-                        for line in lines:
-                            if getattr(line, 'source_file', None) == filepath:
-                                line.remove()
-                        widget.ax.legend().set_picker(True)
-                        widget.canvas.draw()
+            if getattr(tab, 'pending', False):
+                for plot_info in tab.spec.get("plots", []):
+                    plot_info["lines"] = [line_info for line_info in plot_info["lines"]
+                                          if not any(request[0] == filepath for request in line_requests(line_info))]
+        # Only the plots that show the file are touched, each one drawn once
+        for canvas, lines in LINE_REGISTRY.plots_of([filepath]).items():
+            for line in lines:
+                canvas.remove_line(line)
+            canvas.refresh_legend()
+            canvas.canvas.draw()
+        # Nothing keeps the arrays of the file once its lines are gone
+        self.tab_context.forget_files([filepath])
+        TRACE_STORE.release_file(filepath)
+        DERIVED_CACHE.release_file(filepath)
+        DATA_STORE.invalidate(filepath)
+        self.statusBar().showMessage(f"{os.path.basename(filepath)} quitado, curvas en memoria: "
+                                     f"{TRACE_STORE.memory_used() / 1024 ** 2:.1f} MB", 5000)
                         
 if __name__ == '__main__':
+    multiprocessing.freeze_support()  # procesos de lectura en el ejecutable de Windows
     app = QApplication(sys.argv)
     app.setWindowIcon(QIcon("icono.ico"))
     win = MainWindow()
@@ -0,0 +1,165 @@
+# Alignment of traces with different time steps (PSSE vs PSCAD)
+# Traces are put on a common uniform grid with vectorized interpolation. A
+# trace may be shifted by a time offset first; the offset that makes its event
+# (fault, step) happen at the same time as in a reference trace is detected
+# from the data. Aligned arrays are cached by trace identity and parameters.
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from profiling import PROFILER
+
+
+ALIGNMENT_CACHE_SIZE = 32  # alineaciones conservadas en memoria
+EVENT_FRACTION = 0.05  # fracción de la excursión máxima que marca el evento
+MAX_GRID_POINTS = 5_000_000
+
+
+class AlignmentError(ValueError):
+    pass
+
+
+def median_step(time):
+    ## Used for get the typical time step of a trace (ignores repeated times)
+    steps = np.diff(np.asarray(time, dtype=float))
+    steps = steps[steps > 0]
+    return float(np.median(steps)) if len(steps) else 0.0
+
+
+def common_range(times):
+    ## Used for get the time range covered by every trace
+    start = max(float(t[0]) for t in times)
+    end = min(float(t[-1]) for t in times)
+    if start > end:
+        raise AlignmentError("Las curvas no tienen un intervalo de tiempo en común")
+    return start, end
+
+
+def densest_time_base(times):
+    ## Used for get the time vector of the trace with most samples in the common range
+    ## The same array is returned when every trace uses it
+    times = [np.asarray(t, dtype=float) for t in times]
+    first = times[0]
+    if all(t is first or (len(t) == len(first) and np.array_equal(t, first)) for t in times[1:]):
+        return first
+    start, end = common_range(times)
+    cuts = [t[np.searchsorted(t, start, side='left'):np.searchsorted(t, end, side='right')] for t in times]
+    return max(cuts, key=len)
+
+
+def uniform_grid(times, step=None):
+    ## Used for build a uniform grid over the common range of the traces
+    ## Without step the coarsest typical step of the traces is used, so the
+    ## comparison is done at the resolution of the slowest simulation
+    start, end = common_range(times)
+    if step is None:
+        step = max(median_step(t) for t in times)
+    if step <= 0 or end == start:
+        return np.array([start])
+    count = int(np.floor((end - start) / step + 1e-9)) + 1
+    if count > MAX_GRID_POINTS:
+        raise AlignmentError(f"La grilla tendría {count} puntos, use un paso mayor")
+    return start + np.arange(count) * step
+
+
+def resample(time, values, grid):
+    ## Used for interpolate a trace on grid (NaN outside of the trace)
+    return np.interp(grid, np.asarray(time, dtype=float), np.asarray(values, dtype=float),
+                     left=np.nan, right=np.nan)
+
+
+def detect_event_time(time, values, fraction=EVENT_FRACTION):
+    ## Used for find when a trace leaves its initial steady state
+    ## The first samples give the initial value and its noise; the event is the
+    ## first sample that deviates more than fraction of the largest excursion.
+    ## Meant for RMS/phasor quantities; returns None if there is no clear event
+    time = np.asarray(time, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if len(time) < 10:
+        return None
+    window = max(int(np.searchsorted(time, time[0] + 0.02 * (time[-1] - time[0]))), 5)
+    base = np.median(values[:window])
+    noise = np.max(np.abs(values[:window] - base))
+    deviation = np.abs(values - base)
+    excursion = np.nanmax(deviation)
+    if not np.isfinite(excursion) or excursion <= 2 * noise or excursion == 0:
+        return None
+    index = int(np.argmax(deviation > max(fraction * excursion, 2 * noise)))
+    return float(time[index])
+
+
+def event_offsets(traces, reference=0, fraction=EVENT_FRACTION):
+    ## Used for get the time offset of every (time, values) trace that moves its
+    ## event to the event of the reference trace (0 when there is no event)
+    ref_event = detect_event_time(*traces[reference], fraction=fraction)
+    if ref_event is None:
+        raise AlignmentError("No se detectó un evento en la curva de referencia")
+    offsets = []
+    for time, values in traces:
+        event = detect_event_time(time, values, fraction=fraction)
+        offsets.append(0.0 if event is None else ref_event - event)
+    return offsets
+
+
+def align(traces, offsets=None, step=None):
+    ## Used for put several (time, values) traces on a common uniform grid
+    ## offsets: time added to each trace before resampling
+    ## Returns (grid, [values on grid, ...])
+    if offsets is None:
+        offsets = [0.0] * len(traces)
+    with PROFILER.span("resample", "alineación", curvas=len(traces)):
+        times = [np.asarray(t, dtype=float) + offset for (t, _), offset in zip(traces, offsets)]
+        grid = uniform_grid(times, step)
+        return grid, [resample(t, values, grid) for t, (_, values) in zip(times, traces)]
+
+
+def reference_differences(aligned, scales, reference=0):
+    ## Used for the (max |Δ|, RMS Δ) of every aligned trace against the reference
+    ## scales: multiplier of each trace, applied to each one before subtracting
+    ## Returns {index: (max_abs, rms)} for every trace but the reference
+    ref = aligned[reference] * scales[reference]
+    differences = {}
+    for index, (values, scale) in enumerate(zip(aligned, scales)):
+        if index == reference:
+            continue
+        diff = values * scale - ref
+        differences[index] = (float(np.nanmax(np.abs(diff))), float(np.sqrt(np.nanmean(diff ** 2))))
+    return differences
+
+
+class AlignmentCache:
+    # LRU of aligned arrays, the caller gives a hashable key per trace (source
+    # and file version) so a trace read again reuses its alignment
+    def __init__(self, max_entries=ALIGNMENT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def align(self, keys, traces, offsets=None, step=None):
+        offsets = [0.0] * len(traces) if offsets is None else [float(o) for o in offsets]
+        key = (tuple(keys), tuple(offsets), step)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        result = align(traces, offsets, step)
+        for values in result[1]:
+            values.setflags(write=False)
+        result[0].setflags(write=False)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = result
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+ALIGNMENT_CACHE = AlignmentCache()
@@ -0,0 +1,179 @@
+# Exportación por lotes sin interfaz gráfica
+# Renderiza una plantilla JSON contra muchos casos (archivos de resultados) en
+# procesos en paralelo, con el backend Agg y sin QApplication.
+#
+# Uso:
+#   python batch_export.py plantilla.json casos/*.out [--formato png,pdf] [--salida DIR]
+#                          [--reemplazar RUTA] [--procesos N] [--dpi 100] [--pagina A4 [--horizontal]]
+#                          [--informe] [--traza traza.json]
+#
+# Cada archivo de resultados es un caso: las líneas de la plantilla que usan
+# un archivo del mismo tipo (.out o .csv) pasan a leer ese archivo, o solo las
+# del archivo indicado con --reemplazar. Si la plantilla tiene alias ({case}),
+# el caso se deduce del nombre del archivo y se usan todos sus archivos. Los
+# patrones glob se expanden aquí para que funcionen en la consola de Windows.
+# Con --informe cada caso tiene además un PDF de varias páginas, una por pestaña.
+import argparse
+import copy
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cases import bind_template, case_from_file
+from profiling import PROFILER, run_traced
+from readers import load_series_batch
+from render import (EXPORT_FORMATS, PAGE_SIZES, REPORT_NAME, export_points, figure_size, render_report,
+    render_views, safe_file_name, template_requests, template_views)
+
+
+def expand_cases(patterns):
+    ## Used for turn file names and glob patterns into the sorted list of cases
+    cases = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            print(f"[WARN] Ningún archivo coincide con {pattern}")
+        cases.extend(os.path.abspath(path) for path in matches)
+    return list(dict.fromkeys(cases))
+
+
+def retarget_template(template_data, case_file, replace=None):
+    ## Used for get a copy of the template whose lines read case_file
+    ## Without replace, every line of a file with the same extension is moved
+    ## The inputs of derived lines are moved the same way
+    retargeted = copy.deepcopy(template_data)
+    extension = os.path.splitext(case_file)[1].lower()
+
+    def matches(file):
+        if replace is not None:
+            return os.path.normcase(os.path.abspath(file)) == os.path.normcase(os.path.abspath(replace))
+        return os.path.splitext(file)[1].lower() == extension
+
+    for tab_data in retargeted.get("tabs", []):
+        for plot_info in tab_data.get("plots", []):
+            for line_info in plot_info.get("lines", []):
+                for spec in [line_info] + list(line_info.get("inputs", {}).values()):
+                    if spec.get("file") and matches(spec["file"]):
+                        spec["file"] = case_file
+    return retargeted
+
+
+def unique_cases(template_data, cases):
+    ## Used for keep one file per case when the template has aliases
+    ## (the .out and the .csv of a case are the same case)
+    if not template_data.get("aliases"):
+        return cases
+    by_case = {}
+    for case in cases:
+        by_case.setdefault(case_from_file(template_data, case) or case, case)
+    return list(by_case.values())
+
+
+def case_template(template_data, case_file, replace=None):
+    ## Used for get (case name, template with the files of the case)
+    found = case_from_file(template_data, case_file) if template_data.get("aliases") else None
+    if found is not None:
+        return found[0], bind_template(template_data, *found)
+    return os.path.splitext(os.path.basename(case_file))[0], retarget_template(template_data, case_file, replace)
+
+
+def export_case(template_data, case_file, output_dir, formats, replace=None, dpi=100, page_size=None,
+                landscape=False, report=False):
+    ## Entry point of the export processes: reads and renders one case
+    ## Every file is read once and its series are shared by all the plots
+    start = time.perf_counter()
+    case_name, case_data = case_template(template_data, case_file, replace)
+    series = load_series_batch(template_requests(case_data))
+    read_seconds = time.perf_counter() - start
+
+    case_dir = os.path.join(output_dir, safe_file_name(case_name))
+    written = []
+    pages = []
+    for index, tab_data in enumerate(case_data.get("tabs", [])):
+        name = tab_data.get("name") or f"pestaña_{index + 1}"
+        plots = tab_data.get("plots", [])
+        figsize = figure_size(len(plots), page_size, landscape)
+        views = {}  # una decimación por densidad de puntos, compartida por los formatos
+        for fmt in list(formats) + (["pdf"] if report else []):
+            n_points = export_points(fmt, figsize[0], dpi)
+            if n_points not in views:
+                views[n_points] = template_views(plots, series, n_points)
+        for fmt in formats:
+            path = os.path.join(case_dir, f"{safe_file_name(name)}.{fmt}")
+            if render_views(views[export_points(fmt, figsize[0], dpi)], path, fmt, dpi, figsize):
+                written.append(path)
+        if report:
+            pages.append((name, views[export_points("pdf", figsize[0], dpi)]))
+    if report and render_report(pages, os.path.join(case_dir, REPORT_NAME), dpi, page_size, landscape):
+        written.append(os.path.join(case_dir, REPORT_NAME))
+    return written, read_seconds, time.perf_counter() - start - read_seconds
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta una plantilla del visor para muchos casos sin abrir la interfaz.")
+    parser.add_argument("plantilla", help="plantilla JSON guardada desde el visor")
+    parser.add_argument("casos", nargs="+", help="archivos de resultados (.out/.csv) o patrones glob")
+    parser.add_argument("--salida", default="exportacion", help="carpeta de salida (una subcarpeta por caso)")
+    parser.add_argument("--formato", default="png",
+                        help=f"formatos separados por coma: {', '.join(EXPORT_FORMATS)}")
+    parser.add_argument("--reemplazar", default=None,
+                        help="archivo de la plantilla a sustituir (por defecto todos los del mismo tipo)")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1, help="casos exportados en paralelo")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--pagina", default=None, choices=list(PAGE_SIZES),
+                        help="tamaño de página de cada pestaña (por defecto 10 pulgadas de ancho y 4 por gráfico)")
+    parser.add_argument("--horizontal", action="store_true", help="página en orientación horizontal")
+    parser.add_argument("--informe", action="store_true", help=f"escribe también {REPORT_NAME} con todas las pestañas")
+    parser.add_argument("--traza", default=None, help="escribe los tiempos en formato Chrome trace (JSON)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    formats = [fmt.strip().lower() for fmt in args.formato.split(",") if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in EXPORT_FORMATS]
+    if unknown or not (formats or args.informe):
+        print(f"[ERROR] Formato no soportado: {', '.join(unknown)}")
+        return 2
+    with open(args.plantilla, "r", encoding="utf-8") as f:
+        template_data = json.load(f)
+    cases = unique_cases(template_data, expand_cases(args.casos))
+    if not cases:
+        print("[ERROR] No hay casos para exportar")
+        return 2
+
+    start = time.perf_counter()
+    failed = 0
+    jobs = max(1, min(args.procesos, len(cases)))
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        def submit(*call):
+            return pool.submit(run_traced, *call) if args.traza else pool.submit(*call)
+        futures = {submit(export_case, template_data, case, args.salida, formats, args.reemplazar, args.dpi,
+                          args.pagina, args.horizontal, args.informe): case
+                   for case in cases}
+        for done, future in enumerate(as_completed(futures), 1):
+            case = futures[future]
+            try:
+                result = future.result()
+                if args.traza:
+                    result, events = result
+                    PROFILER.merge(events)
+                written, read_seconds, render_seconds = result
+                print(f"[INFO] [{done}/{len(cases)}] {os.path.basename(case)}: {len(written)} archivos "
+                      f"(lectura {read_seconds:.1f} s, dibujo {render_seconds:.1f} s)")
+            except Exception as e:
+                failed += 1
+                print(f"[ERROR] [{done}/{len(cases)}] {os.path.basename(case)}: {e}")
+    print(f"[INFO] {len(cases) - failed} de {len(cases)} casos exportados en {time.perf_counter() - start:.1f} s")
+    if args.traza:
+        print(f"[INFO] Traza de rendimiento ({PROFILER.write_trace(args.traza)} eventos) en {args.traza}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# Métricas de cumplimiento por lotes sin interfaz gráfica
+# Calcula, para cada caso y cada curva de la plantilla, tiempo de subida,
+# tiempo de establecimiento, sobrepico, error en estado estacionario y el
+# error contra la primera curva de su gráfico (PSSE vs PSCAD), en procesos en
+# paralelo. El resultado es una tabla CSV o JSON con una fila por curva.
+#
+# Uso:
+#   python batch_metrics.py plantilla.json casos/*.out --salida metricas.csv
+#                           [--banda 0.05] [--subida 0.1,0.9] [--ventana-final 1.0]
+#                           [--evento auto|SEG] [--objetivo VALOR]
+#                           [--banda-error-abs 0] [--banda-error-rel 0.05]
+#                           [--reemplazar RUTA] [--procesos N] [--traza traza.json]
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from batch_export import case_template, expand_cases, unique_cases
+from metrics import DEFAULT_PARAMS, MetricParams, plot_metrics, template_plot_traces, write_table
+from profiling import PROFILER, run_traced
+from readers import load_series_batch
+from render import template_requests
+
+
+def case_metrics(template_data, case_file, params, replace=None):
+    ## Entry point of the metric processes: reads one case and measures its plots
+    case_name, case_data = case_template(template_data, case_file, replace)
+    series = load_series_batch(template_requests(case_data))
+    rows = []
+    for tab_data in case_data.get("tabs", []):
+        for plot_index, plot_info in enumerate(tab_data.get("plots", [])):
+            traces = template_plot_traces(plot_info, series)
+            if not traces:
+                continue
+            for row in plot_metrics(traces, params):
+                rows.append(dict({"caso": case_name, "pestaña": tab_data.get("name", ""),
+                                  "gráfico": plot_info.get("title") or str(plot_index + 1)}, **row))
+    return rows
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Calcula métricas de cumplimiento de una plantilla para muchos casos.")
+    parser.add_argument("plantilla", help="plantilla JSON guardada desde el visor")
+    parser.add_argument("casos", nargs="+", help="archivos de resultados (.out/.csv) o patrones glob")
+    parser.add_argument("--salida", default="metricas.csv", help="tabla de salida (.csv o .json)")
+    parser.add_argument("--banda", type=float, default=DEFAULT_PARAMS.band,
+                        help="banda de establecimiento, fracción del escalón")
+    parser.add_argument("--subida", default=f"{DEFAULT_PARAMS.rise_low},{DEFAULT_PARAMS.rise_high}",
+                        help="fracciones del escalón para el tiempo de subida")
+    parser.add_argument("--ventana-final", type=float, default=DEFAULT_PARAMS.final_window,
+                        help="segundos finales que definen el valor final")
+    parser.add_argument("--evento", default="auto", help="instante del evento en segundos o 'auto'")
+    parser.add_argument("--objetivo", type=float, default=None, help="valor final esperado")
+    parser.add_argument("--banda-error-abs", type=float, default=DEFAULT_PARAMS.error_band_abs)
+    parser.add_argument("--banda-error-rel", type=float, default=DEFAULT_PARAMS.error_band_rel)
+    parser.add_argument("--reemplazar", default=None,
+                        help="archivo de la plantilla a sustituir (por defecto todos los del mismo tipo)")
+    parser.add_argument("--procesos", type=int, default=os.cpu_count() or 1, help="casos calculados en paralelo")
+    parser.add_argument("--traza", default=None, help="escribe los tiempos en formato Chrome trace (JSON)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        rise_low, rise_high = (float(value) for value in args.subida.split(","))
+        event_time = None if args.evento == "auto" else float(args.evento)
+    except ValueError:
+        print("[ERROR] --subida debe ser 'bajo,alto' y --evento 'auto' o un número")
+        return 2
+    params = MetricParams(args.banda, rise_low, rise_high, args.ventana_final, event_time,
+                          args.objetivo, args.banda_error_abs, args.banda_error_rel)
+    with open(args.plantilla, "r", encoding="utf-8") as f:
+        template_data = json.load(f)
+    cases = unique_cases(template_data, expand_cases(args.casos))
+    if not cases:
+        print("[ERROR] No hay casos para calcular")
+        return 2
+
+    start = time.perf_counter()
+    rows_by_case = {}
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, min(args.procesos, len(cases)))) as pool:
+        def submit(*call):
+            return pool.submit(run_traced, *call) if args.traza else pool.submit(*call)
+        futures = {submit(case_metrics, template_data, case, params, args.reemplazar): case for case in cases}
+        for done, future in enumerate(as_completed(futures), 1):
+            case = futures[future]
+            try:
+                result = future.result()
+                if args.traza:
+                    result, events = result
+                    PROFILER.merge(events)
+                rows_by_case[case] = result
+                print(f"[INFO] [{done}/{len(cases)}] {os.path.basename(case)}: {len(rows_by_case[case])} curvas")
+            except Exception as e:
+                failed += 1
+                print(f"[ERROR] [{done}/{len(cases)}] {os.path.basename(case)}: {e}")
+    rows = [row for case in cases for row in rows_by_case.get(case, [])]  # orden de los casos
+    write_table(rows, args.salida)
+    print(f"[INFO] {len(rows)} filas de {len(cases) - failed} casos en {args.salida} ({time.perf_counter() - start:.1f} s)")
+    if args.traza:
+        print(f"[INFO] Traza de rendimiento ({PROFILER.write_trace(args.traza)} eventos) en {args.traza}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
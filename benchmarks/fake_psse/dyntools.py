@@ -0,0 +1,32 @@
+# Stand-in for dyntools of PSS®E, used only by the benchmarks
+# CHNF serves the synthetic .out files written by benchmarks/synthetic.py with
+# the same interface and result types as dyntools: get_data() returns
+# (titles, {index: name}, {'time': list, index: list}), so the conversion of
+# every channel to a Python list costs what it costs with the real module.
+import json
+
+import numpy as np
+
+
+MAGIC = b"FAKEOUT1\n"
+
+
+class CHNF:
+    def __init__(self, outfile):
+        self.outfile = outfile
+        with open(outfile, "rb") as f:
+            if f.readline() != MAGIC:
+                raise ValueError(f"{outfile} no es un .out sintético")
+            self.header = json.loads(f.readline().decode("utf-8"))
+            self._offset = f.tell()
+
+    def get_data(self):
+        names = self.header["channels"]
+        samples = self.header["samples"]
+        raw = np.fromfile(self.outfile, dtype="<f4", offset=self._offset).reshape(len(names) + 1, samples)
+        ch_id = {index: name for index, name in enumerate(names, 1)}
+        ch_id["time"] = "Time(s)"
+        ch_data = {"time": raw[0].tolist()}
+        for index in range(1, len(names) + 1):
+            ch_data[index] = raw[index].tolist()
+        return self.header.get("title", ""), ch_id, ch_data
@@ -0,0 +1 @@
+# Stand-in for the psse35 module of PSS®E, used only by the benchmarks
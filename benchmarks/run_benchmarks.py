@@ -0,0 +1,272 @@
+# Benchmarks of the data paths and the drawing of the viewer
+# Generates synthetic PSCAD CSVs and PSSE .out files (read through a fake
+# dyntools, no PSSE install needed), times the readers, a template load, its
+# reload, the export and pan/zoom redraws on the offscreen Qt platform, and
+# compares the medians with a stored baseline.
+#
+# Uso:
+#   python benchmarks/run_benchmarks.py [--tamaños 10,100] [--tamaños-out 10,100]
+#          [--columnas 200] [--repeticiones 3] [--datos DIR] [--solo csv,out,gui]
+#          [--guardar resultados.json] [--base base.json] [--tolerancia 0.25]
+#
+# --tamaños acepta hasta 5000 (MB); los archivos generados se reutilizan entre
+# ejecuciones. El código de salida es 1 si alguna mediana empeoró más que la
+# tolerancia respecto de la base.
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+FAKE_PSSE_DIR = os.path.join(BENCH_DIR, "fake_psse")
+GROUPS = ("csv", "out", "gui")
+PAN_ZOOM_FRAMES = 60
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Mide los tiempos de lectura y dibujo del visor con datos sintéticos.")
+    parser.add_argument("--tamaños", default="10,100", help="tamaños de los CSV de PSCAD en MB")
+    parser.add_argument("--tamaños-out", default="10,100", help="tamaños de los .out de PSSE en MB")
+    parser.add_argument("--columnas", type=int, default=200, help="canales por archivo")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--datos", default=os.path.join(tempfile.gettempdir(), "psse_pscad_viewer_bench"),
+                        help="carpeta de los archivos sintéticos y de su caché")
+    parser.add_argument("--solo", default=",".join(GROUPS), help="grupos a medir: csv, out, gui")
+    parser.add_argument("--guardar", default=None, help="escribe los resultados en este JSON (p. ej. la base)")
+    parser.add_argument("--base", default=None, help="resultados anteriores contra los que comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="empeoramiento admitido (0.25 = 25 %%)")
+    return parser.parse_args(argv)
+
+
+def setup_environment(data_dir):
+    # Must run before the viewer modules are imported: the fake dyntools is
+    # found first (also by the reading processes) and the sidecar cache of the
+    # benchmark does not mix with the one of the user
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ["VIEWER_CACHE_DIR"] = os.path.join(data_dir, "cache")
+    os.environ["PYTHONPATH"] = os.pathsep.join(filter(None, [FAKE_PSSE_DIR, REPO_DIR, os.environ.get("PYTHONPATH")]))
+    sys.path[:0] = [FAKE_PSSE_DIR, REPO_DIR, BENCH_DIR]
+
+
+class Bench:
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = {}
+
+    def run(self, name, func, setup=None, per=1):
+        ## Used for time func repeat times (setup runs before each, untimed)
+        ## per: operations done by one call, the result is the time of one
+        times = []
+        for _ in range(self.repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            func()
+            times.append((time.perf_counter() - start) / per)
+        self.results[name] = {"median_s": statistics.median(times), "min_s": min(times), "runs": len(times)}
+        print(f"  {name:<58} {self.results[name]['median_s'] * 1000:10.1f} ms  (mín {min(times) * 1000:.1f})")
+
+
+def reset_caches(keep_sidecar=False):
+    # Cold start: nothing in memory and, unless kept, nothing in the sidecar cache
+    from alignment import ALIGNMENT_CACHE
+    from data_store import DATA_STORE
+    from derived import DERIVED_CACHE
+    from sidecar_cache import SIDECAR_CACHE
+    from trace_store import TRACE_STORE
+    for cache in (DATA_STORE, TRACE_STORE, DERIVED_CACHE, ALIGNMENT_CACHE):
+        cache.clear()
+    if not keep_sidecar:
+        SIDECAR_CACHE.clear()
+
+
+def bench_csv(bench, files):
+    from readers import get_channels_from_csv, get_time_and_data_from_csv
+    for size, (path, names) in files.items():
+        prefix = f"csv_{size}MB"
+        channel = names[len(names) // 2]
+        bench.run(f"{prefix}.get_channels_from_csv", lambda: get_channels_from_csv(path))
+        bench.run(f"{prefix}.get_time_and_data_from_csv.cold",
+                  lambda: get_time_and_data_from_csv(path, channel), setup=reset_caches)
+        bench.run(f"{prefix}.get_time_and_data_from_csv.sidecar",
+                  lambda: get_time_and_data_from_csv(path, channel), setup=lambda: reset_caches(keep_sidecar=True))
+
+
+def bench_out(bench, files):
+    from readers import get_channel_data_from_out, get_channels_from_out
+    for size, (path, names) in files.items():
+        prefix = f"out_{size}MB"
+        channel = names[len(names) // 2]
+        bench.run(f"{prefix}.get_channels_from_out.cold", lambda: get_channels_from_out(path), setup=reset_caches)
+        bench.run(f"{prefix}.get_channel_data_from_out.cold",
+                  lambda: get_channel_data_from_out(path, channel), setup=reset_caches)
+        bench.run(f"{prefix}.get_channel_data_from_out.sidecar",
+                  lambda: get_channel_data_from_out(path, channel), setup=lambda: reset_caches(keep_sidecar=True))
+        bench.run(f"{prefix}.get_channel_data_from_out.memory", lambda: get_channel_data_from_out(path, channel))
+
+
+def bench_gui(bench, template, data_dir):
+    from PyQt5.QtWidgets import QApplication
+    import PSSE_PSCAD_VIEWER as viewer
+    from loader import get_background_loader
+    from redraw import get_redraw_scheduler
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    window = viewer.MainWindow()
+    window.resize(1600, 1000)
+    window.show()
+
+    def wait_for_loads():
+        # Until every background job ended and the pending redraws are done
+        loader = get_background_loader()
+        app.processEvents()
+        while loader.jobs:
+            app.processEvents()
+            time.sleep(0.001)
+        get_redraw_scheduler().flush()
+        app.processEvents()
+
+    def load():
+        window.apply_template(template)
+        wait_for_loads()
+
+    def show_all_tabs():
+        # Every tab shown once: the placeholders are built and their data read
+        for i in range(window.tabs.count()):
+            window.tabs.setCurrentIndex(i)
+            wait_for_loads()
+
+    def load_first_tab():
+        reset_caches(keep_sidecar=True)
+        window.tabs.setCurrentIndex(0)
+        load()
+
+    def reload():
+        window.reload_files()
+        wait_for_loads()
+
+    def touch_sources():
+        # A new modification time: every file counts as changed and is read again
+        for paths in template["files"].values():
+            for path in paths:
+                os.utime(path)
+
+    export_dir = os.path.join(data_dir, "export")
+    os.makedirs(export_dir, exist_ok=True)
+
+    def export(options=None):
+        window.export_tabs(export_dir, options or viewer.DEFAULT_EXPORT)
+        wait_for_loads()
+
+    lines = sum(len(plot["lines"]) for tab in template["tabs"] for plot in tab["plots"])
+    prefix = f"gui.{len(template['tabs'])}_tabs_{lines}_lines"
+    bench.run(f"{prefix}.template_load.cold", load, setup=reset_caches)
+    bench.run(f"{prefix}.template_load.sidecar", load, setup=lambda: reset_caches(keep_sidecar=True))
+    bench.run(f"{prefix}.show_all_tabs", show_all_tabs, setup=load_first_tab)
+    bench.run(f"{prefix}.reload.unchanged", reload)
+    bench.run(f"{prefix}.reload.changed", reload, setup=touch_sources)
+    bench.run(f"{prefix}.export_png", export)
+    bench.run(f"{prefix}.export_png_svg_pdf_report",
+              lambda: export(viewer.DEFAULT_EXPORT._replace(formats=("png", "svg", "pdf"), report=True)))
+
+    canvas = window.all_plot_canvases()[0]
+    x0, x1 = canvas.ax.get_xlim()
+    width = (x1 - x0) / 4
+
+    def pan_zoom():
+        # Pan in small steps and zoom in and out, one full render per frame
+        for frame in range(PAN_ZOOM_FRAMES):
+            start = x0 + (frame % 20) * width / 10
+            zoom = 2.0 if (frame // 20) % 2 else 1.0
+            canvas.ax.set_xlim(start, start + width * zoom)
+            canvas.canvas.draw()
+
+    bench.run(f"{prefix}.pan_zoom_frame", pan_zoom, per=PAN_ZOOM_FRAMES)
+    frame = bench.results[f"{prefix}.pan_zoom_frame"]["median_s"]
+    print(f"  {'':<58} {1 / frame:10.1f} cuadros/s")
+    window.close()
+
+
+def compare(results, baseline, tolerance):
+    ## Used for print the change of every median against the baseline
+    ## Returns the names of the benchmarks that got slower than the tolerance
+    regressions = []
+    print(f"\nComparación con la base ({baseline.get('date', '?')}, tolerancia {tolerance:.0%}):")
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"  {name:<58} {'nuevo':>10}")
+            continue
+        ratio = result["median_s"] / base["median_s"] if base["median_s"] > 0 else 1.0
+        if ratio > 1 + tolerance:
+            status = "REGRESIÓN"
+            regressions.append(name)
+        elif ratio < 1 / (1 + tolerance):
+            status = "mejora"
+        else:
+            status = ""
+        print(f"  {name:<58} {ratio:9.2f}x  {status}")
+    return regressions
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    groups = [group.strip() for group in args.solo.split(",") if group.strip()]
+    unknown = [group for group in groups if group not in GROUPS]
+    if unknown:
+        print(f"[ERROR] Grupo desconocido: {', '.join(unknown)}")
+        return 2
+    setup_environment(args.datos)
+    from synthetic import build_template, write_fake_out, write_pscad_csv
+
+    csv_sizes = [int(size) for size in args.tamaños.split(",") if size.strip()]
+    out_sizes = [int(size) for size in args.tamaños_out.split(",") if size.strip()]
+    print(f"[INFO] Generando archivos sintéticos en {args.datos}")
+    csv_files = {}
+    for size in csv_sizes:
+        path = os.path.join(args.datos, f"pscad_{size}MB_{args.columnas}.csv")
+        csv_files[size] = (path, write_pscad_csv(path, size, args.columnas))
+    out_files = {}
+    for size in out_sizes:
+        path = os.path.join(args.datos, f"psse_{size}MB_{args.columnas}.out")
+        out_files[size] = (path, write_fake_out(path, size, args.columnas))
+
+    bench = Bench(args.repeticiones)
+    if "csv" in groups and csv_files:
+        print("[INFO] Lectura de CSV de PSCAD")
+        bench_csv(bench, csv_files)
+    if "out" in groups and out_files:
+        print("[INFO] Lectura de .out de PSSE (dyntools sintético)")
+        bench_out(bench, out_files)
+    if "gui" in groups and csv_files and out_files:
+        print("[INFO] Interfaz (Qt offscreen)")
+        out_path, out_names = out_files[min(out_files)]
+        csv_path, csv_names = csv_files[min(csv_files)]
+        bench_gui(bench, build_template(out_path, out_names, csv_path, csv_names), args.datos)
+
+    report = {"date": datetime.datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+              "platform": platform.platform(), "processor": platform.processor(),
+              "params": {"csv_mb": csv_sizes, "out_mb": out_sizes, "columns": args.columnas,
+                         "repeat": args.repeticiones},
+              "results": bench.results}
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"[INFO] Resultados guardados en {args.guardar}")
+    if args.base:
+        with open(args.base, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(bench.results, baseline, args.tolerancia):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# Synthetic PSCAD and PSSE result files for the benchmarks
+# The CSVs have a time column plus hundreds of channels over a fixed duration,
+# so the rows after the PSCAD init time are always there. Rows are written in
+# blocks: the values of one block are formatted once and repeated with a new
+# time column, which makes multi GB files quick to generate.
+import json
+import os
+
+import numpy as np
+
+from fake_psse.dyntools import MAGIC
+
+
+DURATION = 20.0  # segundos simulados en cada archivo
+BLOCK_ROWS = 4096  # filas formateadas una vez y repetidas
+TIME_FORMAT = "%.7f"
+VALUE_FORMAT = "%.6g"
+
+
+def channel_names(count, prefix="CH"):
+    return [f"{prefix}{i:04d}" for i in range(count)]
+
+
+def _waves(time, count, seed=0):
+    # Sine waves of different frequency, amplitude and noise, one per column
+    rng = np.random.default_rng(seed)
+    freq = rng.uniform(0.2, 60.0, count)
+    amplitude = rng.uniform(0.1, 100.0, count)
+    values = amplitude * np.sin(2 * np.pi * freq * time[:, None])
+    return values + rng.normal(0, 0.01, values.shape) * amplitude
+
+
+def write_pscad_csv(path, size_mb, columns=200):
+    ## Used for write a PSCAD-like CSV of about size_mb MB with columns channels
+    ## Returns the channel names; an existing file with the same size is reused
+    names = channel_names(columns)
+    spec_path = path + ".spec.json"
+    spec = {"size_mb": size_mb, "columns": columns}
+    if os.path.isfile(path) and os.path.isfile(spec_path):
+        with open(spec_path, "r", encoding="utf-8") as f:
+            if json.load(f) == spec:
+                return names
+
+    block_time = np.arange(BLOCK_ROWS) * (DURATION / BLOCK_ROWS)
+    block = _waves(block_time, columns)
+    values_text = [",".join(VALUE_FORMAT % v for v in row) for row in block]
+    row_bytes = len(TIME_FORMAT % DURATION) + 1 + np.mean([len(text) for text in values_text]) + 1
+    rows = max(int(size_mb * 1024 ** 2 / row_bytes), BLOCK_ROWS)
+    dt = DURATION / rows
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="ascii", newline="\n") as f:
+        f.write(",".join(["time"] + names) + "\n")
+        for start in range(0, rows, BLOCK_ROWS):
+            count = min(BLOCK_ROWS, rows - start)
+            times = (start + np.arange(count)) * dt
+            f.write("\n".join(TIME_FORMAT % t + "," + text for t, text in zip(times, values_text)))
+            f.write("\n")
+    with open(spec_path, "w", encoding="utf-8") as f:
+        json.dump(spec, f)
+    return names
+
+
+def psse_channel_names(count):
+    # Names like the ones of a PSSE channel file
+    kinds = ["VOLT {bus} [BUS{bus} 230.00]", "ANGL {bus} [BUS{bus} 230.00]",
+             "POWR {bus} [GEN{bus} 1]", "VARS {bus} [GEN{bus} 1]", "FREQ {bus} [BUS{bus} 230.00]"]
+    return [kinds[i % len(kinds)].format(bus=100 + i // len(kinds)) for i in range(count)]
+
+
+def write_fake_out(path, size_mb, channels=200):
+    ## Used for write a synthetic .out of about size_mb MB read by fake_psse.dyntools
+    ## Returns the channel names
+    names = psse_channel_names(channels)
+    samples = max(int(size_mb * 1024 ** 2 / (4 * (channels + 1))), 16)
+    header = {"title": "Caso sintético", "channels": names, "samples": samples}
+    header_line = json.dumps(header).encode("utf-8") + b"\n"
+    if os.path.isfile(path):
+        with open(path, "rb") as f:
+            if f.readline() == MAGIC and f.readline() == header_line:
+                return names
+
+    time = np.linspace(0.0, DURATION, samples)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(header_line)
+        time.astype("<f4").tofile(f)
+        for start in range(0, channels, 32):  # bloques de canales para acotar la memoria
+            count = min(32, channels - start)
+            _waves(time, count, seed=start).T.astype("<f4").tofile(f)
+    return names
+
+
+def build_template(out_file, out_names, csv_file, csv_names, tabs=6, plots=4, lines=3):
+    ## Used for a template with tabs x plots x lines alternating PSSE and PSCAD channels
+    template = {"tabs": [], "files": {"psse": [out_file], "pscad": [csv_file]}}
+    index = 0
+    for tab in range(tabs):
+        tab_data = {"name": f"Pestaña {tab + 1}", "plots": []}
+        for plot in range(plots):
+            plot_info = {"title": f"Gráfico {tab + 1}.{plot + 1}", "xlabel": "(s)", "ylabel": "", "grid": True,
+                         "lines": []}
+            for line in range(lines):
+                if index % 2:
+                    file, channel = csv_file, csv_names[index % len(csv_names)]
+                else:
+                    file, channel = out_file, out_names[index % len(out_names)]
+                plot_info["lines"].append({"file": file, "channel": channel, "init_time": None,
+                                           "label": channel, "color": f"C{line}", "visible": True})
+                index += 1
+            tab_data["plots"].append(plot_info)
+        template["tabs"].append(tab_data)
+    return template
@@ -0,0 +1,251 @@
+# Templates that can be run against many result sets (cases)
+# A template may declare "aliases": {role: pattern}, where the pattern is a
+# path with the placeholders {case} and {case_dir}. Lines and file lists then
+# use the role name (e.g. "PSSE base") instead of an absolute path, and the
+# template is bound to one case of a directory to get the concrete paths.
+import copy
+import glob
+import os
+import re
+from collections import OrderedDict
+from string import Formatter
+
+from data_store import file_signature
+from derived import line_requests
+
+
+CASE_CACHE_SIZE = 3  # casos anteriores cuyos datos se conservan en memoria
+ROLE_NAMES = {'.out': 'PSSE', '.csv': 'PSCAD'}
+
+
+def _fill(pattern, values):
+    # Replaces the known placeholders of pattern, the rest are kept as they are
+    parts = []
+    for literal, field, _, _ in Formatter().parse(pattern):
+        parts.append(literal)
+        if field is not None:
+            parts.append(str(values[field]) if field in values else "{" + field + "}")
+    return "".join(parts)
+
+
+def _pattern_regex(pattern):
+    # Regex of a path pattern, {case} captures one path component
+    parts = []
+    seen_case = False
+    for literal, field, _, _ in Formatter().parse(pattern):
+        parts.append(re.escape(literal))
+        if field == "case":
+            parts.append("(?P=case)" if seen_case else r"(?P<case>[^/\\]+)")
+            seen_case = True
+        elif field is not None:
+            parts.append(r"[^/\\]*")
+    return re.compile("".join(parts), re.IGNORECASE if os.name == 'nt' else 0)
+
+
+def _same_path(a, b):
+    return os.path.normcase(os.path.abspath(a)) == os.path.normcase(os.path.abspath(b))
+
+
+def _map_files(template_data, func):
+    # Copy of the template with func applied to every file of lines and trees
+    mapped = copy.deepcopy(template_data)
+    for tab_data in mapped.get("tabs", []):
+        for plot_info in tab_data.get("plots", []):
+            for line_info in plot_info.get("lines", []):
+                if line_info.get("file"):
+                    line_info["file"] = func(line_info["file"])
+                for spec in line_info.get("inputs", {}).values():  # canales derivados
+                    if spec.get("file"):
+                        spec["file"] = func(spec["file"])
+    files = mapped.get("files", {})
+    for kind in files:
+        files[kind] = [func(file) for file in files[kind]]
+    return mapped
+
+
+def template_files(template_data):
+    ## Used for list the distinct files (or aliases) used by a template
+    files = [request[0]
+             for tab_data in template_data.get("tabs", [])
+             for plot_info in tab_data.get("plots", [])
+             for line_info in plot_info.get("lines", [])
+             for request in line_requests(line_info)]
+    files.extend(file for kind in template_data.get("files", {}).values() for file in kind)
+    return list(dict.fromkeys(files))
+
+
+def resolve_file(file, aliases, case, case_dir):
+    ## Used for get the concrete path of a file, alias or pattern for a case
+    pattern = aliases.get(file, file)
+    return os.path.normpath(_fill(pattern, {"case": case, "case_dir": case_dir}))
+
+
+def bind_template(template_data, case, case_dir):
+    ## Used for get a copy of a template with the concrete files of a case
+    aliases = template_data.get("aliases", {})
+    return _map_files(template_data, lambda file: resolve_file(file, aliases, case, case_dir))
+
+
+def unbind_template(template_data, aliases, case, case_dir):
+    ## Used for replace the concrete files of a case by their alias names
+    concrete = {resolve_file(alias, aliases, case, case_dir): alias for alias in aliases}
+    def to_alias(file):
+        for path, alias in concrete.items():
+            if _same_path(file, path):
+                return alias
+        return file
+    generic = _map_files(template_data, to_alias)
+    generic["aliases"] = dict(aliases)
+    return generic
+
+
+def make_generic(template_data):
+    ## Used for turn a template with absolute paths into one with aliases
+    ## Every extension used by a single file becomes a role (PSSE, PSCAD) whose
+    ## pattern keeps the part of the file name shared by all roles as {case}
+    ## Returns (generic template, case, case_dir) or None if nothing can be a role
+    by_extension = {}
+    for file in template_files(template_data):
+        if file not in template_data.get("aliases", {}):
+            by_extension.setdefault(os.path.splitext(file)[1].lower(), []).append(file)
+    single = {ext: files[0] for ext, files in by_extension.items() if len(files) == 1 and ext in ROLE_NAMES}
+    if not single:
+        return None
+
+    stems = {ext: os.path.splitext(os.path.basename(file))[0] for ext, file in single.items()}
+    case = os.path.commonprefix(list(stems.values())).rstrip("_-. ") or stems.get('.out', next(iter(stems.values())))
+    case_dir = os.path.dirname(os.path.abspath(next(iter(single.values()))))
+    aliases = dict(template_data.get("aliases", {}))
+    for ext, file in single.items():
+        if not stems[ext].startswith(case):
+            continue  # queda con su ruta fija
+        directory = os.path.dirname(os.path.abspath(file))
+        head = "{case_dir}" if _same_path(directory, case_dir) else directory
+        aliases[ROLE_NAMES[ext]] = os.path.join(head, "{case}" + stems[ext][len(case):] + os.path.splitext(file)[1])
+    if len(aliases) == len(template_data.get("aliases", {})):
+        return None
+    return unbind_template(template_data, aliases, case, case_dir), case, case_dir
+
+
+def discover_cases(template_data, case_dir):
+    ## Used for list the cases of a directory that match the alias patterns
+    cases = set()
+    for pattern in template_data.get("aliases", {}).values():
+        pattern = os.path.normpath(_fill(pattern, {"case_dir": case_dir}))
+        fields = [field for _, field, _, _ in Formatter().parse(pattern) if field is not None]
+        if "case" not in fields:
+            continue
+        glob_pattern = "".join(glob.escape(literal) + ("*" if field is not None else "")
+                               for literal, field, _, _ in Formatter().parse(pattern))
+        regex = _pattern_regex(pattern)
+        for path in glob.glob(glob_pattern):
+            match = regex.fullmatch(os.path.normpath(path))
+            if match:
+                cases.add(match.group("case"))
+    return sorted(cases)
+
+
+def case_from_file(template_data, filepath):
+    ## Used for find the (case, case_dir) a result file belongs to
+    ## The case directory may be any folder above the file
+    filepath = os.path.normpath(os.path.abspath(filepath))
+    for pattern in template_data.get("aliases", {}).values():
+        case_dir = os.path.dirname(filepath)
+        while True:
+            match = _pattern_regex(os.path.normpath(_fill(pattern, {"case_dir": case_dir}))).fullmatch(filepath)
+            if match and "case" in match.groupdict():
+                return match.group("case"), case_dir
+            parent = os.path.dirname(case_dir)
+            if parent == case_dir or "{case_dir}" not in pattern:
+                break
+            case_dir = parent
+    return None
+
+
+class CaseBinding:
+    # A generic template bound to a directory of cases
+    def __init__(self, template_data, case_dir):
+        self.template = template_data
+        self.case_dir = case_dir
+        self.cases = discover_cases(template_data, case_dir)
+        self.current = None
+
+    @property
+    def aliases(self):
+        return self.template.get("aliases", {})
+
+    def bind(self, case):
+        return bind_template(self.template, case, self.case_dir)
+
+    def requests(self, case):
+        ## Used for get the (file, channel, init_time) requests of a case whose file exists
+        return [request
+                for tab_data in self.bind(case).get("tabs", [])
+                for plot_info in tab_data.get("plots", [])
+                for line_info in plot_info.get("lines", [])
+                for request in line_requests(line_info) if os.path.isfile(request[0])]
+
+    def neighbors(self, case):
+        ## Used for get the cases next to case, the ones to prefetch
+        if case not in self.cases:
+            return []
+        index = self.cases.index(case)
+        return [self.cases[i] for i in (index + 1, index - 1) if 0 <= i < len(self.cases)]
+
+
+class CaseCache:
+    # Series of the last cases shown, in LRU order
+    # An entry is discarded when any of its files changed on disk
+    def __init__(self, max_cases=CASE_CACHE_SIZE):
+        self.max_cases = max_cases
+        self._entries = OrderedDict()  # case -> (firmas, series leídas)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, case, requests):
+        ## Used for the cached series of the requests of a case, or None
+        ## Only the tabs that were shown are cached: the rest of the requests
+        ## are missing from the result and read by the caller
+        entry = self._entries.get(case)
+        if entry is None:
+            self.misses += 1
+            return None
+        if not self._valid(entry):
+            del self._entries[case]
+            self.misses += 1
+            return None
+        series = entry[1]
+        self._entries.move_to_end(case)
+        self.hits += 1
+        return {request: series[request] for request in requests if request in series}
+
+    def _valid(self, entry):
+        signatures, _ = entry
+        try:
+            return all(file_signature(file) == signature for file, signature in signatures.items())
+        except OSError:
+            return False
+
+    def put(self, case, requests, series):
+        ## Used for keep the series read for the requests of a case
+        ## Added to the ones already cached for the case while its files did not change
+        loaded = {request: series[request] for request in requests if request in series}
+        try:
+            signatures = {file: file_signature(file) for file in {request[0] for request in loaded}}
+        except OSError:
+            return
+        entry = self._entries.get(case)
+        if entry is not None and self._valid(entry):
+            signatures = {**entry[0], **signatures}
+            loaded = {**entry[1], **loaded}
+        self._entries[case] = (signatures, loaded)
+        self._entries.move_to_end(case)
+        # +2: the active case and the prefetched neighbors are kept besides the previous ones
+        while len(self._entries) > self.max_cases + 2:
+            self._entries.popitem(last=False)
+
+    def __contains__(self, case):
+        return case in self._entries
+
+    def clear(self):
+        self._entries.clear()
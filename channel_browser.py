@@ -0,0 +1,116 @@
+# Channel browser for files with tens of thousands of channels
+# The list is a model over the ids returned by ChannelIndex.search, the view
+# only asks for the rows on screen, and the search runs when typing pauses.
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QTimer
+from PyQt5.QtWidgets import (QAbstractItemView, QDialog, QDialogButtonBox, QDoubleSpinBox, QFormLayout,
+    QLabel, QLineEdit, QListView, QVBoxLayout)
+
+
+SEARCH_DELAY_MS = 150
+
+
+class ChannelListModel(QAbstractListModel):
+    def __init__(self, index, parent=None):
+        super().__init__(parent)
+        self.index_data = index
+        self.rows = index.search("")
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, model_index, role=Qt.DisplayRole):
+        if not model_index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        return self.index_data.names[self.rows[model_index.row()]]
+
+    def set_query(self, query):
+        self.beginResetModel()
+        self.rows = self.index_data.search(query)
+        self.endResetModel()
+
+    def channel(self, row):
+        return self.index_data.names[self.rows[row]]
+
+
+class ChannelBrowserDialog(QDialog):
+    # Search and multi-select of channels; returns the channels, the label of a
+    # single channel and the init time of the CSVs
+    def __init__(self, file_name, index, ask_init_time=False, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(f"Seleccionar canales - {file_name}")
+        self.resize(520, 600)
+
+        self.search = QLineEdit()
+        self.search.setPlaceholderText("Buscar (prefijo, texto o palabras: volt 1012)")
+        self.search.setClearButtonEnabled(True)
+        self.model = ChannelListModel(index, self)
+        self.view = QListView()
+        self.view.setModel(self.model)
+        self.view.setUniformItemSizes(True)  # no mide cada fila
+        self.view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.view.doubleClicked.connect(self.accept)
+        self.count_label = QLabel()
+
+        self.label_edit = QLineEdit()
+        self.label_edit.setPlaceholderText("Nombre del canal")
+        self.init_time = QDoubleSpinBox()
+        self.init_time.setDecimals(4)
+        self.init_time.setMaximum(1e6)
+
+        form = QFormLayout()
+        form.addRow("Etiqueta:", self.label_edit)
+        if ask_init_time:
+            form.addRow("Ignorar tiempo menor a:", self.init_time)
+        self.ask_init_time = ask_init_time
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.search)
+        layout.addWidget(self.view)
+        layout.addWidget(self.count_label)
+        layout.addLayout(form)
+        layout.addWidget(buttons)
+
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DELAY_MS)
+        self._search_timer.timeout.connect(self.apply_search)
+        self.search.textChanged.connect(self._search_timer.start)
+        self.search.returnPressed.connect(self.apply_search)
+        self.view.selectionModel().selectionChanged.connect(self.update_label_field)
+        self.update_count()
+        self.update_label_field()
+
+    def apply_search(self):
+        self._search_timer.stop()
+        self.model.set_query(self.search.text())
+        if self.model.rowCount() == 1:
+            self.view.setCurrentIndex(self.model.index(0))
+        self.update_count()
+        self.update_label_field()
+
+    def update_count(self):
+        self.count_label.setText(f"{self.model.rowCount()} de {len(self.model.index_data)} canales")
+
+    def update_label_field(self, *args):
+        # A custom label only makes sense for a single channel
+        single = len(self.selected_channels()) == 1
+        self.label_edit.setEnabled(single)
+        if not single:
+            self.label_edit.clear()
+
+    def selected_channels(self):
+        rows = sorted(index.row() for index in self.view.selectionModel().selectedRows())
+        return [self.model.channel(row) for row in rows]
+
+    def get_data(self):
+        ## Returns (channels, labels, init_time)
+        channels = self.selected_channels()
+        labels = list(channels)
+        if len(channels) == 1 and self.label_edit.text().strip():
+            labels = [self.label_edit.text().strip()]
+        init_time = self.init_time.value() if self.ask_init_time else None
+        return channels, labels, init_time
@@ -0,0 +1,100 @@
+# Searchable index of the channel names of a file
+# Big PSSE studies have tens of thousands of channels, so the names are indexed
+# once per file version: a sorted list of the lower-case names answers prefix
+# queries with bisect and an inverted index of name tokens answers queries
+# like "volt 1012" without scanning every name. Substrings inside a token fall
+# back to a linear scan, still cheap for 50k names.
+import bisect
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from data_store import file_signature
+
+
+INDEX_CACHE_SIZE = 32  # índices de archivos conservados en memoria
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+
+
+def _tokens(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+class ChannelIndex:
+    def __init__(self, names):
+        self.names = list(names)
+        self.lower = [name.lower() for name in self.names]
+        self._sorted = sorted(range(len(self.lower)), key=self.lower.__getitem__)
+        self._sorted_names = [self.lower[i] for i in self._sorted]
+        postings = {}
+        for i, name in enumerate(self.lower):
+            for token in set(_tokens(name)):
+                postings.setdefault(token, []).append(i)
+        self._tokens = sorted(postings)
+        self._postings = [np.array(postings[token], dtype=np.int64) for token in self._tokens]
+
+    def __len__(self):
+        return len(self.names)
+
+    def _prefix_range(self, keys, prefix):
+        start = bisect.bisect_left(keys, prefix)
+        end = bisect.bisect_left(keys, prefix + "\uffff")
+        return start, end
+
+    def _token_matches(self, token):
+        # Ids of the names with a token that starts with token
+        start, end = self._prefix_range(self._tokens, token)
+        if start == end:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(self._postings[start:end]))
+
+    def search(self, query):
+        ## Used for get the ids of the names that match query, best matches first
+        ## Order: names starting with query, names whose tokens start with every
+        ## query token, names containing query as a substring
+        query = query.strip().lower()
+        if not query:
+            return np.arange(len(self.names))
+
+        start, end = self._prefix_range(self._sorted_names, query)
+        prefix = self._sorted[start:end]
+
+        tokens = _tokens(query)
+        token_ids = None
+        for token in tokens:
+            matches = self._token_matches(token)
+            token_ids = matches if token_ids is None else np.intersect1d(token_ids, matches, assume_unique=True)
+            if not len(token_ids):
+                break
+        if token_ids is None:
+            token_ids = np.empty(0, dtype=np.int64)
+
+        substring = [i for i, name in enumerate(self.lower) if query in name]
+
+        ordered = dict.fromkeys(prefix)
+        ordered.update(dict.fromkeys(token_ids.tolist()))
+        ordered.update(dict.fromkeys(substring))
+        return np.fromiter(ordered, dtype=np.int64, count=len(ordered))
+
+
+_indexes = OrderedDict()  # firma del archivo -> ChannelIndex
+_indexes_lock = threading.Lock()
+
+
+def get_channel_index(filepath, list_channels):
+    ## Used for get the index of a file, built with list_channels(filepath) once
+    ## per version of the file
+    signature = file_signature(filepath)
+    with _indexes_lock:
+        index = _indexes.get(signature)
+        if index is not None:
+            _indexes.move_to_end(signature)
+            return index
+    index = ChannelIndex(list_channels(filepath))
+    with _indexes_lock:
+        _indexes[signature] = index
+        while len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
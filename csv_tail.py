@@ -0,0 +1,88 @@
+# Incremental reading of PSCAD CSVs that are still being written
+# CsvTail remembers the byte offset of the first row not parsed yet and on
+# every call parses only the complete rows appended after it.
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+
+TAIL_WINDOW = 64 * 1024  # bytes leídos antes del final para buscar la última fila completa
+ANCHOR_BYTES = 256  # bytes antes del offset comparados en cada lectura
+
+
+class CsvTail:
+    def __init__(self, filepath):
+        self.filepath = filepath
+        with open(filepath, "rb") as f:
+            self._read_header(f)
+
+    def _read_header(self, f):
+        # Also after a rewrite: the new simulation may have other columns
+        f.seek(0)
+        self.header_line = f.readline()
+        self.header_end = len(self.header_line)
+        self.header = list(pd.read_csv(io.BytesIO(self.header_line), nrows=0).columns)
+        self.offset = self.header_end
+        self.anchor = b""  # últimos bytes antes de offset, para detectar reescrituras
+
+    def _set_offset(self, f, offset):
+        # Remember the bytes right before the new offset: an append keeps them,
+        # a new simulation (same header, longer file) does not
+        self.offset = offset
+        start = max(offset - ANCHOR_BYTES, self.header_end)
+        f.seek(start)
+        self.anchor = f.read(offset - start)
+
+    def _rewritten(self, f, size):
+        if size < self.offset:
+            return True
+        f.seek(0)
+        if f.read(self.header_end) != self.header_line:
+            return True
+        f.seek(self.offset - len(self.anchor))
+        return f.read(len(self.anchor)) != self.anchor
+
+    def skip_to_end(self):
+        ## Used for start following from the current end of the file
+        ## Only a window before the end is read, whatever the size of the file
+        with open(self.filepath, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            window = TAIL_WINDOW
+            while True:
+                start = max(size - window, self.offset)
+                f.seek(start)
+                end = f.read(size - start).rfind(b"\n")
+                if end >= 0:
+                    self._set_offset(f, start + end + 1)
+                    return
+                if start == self.offset:
+                    return  # sin filas completas nuevas
+                window *= 2  # una fila más larga que la ventana
+
+    def read_new(self, columns):
+        ## Used for read the rows appended since the last call
+        ## Returns (time, {column: values}) of the new rows, or None if the file
+        ## was truncated or rewritten (a new simulation) and must be reloaded
+        time_col = self.header[0]
+        columns = [c for c in dict.fromkeys(columns) if c in self.header and c != time_col]
+        with open(self.filepath, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if self._rewritten(f, size):
+                self._read_header(f)
+                return None
+            if size == self.offset:
+                return np.empty(0), {column: np.empty(0) for column in columns}
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+            # Only complete rows, the last one may still be being written
+            end = data.rfind(b"\n") + 1
+            if end == 0:
+                return np.empty(0), {column: np.empty(0) for column in columns}
+            self._set_offset(f, self.offset + end)
+
+        df = pd.read_csv(io.BytesIO(data[:end]), header=None, names=self.header,
+                         usecols=[time_col] + columns)
+        return (df[time_col].to_numpy(dtype=float),
+                {column: df[column].to_numpy(dtype=float) for column in columns})
@@ -0,0 +1,138 @@
+# Process-wide store of parsed simulation files
+# Each file is parsed once and kept in memory while its (path, mtime, size)
+# signature does not change. Entries are evicted in LRU order once the
+# memory budget is exceeded.
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+DEFAULT_MEMORY_BUDGET = 2 * 1024 ** 3  # bytes
+
+
+def file_signature(filepath):
+    # Key used to detect changes of a file on disk
+    st = os.stat(filepath)
+    return (os.path.normcase(os.path.abspath(filepath)), st.st_mtime_ns, st.st_size)
+
+
+class FileData:
+    # Parsed content of a simulation file: time vector and channels by name
+    def __init__(self, time, channels, mapped=False):
+        self.time = _readonly(time)
+        self.channels = {name: _readonly(values) for name, values in channels.items()}
+        self.mapped = mapped  # arrays backed by a memory-mapped sidecar
+
+    @property
+    def nbytes(self):
+        # Memory-mapped data is paged in by the OS and does not count for the budget
+        if self.mapped:
+            return 0
+        return self.time.nbytes + sum(values.nbytes for values in self.channels.values())
+
+    def channel_names(self):
+        return list(self.channels.keys())
+
+    def get(self, channel_name):
+        # Returns (time, values) or None if the channel does not exist
+        values = self.channels.get(channel_name)
+        if values is None:
+            return None
+        return self.time, values
+
+
+def _readonly(values):
+    # Shared arrays must not be modified by the plots that use them
+    arr = np.asarray(values)
+    if arr.dtype.kind != 'f':
+        arr = arr.astype(float)
+    else:
+        arr = arr.view(np.ndarray)  # view without copying, also for memmaps
+    arr.setflags(write=False)
+    return arr
+
+
+class DataStore:
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.memory_budget = memory_budget
+        self._entries = OrderedDict()  # path -> (signature, FileData)
+        self._loading = {}  # path -> lock, avoids parsing the same file twice
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, filepath, loader):
+        # Returns the FileData of filepath, calling loader(filepath) only if
+        # the file is not cached or changed on disk
+        signature = file_signature(filepath)
+        key = signature[0]
+        with self._lock:
+            data = self._lookup(key, signature)
+            if data is not None:
+                return data
+            path_lock = self._loading.setdefault(key, threading.Lock())
+
+        with path_lock:
+            with self._lock:
+                data = self._lookup(key, signature)
+                if data is not None:
+                    return data
+                self.misses += 1
+            try:
+                data = loader(filepath)
+                with self._lock:
+                    self._entries[key] = (signature, data)
+                    self._entries.move_to_end(key)
+                    self._evict()
+            finally:
+                # Also when the loader raised: the next call tries again
+                with self._lock:
+                    self._loading.pop(key, None)
+        return data
+
+    def _lookup(self, key, signature):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] != signature:
+            # File changed on disk
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def _evict(self):
+        # Drop least recently used files until the budget is met, always
+        # keeping the most recent one
+        while len(self._entries) > 1 and self.memory_used() > self.memory_budget:
+            self._entries.popitem(last=False)
+
+    def is_cached(self, filepath):
+        # True if filepath is in memory and did not change on disk
+        try:
+            signature = file_signature(filepath)
+        except OSError:
+            return False
+        with self._lock:
+            entry = self._entries.get(signature[0])
+            return entry is not None and entry[0] == signature
+
+    def memory_used(self):
+        with self._lock:
+            return sum(data.nbytes for _, data in self._entries.values())
+
+    def invalidate(self, filepath):
+        key = os.path.normcase(os.path.abspath(filepath))
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Store shared by the whole application
+DATA_STORE = DataStore()
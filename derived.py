@@ -0,0 +1,227 @@
+# Derived channels: traces computed from other channels with an expression
+# The expression uses one variable per input channel (a, b, ...) and NumPy
+# functions, e.g. "a * b", "a / 230e3", "a - b", "rms(a, 0.02)". Inputs with
+# different time vectors are resampled onto the densest one in the time range
+# they share. Results are memoized by expression and input file versions.
+# A derived line of a template has "expression" and "inputs" instead of
+# "file" and "channel": {"a": {"file": ..., "channel": ..., "init_time": ...}},
+# an input may have a "time_offset" (alignment) added to its time vector.
+import ast
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from alignment import AlignmentError, densest_time_base
+from data_store import file_signature
+from profiling import PROFILER
+
+
+DERIVED_CACHE_SIZE = 64  # resultados conservados en memoria
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+def _window_integral(t, y, window):
+    # Integral of y over [t - window, t] for every t, with the trapezoid rule
+    cumulative = np.concatenate(([0.0], np.cumsum(np.diff(t) * (y[1:] + y[:-1]) / 2)))
+    start = np.interp(t - window, t, cumulative, left=0.0)
+    span = np.minimum(t - t[0], window)
+    return cumulative - start, span
+
+
+def _rms(t):
+    def rms(y, window):
+        integral, span = _window_integral(t, np.asarray(y, dtype=float) ** 2, window)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(span > 0, np.sqrt(np.maximum(integral, 0) / span), np.abs(y))
+    return rms
+
+
+def _avg(t):
+    def avg(y, window):
+        y = np.asarray(y, dtype=float)
+        integral, span = _window_integral(t, y, window)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(span > 0, integral / span, y)
+    return avg
+
+
+def _deriv(t):
+    def deriv(y):
+        return np.gradient(np.asarray(y, dtype=float), t) if len(t) > 1 else np.zeros_like(t)
+    return deriv
+
+
+FUNCTIONS = {
+    'abs': np.abs, 'sqrt': np.sqrt, 'exp': np.exp, 'log': np.log, 'log10': np.log10,
+    'sin': np.sin, 'cos': np.cos, 'tan': np.tan, 'arctan2': np.arctan2,
+    'degrees': np.degrees, 'radians': np.radians, 'minimum': np.minimum, 'maximum': np.maximum,
+    'where': np.where, 'clip': np.clip,
+}
+TIME_FUNCTIONS = {'rms': _rms, 'avg': _avg, 'deriv': _deriv}  # necesitan la base de tiempo
+CONSTANTS = {'pi': np.pi}
+_ALLOWED_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
+                  ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.USub, ast.UAdd,
+                  ast.Compare, ast.Gt, ast.GtE, ast.Lt, ast.LtE, ast.Eq, ast.NotEq)
+
+
+def parse_expression(expression):
+    ## Used for validate an expression and get its variables (sorted)
+    ## Only arithmetic, comparisons, numbers and the known functions are accepted
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ExpressionError(f"Expresión inválida: {e.msg}")
+    names = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ExpressionError(f"Operación no permitida: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ExpressionError(f"Constante no permitida: {node.value!r}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS and node.func.id not in TIME_FUNCTIONS:
+                raise ExpressionError(f"Función desconocida: {ast.unparse(node.func)}")
+            if node.keywords:
+                raise ExpressionError("Las funciones no aceptan argumentos con nombre")
+        elif isinstance(node, ast.Name) and node.id not in FUNCTIONS and node.id not in TIME_FUNCTIONS:
+            if node.id not in CONSTANTS:
+                names.add(node.id)
+    # Integer constants become floats: 9**9**7 overflows at once instead of
+    # building a huge integer in the GUI thread (templates are shared files)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant) and type(node.value) is int:
+            node.value = float(node.value)
+    return compile(tree, '<expresión>', 'eval'), sorted(names)
+
+
+def evaluate(expression, values_by_name):
+    ## Used for evaluate an expression over {variable: (time, values)}
+    ## Returns (time, values) on the common time base of the variables
+    code, names = parse_expression(expression)
+    missing = [name for name in names if name not in values_by_name]
+    if missing:
+        raise ExpressionError(f"Variables sin canal: {', '.join(missing)}")
+    if not names:
+        raise ExpressionError("La expresión debe usar al menos un canal")
+    try:
+        time = densest_time_base([values_by_name[name][0] for name in names])
+    except AlignmentError as e:
+        raise ExpressionError(str(e))
+    namespace = dict(FUNCTIONS)
+    namespace.update(CONSTANTS)
+    namespace.update({name: func(time) for name, func in TIME_FUNCTIONS.items()})
+    for name in names:
+        t, y = values_by_name[name]
+        y = np.asarray(y, dtype=float)
+        namespace[name] = y if t is time else np.interp(time, np.asarray(t, dtype=float), y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        try:
+            result = eval(code, {'__builtins__': {}}, namespace)
+        except Exception as e:
+            raise ExpressionError(f"Error evaluando '{expression}': {e}")
+    result = np.broadcast_to(np.asarray(result, dtype=float), time.shape).copy()
+    result.setflags(write=False)
+    return time, result
+
+
+def input_request(spec):
+    return (spec["file"], spec["channel"], spec.get("init_time"))
+
+
+def line_requests(line_info):
+    ## Used for get the (file, channel, init_time) requests a template line needs
+    if line_info.get("expression"):
+        return [input_request(spec) for spec in line_info.get("inputs", {}).values()
+                if spec.get("file") and spec.get("channel")]
+    if line_info.get("file") and line_info.get("channel"):
+        return [(line_info["file"], line_info["channel"], line_info.get("init_time"))]
+    return []
+
+
+def line_data_key(line_info):
+    ## Used for a hashable key of the data of a template line and the version
+    ## of its files; None when a file cannot be read
+    source = {name: value for name, value in line_info.items()
+              if name in ("file", "channel", "init_time", "expression", "inputs", "time_offset", "multiplier")}
+    try:
+        versions = tuple(file_signature(request[0]) for request in line_requests(line_info))
+    except OSError:
+        return None
+    return json.dumps(source, sort_keys=True, default=str), versions
+
+
+class DerivedCache:
+    # LRU of evaluated expressions, keyed by the expression and the version
+    # (signature) of the file of every input
+    def __init__(self, max_entries=DERIVED_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, expression, inputs):
+        try:
+            return (expression.strip(), tuple(sorted(
+                (name, input_request(spec), spec.get("time_offset", 0.0), file_signature(spec["file"]))
+                for name, spec in inputs.items())))
+        except OSError:
+            return None
+
+    def evaluate(self, expression, inputs, series):
+        ## Used for evaluate a derived line with the series already read
+        ## inputs: {variable: {"file", "channel", "init_time"}}
+        ## series: {(file, channel, init_time): (time, values)}
+        key = self._key(expression, inputs)
+        with self._lock:
+            if key is not None and key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        values_by_name = {}
+        for name, spec in inputs.items():
+            request = input_request(spec)
+            if request not in series:
+                raise ExpressionError(f"No se pudo leer {spec['channel']} de {spec['file']}")
+            time, values = series[request]
+            if spec.get("time_offset"):
+                time = np.asarray(time, dtype=float) + spec["time_offset"]
+            values_by_name[name] = (time, values)
+        with PROFILER.span("expresión", "derivados", expression.strip()):
+            result = evaluate(expression, values_by_name)
+        if key is not None:
+            with self._lock:
+                self._entries[key] = result
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return result
+
+    def release_file(self, filepath):
+        ## Used for drop the results that use a file removed from the viewer
+        with self._lock:
+            for key in [key for key in self._entries if any(item[1][0] == filepath for item in key[1])]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+DERIVED_CACHE = DerivedCache()
+
+
+def series_for_line(line_info, series):
+    ## Used for get the (time, values) of a template line, plain or derived
+    ## Returns None when the data is not available
+    if line_info.get("expression"):
+        try:
+            return DERIVED_CACHE.evaluate(line_info["expression"], line_info.get("inputs", {}), series)
+        except ExpressionError as e:
+            print(f"[WARN] {e}")
+            return None
+    return series.get((line_info.get("file"), line_info.get("channel"), line_info.get("init_time")))
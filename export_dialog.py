@@ -0,0 +1,88 @@
+# Options of the export of the plots
+# Output folder, formats (one file per tab and format), an optional multi-page
+# PDF report with every tab, resolution and page size.
+import os
+
+from PyQt5.QtWidgets import (QCheckBox, QComboBox, QDialog, QDialogButtonBox, QFileDialog, QFormLayout,
+    QHBoxLayout, QLineEdit, QMessageBox, QPushButton, QSpinBox)
+
+from render import DEFAULT_EXPORT, EXPORT_FORMATS, PAGE_SIZES, REPORT_NAME, ExportOptions
+
+
+AUTO_PAGE = "Automático (10 × 4 pulgadas por gráfico)"
+
+
+class ExportDialog(QDialog):
+    def __init__(self, directory="", options=DEFAULT_EXPORT, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Exportar gráficos")
+
+        self.directory_edit = QLineEdit(directory)
+        btn_browse = QPushButton("...")
+        btn_browse.setMaximumWidth(30)
+        btn_browse.clicked.connect(self.browse)
+        directory_row = QHBoxLayout()
+        directory_row.addWidget(self.directory_edit)
+        directory_row.addWidget(btn_browse)
+
+        self.format_checks = {}
+        formats_row = QHBoxLayout()
+        for fmt in EXPORT_FORMATS:
+            check = QCheckBox(fmt.upper())
+            check.setChecked(fmt in options.formats)
+            self.format_checks[fmt] = check
+            formats_row.addWidget(check)
+        self.report_check = QCheckBox(f"Informe PDF de varias páginas ({REPORT_NAME})")
+        self.report_check.setChecked(options.report)
+
+        self.dpi_spin = QSpinBox()
+        self.dpi_spin.setRange(50, 600)
+        self.dpi_spin.setValue(options.dpi)
+        self.page_combo = QComboBox()
+        self.page_combo.addItem(AUTO_PAGE, None)
+        for name in PAGE_SIZES:
+            self.page_combo.addItem(name, name)
+        self.page_combo.setCurrentIndex(max(self.page_combo.findData(options.page_size), 0))
+        self.landscape_check = QCheckBox("Horizontal")
+        self.landscape_check.setChecked(options.landscape)
+        self.page_combo.currentIndexChanged.connect(
+            lambda _: self.landscape_check.setEnabled(self.page_combo.currentData() is not None))
+        self.landscape_check.setEnabled(options.page_size is not None)
+        page_row = QHBoxLayout()
+        page_row.addWidget(self.page_combo)
+        page_row.addWidget(self.landscape_check)
+
+        layout = QFormLayout(self)
+        layout.addRow("Carpeta:", directory_row)
+        layout.addRow("Un archivo por pestaña:", formats_row)
+        layout.addRow(self.report_check)
+        layout.addRow("Resolución (DPI):", self.dpi_spin)
+        layout.addRow("Página:", page_row)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.validate_and_accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def browse(self):
+        directory = QFileDialog.getExistingDirectory(self, "Seleccionar carpeta para exportar",
+                                                     self.directory_edit.text())
+        if directory:
+            self.directory_edit.setText(directory)
+
+    def validate_and_accept(self):
+        directory, options = self.get_data()
+        if not directory:
+            QMessageBox.warning(self, "Exportar", "Seleccione la carpeta de destino.")
+            return
+        if not options.formats and not options.report:
+            QMessageBox.warning(self, "Exportar", "Seleccione al menos un formato o el informe PDF.")
+            return
+        self.accept()
+
+    def get_data(self):
+        ## Used for (folder, ExportOptions) chosen in the dialog
+        page_size = self.page_combo.currentData()
+        options = ExportOptions(tuple(fmt for fmt, check in self.format_checks.items() if check.isChecked()),
+                                self.dpi_spin.value(), page_size, page_size is not None and self.landscape_check.isChecked(),
+                                self.report_check.isChecked())
+        return os.path.normpath(self.directory_edit.text()) if self.directory_edit.text().strip() else "", options
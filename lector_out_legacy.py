@@ -1,7 +1,26 @@
 # -*- coding: utf-8 -*-
+# Lector de archivos .out de PSSE v34 (Python 2.7)
+#
+# Uso:
+#   lector_out_legacy.py <archivo.out>                 -> lista los canales (JSON)
+#   lector_out_legacy.py <archivo.out> <nombre_canal>  -> datos del canal (JSON)
+#   lector_out_legacy.py <archivo.out> <canal1> <canal2> ...  -> datos de varios canales
+#   lector_out_legacy.py --server                      -> proceso persistente
+#
+# Protocolo del modo servidor (stdin/stdout binarios):
+#   cada mensaje es un entero de 4 bytes big-endian con la longitud seguido
+#   del contenido. Las peticiones son JSON:
+#     {"cmd": "channels", "file": ...}
+#     {"cmd": "data", "file": ..., "channels": [...]}
+#     {"cmd": "quit"}
+#   Cada respuesta es un mensaje JSON {"ok": ...}. Para "data" le sigue un
+#   segundo mensaje con los doubles little-endian del tiempo y de cada canal
+#   encontrado, uno detrás de otro ("length" valores cada uno).
 import sys
 import json
 import os
+import struct
+from array import array
 
 sys.path.append(r"C:\Program Files (x86)\PTI\PSSE34\PSSPY27")
 os.environ['PATH'] += ";" + r"C:\Program Files (x86)\PTI\PSSE34\PSSPY27"
@@ -9,20 +28,138 @@ os.environ['PATH'] += ";" + r"C:\Program Files (x86)\PTI\PSSE34\PSSPY27"
 import psse34
 import dyntools
 
-if len(sys.argv) < 2:
-    print("Uso: lector_out_legacy.py <archivo.out> [<nombre_canal>]")
-    sys.exit(1)
 
-filepath = sys.argv[1]
-chnf = dyntools.CHNF(filepath)
-_, ch_id, ch_data = chnf.get_data()
+def read_out(filepath):
+    chnf = dyntools.CHNF(filepath)
+    _, ch_id, ch_data = chnf.get_data()
+    return ch_id, ch_data
 
-# Solo listar canales si no se especificó canal específico
-if len(sys.argv) == 2:
-    print(json.dumps({"canales": ch_id}))
-else:
-    channel_name = sys.argv[2]
+
+def build_name_index(ch_id):
+    # nombre -> clave de ch_data, se conserva el primer canal con cada nombre
+    index = {}
     for key, name in ch_id.items():
-        if name == channel_name:
+        if key != 'time' and name not in index:
+            index[name] = key
+    return index
+
+
+def to_bytes(values):
+    data = array('d', values)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return data.tobytes() if hasattr(data, 'tobytes') else data.tostring()
+
+
+def read_exact(stream, size):
+    chunks = []
+    while size > 0:
+        chunk = stream.read(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def read_message(stream):
+    header = read_exact(stream, 4)
+    if header is None:
+        return None
+    size = struct.unpack('>I', header)[0]
+    return read_exact(stream, size)
+
+
+def write_message(stream, payload):
+    stream.write(struct.pack('>I', len(payload)))
+    stream.write(payload)
+
+
+def write_json(stream, obj):
+    write_message(stream, json.dumps(obj).encode('utf-8'))
+
+
+def serve():
+    # stdout queda reservado para el protocolo; cualquier print de PSSE va a stderr
+    if sys.platform == 'win32':
+        import msvcrt
+        msvcrt.setmode(sys.stdin.fileno(), os.O_BINARY)
+        msvcrt.setmode(sys.stdout.fileno(), os.O_BINARY)
+    stdin = os.fdopen(os.dup(sys.stdin.fileno()), 'rb')
+    stdout = os.fdopen(os.dup(sys.stdout.fileno()), 'wb')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+
+    loaded = {}  # archivo -> (mtime, ch_id, ch_data, índice), solo el último archivo
+
+    def get_file(filepath):
+        mtime = os.path.getmtime(filepath)
+        entry = loaded.get(filepath)
+        if entry is None or entry[0] != mtime:
+            loaded.clear()
+            ch_id, ch_data = read_out(filepath)
+            entry = (mtime, ch_id, ch_data, build_name_index(ch_id))
+            loaded[filepath] = entry
+        return entry[1], entry[2], entry[3]
+
+    while True:
+        message = read_message(stdin)
+        if message is None:
+            break
+        try:
+            request = json.loads(message.decode('utf-8'))
+        except ValueError as e:
+            write_json(stdout, {"ok": False, "error": str(e)})
+            stdout.flush()
+            continue
+        cmd = request.get("cmd")
+        if cmd == "quit":
+            break
+        try:
+            ch_id, ch_data, name_index = get_file(request["file"])
+            if cmd == "channels":
+                write_json(stdout, {"ok": True, "canales": dict((str(k), v) for k, v in ch_id.items() if k != 'time')})
+            elif cmd == "data":
+                found = []
+                keys = []
+                for channel_name in request.get("channels", []):
+                    key = name_index.get(channel_name)
+                    if key is not None:
+                        found.append(channel_name)
+                        keys.append(key)
+                time = ch_data['time']
+                write_json(stdout, {"ok": True, "length": len(time), "channels": found})
+                payload = [to_bytes(time)] + [to_bytes(ch_data[key]) for key in keys]
+                write_message(stdout, b''.join(payload))
+            else:
+                write_json(stdout, {"ok": False, "error": "comando desconocido: %s" % cmd})
+        except Exception as e:
+            write_json(stdout, {"ok": False, "error": str(e)})
+        stdout.flush()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Uso: lector_out_legacy.py <archivo.out> [<nombre_canal> ...] | --server")
+        sys.exit(1)
+
+    if sys.argv[1] == '--server':
+        serve()
+        sys.exit(0)
+
+    filepath = sys.argv[1]
+    ch_id, ch_data = read_out(filepath)
+
+    # Solo listar canales si no se especificó canal específico
+    if len(sys.argv) == 2:
+        print(json.dumps({"canales": ch_id}))
+    elif len(sys.argv) == 3:
+        channel_name = sys.argv[2]
+        key = build_name_index(ch_id).get(channel_name)
+        if key is not None:
             print(json.dumps({"time": ch_data['time'], "valores": ch_data[key]}))
-            break
\ No newline at end of file
+    else:
+        # Varios canales con una sola lectura: {"time": [...], "valores": {canal: [...]}}
+        name_index = build_name_index(ch_id)
+        values = dict((name, ch_data[name_index[name]]) for name in sys.argv[2:] if name in name_index)
+        print(json.dumps({"time": ch_data['time'], "valores": values}))
@@ -0,0 +1,101 @@
+# Client of the persistent Python 2.7 reader (lector_out_legacy.py --server)
+# A single worker process is kept alive so every file is parsed once by the
+# legacy dyntools and many channels are answered without new interpreters.
+import atexit
+import json
+import os
+import struct
+import subprocess
+import threading
+
+import numpy as np
+
+
+LEGACY_PYTHON = os.environ.get("VIEWER_PY27", "C:/Python27/python.exe")
+LEGACY_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lector_out_legacy.py")
+
+
+class LegacyWorkerError(Exception):
+    pass
+
+
+class LegacyOutWorker:
+    def __init__(self, python=LEGACY_PYTHON, script=LEGACY_SCRIPT):
+        self.python = python
+        self.script = script
+        self._process = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._process is not None and self._process.poll() is None:
+            return
+        self._process = subprocess.Popen(
+            [self.python, self.script, "--server"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=None,  # los mensajes de PSSE se ven en la consola
+        )
+
+    def _read_exact(self, size):
+        data = self._process.stdout.read(size)
+        if data is None or len(data) != size:
+            raise LegacyWorkerError("el proceso Python 2.7 terminó inesperadamente")
+        return data
+
+    def _send(self, request):
+        payload = json.dumps(request).encode("utf-8")
+        self._process.stdin.write(struct.pack(">I", len(payload)) + payload)
+        self._process.stdin.flush()
+
+    def _receive(self):
+        size = struct.unpack(">I", self._read_exact(4))[0]
+        return self._read_exact(size)
+
+    def _request(self, request):
+        # Sends a request and returns the JSON header and the raw payload (if any)
+        with self._lock:
+            try:
+                self._ensure_started()
+                self._send(request)
+                header = json.loads(self._receive().decode("utf-8"))
+                payload = None
+                if header.get("ok") and request["cmd"] == "data":
+                    payload = self._receive()
+            except (OSError, ValueError, LegacyWorkerError) as e:
+                self.close()
+                raise LegacyWorkerError(str(e))
+        if not header.get("ok"):
+            raise LegacyWorkerError(header.get("error", "error desconocido"))
+        return header, payload
+
+    def get_channels(self, filepath):
+        ## Used for list the channels of a .out with the legacy reader
+        header, _ = self._request({"cmd": "channels", "file": os.path.abspath(filepath)})
+        return list(header["canales"].values())
+
+    def get_data(self, filepath, channel_names):
+        ## Used for read several channels of a .out with the legacy reader
+        ## Returns (time, {channel: values}) with the channels that were found
+        header, payload = self._request({"cmd": "data", "file": os.path.abspath(filepath),
+                                         "channels": list(channel_names)})
+        length = header["length"]
+        arrays = np.frombuffer(payload, dtype="<f8").reshape(len(header["channels"]) + 1, length)
+        return arrays[0], dict(zip(header["channels"], arrays[1:]))
+
+    def close(self):
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            if process.poll() is None:
+                payload = json.dumps({"cmd": "quit"}).encode("utf-8")
+                process.stdin.write(struct.pack(">I", len(payload)) + payload)
+                process.stdin.close()
+                process.wait(timeout=5)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            process.kill()
+
+
+# Worker compartido por toda la aplicación, se inicia en la primera petición
+LEGACY_WORKER = LegacyOutWorker()
+atexit.register(LEGACY_WORKER.close)
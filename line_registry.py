@@ -0,0 +1,61 @@
+# Index of the plotted lines by the series they show
+# Every line is registered with the plot that draws it under the (file,
+# channel) of its series, or of every input for derived lines. Removing,
+# reloading or following a file then finds its lines and plots directly
+# instead of walking every tab, plot and line. Lines and plots are held
+# weakly: a line that is garbage collected leaves the index by itself.
+import weakref
+
+
+class LineRegistry:
+    def __init__(self):
+        self._index = {}  # archivo -> {canal: {línea: referencia débil al gráfico}}
+        self._keys = weakref.WeakKeyDictionary()  # línea -> [(archivo, canal)]
+
+    def register(self, line, plot, requests):
+        ## Used for index a line of plot under its (file, channel, init_time) requests
+        self.unregister(line)
+        keys = list(dict.fromkeys((request[0], request[1]) for request in requests))
+        for file, channel in keys:
+            channels = self._index.setdefault(file, {})
+            channels.setdefault(channel, weakref.WeakKeyDictionary())[line] = weakref.ref(plot)
+        if keys:
+            self._keys[line] = keys
+
+    def unregister(self, line):
+        for file, channel in self._keys.pop(line, ()):
+            channels = self._index.get(file, {})
+            lines = channels.get(channel)
+            if lines is not None:
+                lines.pop(line, None)
+                if not lines:
+                    del channels[channel]
+            if not channels:
+                self._index.pop(file, None)
+
+    def lines_of(self, file, channel=None):
+        ## Used for the [(plot, line)] that show a file, or one of its channels
+        channels = self._index.get(file, {})
+        groups = [channels.get(channel, {})] if channel is not None else list(channels.values())
+        found = {}
+        for lines in groups:
+            for line, plot_ref in list(lines.items()):
+                plot = plot_ref()
+                if plot is not None:
+                    found[line] = plot
+        return [(plot, line) for line, plot in found.items()]
+
+    def plots_of(self, files):
+        ## Used for {plot: [lines]} of the lines that use any of files, each line once
+        plots = {}
+        seen = set()
+        for file in dict.fromkeys(files):
+            for plot, line in self.lines_of(file):
+                if id(line) not in seen:
+                    seen.add(id(line))
+                    plots.setdefault(plot, []).append(line)
+        return plots
+
+
+# Registry shared by every plot of the window
+LINE_REGISTRY = LineRegistry()
@@ -0,0 +1,115 @@
+# Background loading of simulation files
+# Reading tasks run in a QThreadPool so the GUI never waits for dyntools or
+# pandas. Each job reports progress per task and can be cancelled; results
+# are delivered in the GUI thread as soon as every task finishes.
+import os
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal, pyqtSlot
+
+
+class _TaskSignals(QObject):
+    done = pyqtSignal(object, object, object)  # key, result, error
+
+
+class _Task(QRunnable):
+    def __init__(self, signals, key, func, cancelled):
+        super().__init__()
+        self.signals = signals
+        self.key = key
+        self.func = func
+        self.cancelled = cancelled
+
+    def run(self):
+        if self.cancelled.is_set():
+            self.signals.done.emit(self.key, None, None)
+            return
+        try:
+            result = self.func()
+            self.signals.done.emit(self.key, result, None)
+        except Exception as e:
+            self.signals.done.emit(self.key, None, str(e))
+
+
+class LoadJob(QObject):
+    result_ready = pyqtSignal(object, object)  # key, result
+    progress = pyqtSignal(int, int, str)  # tareas terminadas, total, etiqueta
+    finished = pyqtSignal(bool)  # True si fue cancelado
+
+    def __init__(self, description, tasks, parent=None):
+        super().__init__(parent)
+        self.description = description
+        self.labels = {key: label for key, label, _ in tasks}
+        self.total = len(tasks)
+        self.done_count = 0
+        self._cancelled = threading.Event()
+        # Worker threads emit here; the connection queues the call to the GUI
+        # thread, where the public signals are re-emitted
+        self._signals = _TaskSignals()
+        self._signals.done.connect(self._on_task_done)
+        self._runnables = [_Task(self._signals, key, func, self._cancelled) for key, _, func in tasks]
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @pyqtSlot(object, object, object)
+    def _on_task_done(self, key, result, error):
+        self.done_count += 1
+        if error is not None:
+            print(f"[ERROR] Falló la carga de {self.labels.get(key, key)}: {error}")
+        elif result is not None and not self.cancelled:
+            self.result_ready.emit(key, result)
+        self.progress.emit(self.done_count, self.total, self.labels.get(key, str(key)))
+        if self.done_count == self.total:
+            self.finished.emit(self.cancelled)
+
+
+class BackgroundLoader(QObject):
+    job_started = pyqtSignal(object)
+    job_progress = pyqtSignal(object, int, int, str)
+    job_finished = pyqtSignal(object, bool)
+
+    def __init__(self, max_threads=None, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads or os.cpu_count() or 1)
+        self.jobs = []
+
+    def submit(self, description, tasks):
+        ## Used for run tasks [(key, label, callable)] in the thread pool
+        ## Connect to the returned job before returning to the event loop
+        job = LoadJob(description, tasks, self)
+        self.jobs.append(job)
+        job.progress.connect(lambda done, total, label: self.job_progress.emit(job, done, total, label))
+        job.finished.connect(lambda cancelled: self._on_job_finished(job, cancelled))
+        self.job_started.emit(job)
+        if not tasks:
+            QTimer.singleShot(0, lambda: job.finished.emit(False))
+        for runnable in job._runnables:
+            self.pool.start(runnable)
+        return job
+
+    def _on_job_finished(self, job, cancelled):
+        if job in self.jobs:
+            self.jobs.remove(job)
+        self.job_finished.emit(job, cancelled)
+        job.deleteLater()
+
+    def cancel_all(self):
+        for job in self.jobs:
+            job.cancel()
+
+
+_loader = None
+
+
+def get_background_loader():
+    # Created on first use, a QApplication must exist
+    global _loader
+    if _loader is None:
+        _loader = BackgroundLoader()
+    return _loader
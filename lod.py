@@ -0,0 +1,182 @@
+# Level of detail for plotted traces
+# Each trace keeps its full resolution arrays and a lazily built pyramid of
+# min/max envelopes. For the visible x window only ~2 points per pixel are
+# handed to matplotlib, taking the min and the max of every bucket so spikes
+# stay visible. When the window holds few samples the raw data is used.
+import numpy as np
+
+
+LOD_BASE_BUCKET = 16  # samples per bucket in the finest level
+LOD_MIN_BUCKETS = 256  # the coarsest level keeps at least this many buckets
+
+
+class _Buffer:
+    # Growable 1-D array with amortized O(1) appends
+    def __init__(self, values, dtype=None):
+        self.data = np.array(values, dtype=dtype)
+        self.n = len(self.data)
+
+    def view(self):
+        return self.data[:self.n]
+
+    def truncate_extend(self, start, values):
+        # Keeps data[:start] and writes values after it
+        need = start + len(values)
+        if need > len(self.data):
+            grown = np.empty(max(need, 2 * len(self.data), 1024), dtype=self.data.dtype)
+            grown[:start] = self.data[:start]
+            self.data = grown
+        self.data[start:need] = values
+        self.n = need
+
+
+def _bucket_extremes(y, start, bucket, idx_type):
+    # Index of the min and max of every bucket of y[start:], start is a bucket edge
+    part = y[start:]
+    full = len(part) // bucket
+    blocks = part[:full * bucket].reshape(full, bucket)
+    offsets = start + np.arange(full, dtype=idx_type) * bucket
+    imin = blocks.argmin(axis=1).astype(idx_type) + offsets
+    imax = blocks.argmax(axis=1).astype(idx_type) + offsets
+    if len(part) % bucket:
+        tail = part[full * bucket:]
+        imin = np.append(imin, idx_type(start + full * bucket + tail.argmin()))
+        imax = np.append(imax, idx_type(start + full * bucket + tail.argmax()))
+    return imin, imax
+
+
+def _merge_pairs(y, imin, imax):
+    # Next level of the pyramid: extremes of every pair of buckets
+    pairs = len(imin) // 2
+    a_min, b_min = imin[0:2 * pairs:2], imin[1:2 * pairs:2]
+    a_max, b_max = imax[0:2 * pairs:2], imax[1:2 * pairs:2]
+    new_min = np.where(y[b_min] < y[a_min], b_min, a_min)
+    new_max = np.where(y[b_max] > y[a_max], b_max, a_max)
+    if len(imin) % 2:
+        new_min = np.append(new_min, imin[-1])
+        new_max = np.append(new_max, imax[-1])
+    return new_min, new_max
+
+
+class TraceLOD:
+    def __init__(self, x, y, scale=1.0, offset=0.0):
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+        self.scale = scale  # multiplicador aplicado al entregar los datos
+        self.offset = offset  # desplazamiento de tiempo (alineación) aplicado al entregar
+        self._levels = None
+        self._buffers = None  # (x, y) propios, solo si se agregan datos
+        n = min(len(self.x), len(self.y))
+        self.x, self.y = self.x[:n], self.y[:n]
+        # Only monotonic time vectors can be windowed with searchsorted
+        self.monotonic = n < 2 or bool(np.all(np.diff(self.x) >= 0))
+
+    def __len__(self):
+        return len(self.x)
+
+    def _build(self):
+        # Level k holds, for buckets of LOD_BASE_BUCKET * 2**k samples, the
+        # index of the minimum and of the maximum of each bucket
+        idx_type = np.int32 if len(self.y) < 2 ** 31 else np.int64
+        imin, imax = _bucket_extremes(self.y, 0, LOD_BASE_BUCKET, idx_type)
+        self._levels = [(_Buffer(imin), _Buffer(imax))]
+        self._add_levels()
+
+    def _add_levels(self):
+        imin, imax = (buf.view() for buf in self._levels[-1])
+        while len(imin) > 2 * LOD_MIN_BUCKETS:
+            imin, imax = _merge_pairs(self.y, imin, imax)
+            self._levels.append((_Buffer(imin), _Buffer(imax)))
+
+    def extend(self, x, y):
+        ## Used for append samples at the end of the trace (live follow)
+        ## Only the last bucket of every level and the new ones are recomputed
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        count = min(len(x), len(y))
+        if count == 0:
+            return
+        x, y = x[:count], y[:count]
+        old_n = len(self.x)
+        if old_n and x[0] < self.x[-1] or count > 1 and not np.all(np.diff(x) >= 0):
+            self.monotonic = False
+        if self._buffers is None:
+            self._buffers = (_Buffer(self.x, dtype=float), _Buffer(self.y, dtype=float))
+        xbuf, ybuf = self._buffers
+        xbuf.truncate_extend(old_n, x)
+        ybuf.truncate_extend(old_n, y)
+        self.x, self.y = xbuf.view(), ybuf.view()
+
+        if self._levels is None:
+            return
+        idx_type = self._levels[0][0].data.dtype.type
+        if len(self.y) >= np.iinfo(idx_type).max:
+            self._levels = None  # se reconstruye con índices de 64 bits
+            return
+        # Level 0 from the bucket that held the old last sample
+        j = old_n // LOD_BASE_BUCKET
+        imin, imax = _bucket_extremes(self.y, j * LOD_BASE_BUCKET, LOD_BASE_BUCKET, idx_type)
+        self._levels[0][0].truncate_extend(j, imin)
+        self._levels[0][1].truncate_extend(j, imax)
+        for level in range(1, len(self._levels)):
+            # Bucket j of the previous level belongs to bucket j // 2 here
+            j //= 2
+            prev_min, prev_max = (buf.view()[2 * j:] for buf in self._levels[level - 1])
+            imin, imax = _merge_pairs(self.y, prev_min, prev_max)
+            self._levels[level][0].truncate_extend(j, imin)
+            self._levels[level][1].truncate_extend(j, imax)
+        self._add_levels()
+
+    def view(self, xmin, xmax, n_points):
+        ## Used for get the (x, y) to draw for the window [xmin, xmax] with about n_points
+        n = len(self.x)
+        if not self.monotonic or n <= n_points:
+            return self.full_data()
+        xmin, xmax = xmin - self.offset, xmax - self.offset
+
+        # One sample beyond each edge so the line reaches the borders
+        i0 = max(int(np.searchsorted(self.x, xmin, side='left')) - 1, 0)
+        i1 = min(int(np.searchsorted(self.x, xmax, side='right')) + 1, n)
+        count = i1 - i0
+        bucket_needed = count / max(n_points / 2, 1)
+        if count <= n_points or bucket_needed < LOD_BASE_BUCKET:
+            x, y = self.x[i0:i1], self.y[i0:i1]
+        else:
+            if self._levels is None:
+                self._build()
+            # Smallest bucket that keeps the output under n_points
+            level = min(int(np.ceil(np.log2(bucket_needed / LOD_BASE_BUCKET))), len(self._levels) - 1)
+            bucket = LOD_BASE_BUCKET << level
+            imin, imax = (buf.view() for buf in self._levels[level])
+            j0, j1 = i0 // bucket, (i1 - 1) // bucket + 1
+            lo, hi = imin[j0:j1], imax[j0:j1]
+            # min and max of every bucket in the order they happen
+            idx = np.empty(2 * len(lo), dtype=lo.dtype)
+            idx[0::2] = np.minimum(lo, hi)
+            idx[1::2] = np.maximum(lo, hi)
+            x, y = self.x[idx], self.y[idx]
+        return self._transform(x, y)
+
+    def _transform(self, x, y):
+        if self.offset:
+            x = x + self.offset
+        if self.scale != 1.0:
+            y = y * self.scale
+        return x, y
+
+    def full_data(self):
+        ## Used for get the full resolution data with the multiplier and offset applied
+        return self._transform(self.x, self.y)
+
+
+def get_lod(line):
+    return getattr(line, '_lod', None)
+
+
+def update_lines_lod(ax, n_points):
+    ## Used for refresh the decimated data of every LOD line of ax for its current xlim
+    xmin, xmax = ax.get_xlim()
+    for line in ax.get_lines():
+        lod = get_lod(line)
+        if lod is not None:
+            line.set_data(*lod.view(xmin, xmax, n_points))
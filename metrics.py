@@ -0,0 +1,207 @@
+# Compliance metrics of step responses and PSSE vs PSCAD comparisons
+# Traces that share a time vector (channels of one file) are stacked in a 2-D
+# array and measured in a single vectorized pass. Results are cached by the
+# identity of the trace and the parameters, so a table for hundreds of cases
+# is only computed once per file version.
+import json
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+from alignment import ALIGNMENT_CACHE, AlignmentError, align, detect_event_time
+from derived import line_data_key, series_for_line
+
+
+METRICS_CACHE_SIZE = 4096  # resultados por curva conservados en memoria
+
+MetricParams = namedtuple("MetricParams", [
+    "band",            # banda de establecimiento, fracción del escalón
+    "rise_low",        # inicio del tiempo de subida, fracción del escalón
+    "rise_high",       # fin del tiempo de subida
+    "final_window",    # segundos finales usados para el valor final
+    "event_time",      # instante del evento, None para detectarlo
+    "target",          # valor final esperado, None si no aplica
+    "error_band_abs",  # banda de error absoluta contra la referencia
+    "error_band_rel",  # banda de error relativa al valor de la referencia
+])
+DEFAULT_PARAMS = MetricParams(0.05, 0.1, 0.9, 1.0, None, None, 0.0, 0.05)
+
+STEP_COLUMNS = ["evento_s", "inicial", "final", "tiempo_subida_s", "tiempo_establecimiento_s",
+                "sobrepico_pct", "error_estacionario"]
+COMPARISON_COLUMNS = ["referencia", "error_max", "error_rms", "error_medio", "dentro_banda_pct"]
+
+
+def _first_index(condition):
+    # Index of the first True of every column and whether there is one
+    return np.argmax(condition, axis=0), condition.any(axis=0)
+
+
+def step_metrics(time, values, params=DEFAULT_PARAMS):
+    ## Used for measure the step response of one or more traces with the same time
+    ## values: (n,) or (n, k); returns a list of k dicts with STEP_COLUMNS
+    time = np.asarray(time, dtype=float)
+    Y = np.asarray(values, dtype=float).reshape(len(time), -1)
+    k = Y.shape[1]
+    if len(time) < 3:
+        return [dict.fromkeys(STEP_COLUMNS, np.nan) for _ in range(k)]
+
+    if params.event_time is not None:
+        events = np.full(k, float(params.event_time))
+    else:
+        detected = [detect_event_time(time, Y[:, j]) for j in range(k)]
+        events = np.array([time[0] if event is None else event for event in detected])
+    after = time[:, None] >= events[None, :]
+    before = ~after
+    counts = before.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Initial value: mean before the event (first sample if there is none)
+        initial = np.where(counts > 0, np.where(before, Y, 0).sum(axis=0) / np.maximum(counts, 1), Y[0])
+        final_mask = time >= time[-1] - params.final_window
+        final = Y[final_mask].mean(axis=0)
+        step = final - initial
+        has_step = np.abs(step) > 1e-12 * np.maximum(np.abs(final), 1.0)
+        r = np.where(after, (Y - initial) / np.where(has_step, step, 1.0), np.nan)
+
+        i_low, ok_low = _first_index(r >= params.rise_low)
+        i_high, ok_high = _first_index(r >= params.rise_high)
+        rise = np.where(ok_low & ok_high & has_step, time[i_high] - time[i_low], np.nan)
+        overshoot = np.where(has_step, np.maximum(np.nanmax(r, axis=0) - 1.0, 0.0) * 100, np.nan)
+
+        # Settling: first sample after the last one outside the band
+        band = params.band * np.where(has_step, np.abs(step), np.abs(final))
+        outside = after & (np.abs(Y - final) > band)
+        last_out = len(time) - 1 - np.argmax(outside[::-1], axis=0)
+        settling = np.where(last_out < len(time) - 1, time[np.minimum(last_out + 1, len(time) - 1)] - events, np.nan)
+        settling = np.where(outside.any(axis=0), settling, 0.0)  # nunca salió de la banda
+        error = final - params.target if params.target is not None else np.full(k, np.nan)
+
+    return [dict(zip(STEP_COLUMNS, map(float, row)))
+            for row in zip(events, initial, final, rise, settling, overshoot, error)]
+
+
+def comparison_metrics(reference, trace, params=DEFAULT_PARAMS, keys=None):
+    ## Used for the error of a (time, values) trace against a reference trace
+    ## Both are resampled on the grid of the slowest one (see alignment)
+    traces = [reference, trace]
+    try:
+        if keys is not None:
+            _, (ref, values) = ALIGNMENT_CACHE.align(keys, traces)
+        else:
+            _, (ref, values) = align(traces)
+    except AlignmentError:
+        return dict.fromkeys(COMPARISON_COLUMNS[1:], np.nan)
+    error = np.abs(values - ref)
+    valid = np.isfinite(error)
+    if not valid.any():
+        return dict.fromkeys(COMPARISON_COLUMNS[1:], np.nan)
+    error = error[valid]
+    band = params.error_band_abs + params.error_band_rel * np.abs(ref[valid])
+    return {"error_max": float(error.max()), "error_rms": float(np.sqrt(np.mean(error ** 2))),
+            "error_medio": float(error.mean()), "dentro_banda_pct": float(np.mean(error <= band) * 100)}
+
+
+class MetricsCache:
+    # LRU of step metrics per (trace key, parameters)
+    def __init__(self, max_entries=METRICS_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+METRICS_CACHE = MetricsCache()
+
+
+def compute_step_metrics(traces, params=DEFAULT_PARAMS, cache=METRICS_CACHE):
+    ## Used for the step metrics of many traces [(key, time, values)]
+    ## Traces with the same time array are measured together; key must
+    ## identify the data (source and file version), None disables the cache
+    results = [None] * len(traces)
+    groups = OrderedDict()  # id del vector de tiempo -> índices
+    for i, (key, time, _) in enumerate(traces):
+        cached = cache.get((key, params)) if key is not None else None
+        if cached is not None:
+            results[i] = cached
+        else:
+            groups.setdefault(id(time), []).append(i)
+    for indexes in groups.values():
+        time = traces[indexes[0]][1]
+        stacked = np.column_stack([np.asarray(traces[i][2], dtype=float) for i in indexes])
+        for i, row in zip(indexes, step_metrics(time, stacked, params)):
+            results[i] = row
+            if traces[i][0] is not None:
+                cache.put((traces[i][0], params), row)
+    return results
+
+
+def plot_metrics(traces, params=DEFAULT_PARAMS, reference=0):
+    ## Used for the table rows of the lines of one plot [(key, label, time, values)]
+    ## Every line gets its step metrics and its error against the reference line
+    step = compute_step_metrics([(key, time, values) for key, _, time, values in traces], params)
+    rows = []
+    ref_key, ref_label, ref_time, ref_values = traces[reference]
+    for i, ((key, label, time, values), metrics) in enumerate(zip(traces, step)):
+        row = {"curva": label}
+        row.update(metrics)
+        row["referencia"] = ref_label
+        if i == reference:
+            row.update(dict.fromkeys(COMPARISON_COLUMNS[1:], np.nan))
+        else:
+            keys = (ref_key, key) if key is not None and ref_key is not None else None
+            row.update(comparison_metrics((ref_time, ref_values), (time, values), params, keys))
+        rows.append(row)
+    return rows
+
+
+def template_plot_traces(plot_info, series):
+    ## Used for the (key, label, time, values) traces of a template plot, with
+    ## the time offset and multiplier of every line applied
+    traces = []
+    shifted = {}  # las curvas de un archivo con el mismo desplazamiento comparten el tiempo
+    for line_info in plot_info.get("lines", []):
+        data = series_for_line(line_info, series)
+        if data is None:
+            continue
+        time, values = data
+        if line_info.get("time_offset"):
+            key = (id(time), line_info["time_offset"])
+            if key not in shifted:
+                shifted[key] = np.asarray(time, dtype=float) + line_info["time_offset"]
+            time = shifted[key]
+        if line_info.get("multiplier", 1.0) != 1.0:
+            values = np.asarray(values, dtype=float) * line_info["multiplier"]
+        traces.append((line_data_key(line_info), line_info.get("label") or line_info.get("channel"), time, values))
+    return traces
+
+
+def write_table(rows, path):
+    ## Used for export metric rows to CSV or JSON (by the extension of path)
+    if path.lower().endswith(".json"):
+        clean = [{k: (None if isinstance(v, float) and not np.isfinite(v) else v) for k, v in row.items()}
+                 for row in rows]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(clean, f, indent=2, ensure_ascii=False)
+    else:
+        pd.DataFrame(rows).to_csv(path, index=False)
@@ -0,0 +1,134 @@
+# Compliance metrics of the plotted lines
+# The parameters are edited at the top, the table is filled in the background
+# with metrics.plot_metrics (one row per line, the first line of every plot is
+# the reference) and can be exported to CSV or JSON.
+import functools
+
+import numpy as np
+from PyQt5.QtWidgets import (QCheckBox, QDialog, QDoubleSpinBox, QFileDialog, QFormLayout, QHBoxLayout,
+    QLabel, QPushButton, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget)
+
+from loader import get_background_loader
+from metrics import DEFAULT_PARAMS, MetricParams, plot_metrics, write_table
+
+
+def _spin(value, decimals=4, minimum=-1e9, maximum=1e9):
+    spin = QDoubleSpinBox()
+    spin.setDecimals(decimals)
+    spin.setRange(minimum, maximum)
+    spin.setValue(value)
+    return spin
+
+
+def compute_rows(plots, params):
+    ## Used for the rows of every plot [(tab name, plot title, traces)]
+    rows = []
+    for tab_name, title, traces in plots:
+        for row in plot_metrics(traces, params):
+            rows.append(dict({"pestaña": tab_name, "gráfico": title}, **row))
+    return rows
+
+
+class MetricsDialog(QDialog):
+    def __init__(self, collect_plots, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Métricas de cumplimiento")
+        self.resize(1000, 500)
+        self.collect_plots = collect_plots  # (todas_las_pestañas) -> [(pestaña, gráfico, trazas)]
+        self.rows = []
+
+        self.band = _spin(DEFAULT_PARAMS.band, minimum=0)
+        self.rise_low = _spin(DEFAULT_PARAMS.rise_low, minimum=0, maximum=1)
+        self.rise_high = _spin(DEFAULT_PARAMS.rise_high, minimum=0, maximum=1)
+        self.final_window = _spin(DEFAULT_PARAMS.final_window, minimum=0)
+        self.auto_event = QCheckBox("Detectar")
+        self.auto_event.setChecked(True)
+        self.event_time = _spin(0.0)
+        self.auto_event.toggled.connect(lambda checked: self.event_time.setEnabled(not checked))
+        self.event_time.setEnabled(False)
+        self.use_target = QCheckBox("Usar")
+        self.target = _spin(1.0)
+        self.use_target.toggled.connect(self.target.setEnabled)
+        self.target.setEnabled(False)
+        self.error_abs = _spin(DEFAULT_PARAMS.error_band_abs, minimum=0)
+        self.error_rel = _spin(DEFAULT_PARAMS.error_band_rel, minimum=0)
+        self.all_tabs = QCheckBox("Todas las pestañas")
+
+        form = QFormLayout()
+        form.addRow("Banda de establecimiento (fracción del escalón):", self.band)
+        form.addRow("Tiempo de subida entre (fracciones):", self._row(self.rise_low, self.rise_high))
+        form.addRow("Ventana del valor final (s):", self.final_window)
+        form.addRow("Instante del evento (s):", self._row(self.auto_event, self.event_time))
+        form.addRow("Valor final esperado:", self._row(self.use_target, self.target))
+        form.addRow("Banda de error vs referencia (abs, rel):", self._row(self.error_abs, self.error_rel))
+        form.addRow(self.all_tabs)
+
+        self.btn_compute = QPushButton("Calcular")
+        self.btn_compute.clicked.connect(self.compute)
+        self.btn_export = QPushButton("Exportar tabla…")
+        self.btn_export.clicked.connect(self.export)
+        self.btn_export.setEnabled(False)
+        self.status = QLabel("La primera curva de cada gráfico es la referencia de los errores.")
+        self.table = QTableWidget()
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.btn_compute)
+        buttons.addWidget(self.btn_export)
+        buttons.addWidget(self.status, 1)
+        layout = QVBoxLayout(self)
+        layout.addLayout(form)
+        layout.addLayout(buttons)
+        layout.addWidget(self.table)
+
+    @staticmethod
+    def _row(*widgets):
+        container = QWidget()
+        layout = QHBoxLayout(container)
+        layout.setContentsMargins(0, 0, 0, 0)
+        for widget in widgets:
+            layout.addWidget(widget)
+        return container
+
+    def params(self):
+        return MetricParams(self.band.value(), self.rise_low.value(), self.rise_high.value(),
+                            self.final_window.value(),
+                            None if self.auto_event.isChecked() else self.event_time.value(),
+                            self.target.value() if self.use_target.isChecked() else None,
+                            self.error_abs.value(), self.error_rel.value())
+
+    def compute(self):
+        plots = self.collect_plots(self.all_tabs.isChecked())
+        if not plots:
+            self.status.setText("No hay curvas para medir.")
+            return
+        self.btn_compute.setEnabled(False)
+        self.status.setText("Calculando…")
+        job = get_background_loader().submit("Calculando métricas",
+                                             [("metrics", "métricas", functools.partial(compute_rows, plots, self.params()))])
+        job.result_ready.connect(lambda _, rows: self.show_rows(rows))
+        job.finished.connect(lambda cancelled: self.btn_compute.setEnabled(True))
+
+    def show_rows(self, rows):
+        self.rows = rows
+        columns = list(dict.fromkeys(column for row in rows for column in row))
+        self.table.clear()
+        self.table.setColumnCount(len(columns))
+        self.table.setRowCount(len(rows))
+        self.table.setHorizontalHeaderLabels(columns)
+        for i, row in enumerate(rows):
+            for j, column in enumerate(columns):
+                value = row.get(column)
+                if isinstance(value, float):
+                    text = "" if not np.isfinite(value) else f"{value:.6g}"
+                else:
+                    text = str(value)
+                self.table.setItem(i, j, QTableWidgetItem(text))
+        self.table.resizeColumnsToContents()
+        self.btn_export.setEnabled(bool(rows))
+        self.status.setText(f"{len(rows)} curvas medidas.")
+
+    def export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Exportar métricas", "metricas.csv", "CSV (*.csv);;JSON (*.json)")
+        if path:
+            write_table(self.rows, path)
+            self.status.setText(f"Tabla exportada: {path}")
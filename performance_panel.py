@@ -0,0 +1,117 @@
+# Performance panel: totals of PROFILER per file and plot and cache hit rates
+# The tables are refreshed every second while the panel is visible.
+import os
+
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtWidgets import (QDialog, QFileDialog, QHBoxLayout, QLabel, QLineEdit, QPushButton, QSplitter,
+    QTableWidget, QTableWidgetItem, QVBoxLayout)
+
+from profiling import PROFILER
+
+
+STATS_COLUMNS = ["Categoría", "Operación", "Archivo / gráfico", "Llamadas", "Total (ms)", "Medio (ms)", "Máx. (ms)"]
+CACHE_COLUMNS = ["Caché", "Aciertos", "Fallos", "Tasa de aciertos"]
+REFRESH_MS = 1000
+
+
+def _item(value, tooltip=None):
+    if isinstance(value, float):
+        item = QTableWidgetItem(f"{value:.1f}")
+        item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+    elif isinstance(value, int):
+        item = QTableWidgetItem(str(value))
+        item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+    else:
+        item = QTableWidgetItem(value)
+    if tooltip:
+        item.setToolTip(tooltip)
+    return item
+
+
+class PerformancePanel(QDialog):
+    def __init__(self, caches, parent=None):
+        ## caches: [(name, object with hits and misses)]
+        super().__init__(parent)
+        self.setWindowTitle("Rendimiento")
+        self.resize(900, 550)
+        self.setModal(False)
+        self.caches = caches
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filtrar por operación, archivo o gráfico…")
+        self.filter_edit.textChanged.connect(self.refresh)
+        self.stats_table = QTableWidget(0, len(STATS_COLUMNS))
+        self.stats_table.setHorizontalHeaderLabels(STATS_COLUMNS)
+        self.stats_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.cache_table = QTableWidget(0, len(CACHE_COLUMNS))
+        self.cache_table.setHorizontalHeaderLabels(CACHE_COLUMNS)
+        self.cache_table.setEditTriggers(QTableWidget.NoEditTriggers)
+
+        self.btn_reset = QPushButton("Reiniciar tiempos")
+        self.btn_reset.clicked.connect(self.reset)
+        self.btn_trace = QPushButton("Guardar traza…")
+        self.btn_trace.setToolTip("Eventos en formato Chrome trace (chrome://tracing, Perfetto)")
+        self.btn_trace.clicked.connect(self.save_trace)
+        self.status = QLabel()
+
+        splitter = QSplitter(Qt.Vertical)
+        splitter.addWidget(self.stats_table)
+        splitter.addWidget(self.cache_table)
+        splitter.setSizes([400, 150])
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.btn_reset)
+        buttons.addWidget(self.btn_trace)
+        buttons.addWidget(self.status, 1)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.filter_edit)
+        layout.addWidget(splitter)
+        layout.addLayout(buttons)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start()
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        text = self.filter_edit.text().strip().lower()
+        rows = [row for row in PROFILER.stats()
+                if not text or any(text in str(value).lower() for value in row[:3])]
+        self.stats_table.setRowCount(len(rows))
+        for i, (category, name, subject, calls, total, longest) in enumerate(rows):
+            subject = "" if subject is None else str(subject)
+            shown = os.path.basename(subject) if category == "lectura" else subject
+            values = [category, name, shown, calls, total * 1000, total * 1000 / calls, longest * 1000]
+            for j, value in enumerate(values):
+                self.stats_table.setItem(i, j, _item(value, subject if j == 2 else None))
+        self.stats_table.resizeColumnsToContents()
+
+        self.cache_table.setRowCount(len(self.caches))
+        for i, (name, cache) in enumerate(self.caches):
+            hits, misses = cache.hits, cache.misses
+            rate = f"{100 * hits / (hits + misses):.0f} %" if hits + misses else "-"
+            for j, value in enumerate([name, hits, misses, rate]):
+                self.cache_table.setItem(i, j, _item(value))
+        self.cache_table.resizeColumnsToContents()
+
+    def reset(self):
+        PROFILER.reset()
+        for _, cache in self.caches:
+            cache.hits = cache.misses = 0
+        self.refresh()
+
+    def save_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Guardar traza", "traza.json", "Chrome trace (*.json)")
+        if path:
+            try:
+                count = PROFILER.write_trace(path)
+                self.status.setText(f"{count} eventos guardados en {os.path.basename(path)}")
+            except OSError as e:
+                self.status.setText(f"No se pudo guardar la traza: {e}")
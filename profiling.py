@@ -0,0 +1,135 @@
+# Timing of the reading, alignment and drawing paths
+# Code sections are wrapped in PROFILER.span(name, category, subject) and each
+# call is added to the totals per (category, name, subject), the subject being
+# the file or the plot. The performance panel shows those totals and the hit
+# rate of the caches. The last events can be written as a Chrome trace-event
+# file (chrome://tracing, Perfetto); with VIEWER_TRACE=ruta.json the file is
+# written when the program exits.
+import atexit
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+MAX_EVENTS = 200_000  # eventos conservados para la traza
+
+
+class Profiler:
+    def __init__(self, max_events=MAX_EVENTS):
+        self.enabled = True
+        self._events = deque(maxlen=max_events)
+        self._stats = {}  # (categoría, nombre, sujeto) -> [llamadas, total, máximo]
+        self._threads = {}  # (proceso, hilo) -> nombre
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name, category, subject=None, **args):
+        ## Used for time a block: with PROFILER.span("dyntools.CHNF", "lectura", filepath): ...
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, category, start, time.perf_counter() - start, subject, **args)
+
+    def add(self, name, category, start, seconds, subject=None, **args):
+        ## Used for record a section measured elsewhere (e.g. in a reading process)
+        if not self.enabled:
+            return
+        thread = threading.current_thread()
+        key = (category, name, subject)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                self._stats[key] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+            self._threads[(os.getpid(), thread.ident)] = thread.name
+            self._events.append((name, category, start, seconds, os.getpid(), thread.ident, subject, args))
+
+    def stats(self):
+        ## Used for the totals [(category, name, subject, calls, total_s, max_s)], slowest first
+        with self._lock:
+            rows = [key + tuple(values) for key, values in self._stats.items()]
+        return sorted(rows, key=lambda row: row[4], reverse=True)
+
+    def take_events(self):
+        ## Used for get and forget the events recorded so far (worker processes)
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+            self._events.clear()
+        return threads, events
+
+    def merge(self, taken):
+        ## Used for add the events taken in another process to this trace
+        ## perf_counter uses a system-wide clock, so the times are comparable
+        threads, events = taken
+        with self._lock:
+            self._threads.update(threads)
+            for event in events:
+                name, category, _, seconds, _, _, subject, _ = event
+                stats = self._stats.setdefault((category, name, subject), [0, 0.0, 0.0])
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+                self._events.append(event)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._events.clear()
+
+    def write_trace(self, path):
+        ## Used for write the recorded events in Chrome trace-event format
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        trace = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                 for (pid, tid), name in threads.items()]
+        for name, category, start, seconds, pid, tid, subject, args in events:
+            event_args = dict(args)
+            if subject is not None:
+                event_args["sujeto"] = str(subject)
+            trace.append({"name": name, "cat": category, "ph": "X", "pid": pid, "tid": tid,
+                          "ts": round((start - self._origin) * 1e6, 3), "dur": round(seconds * 1e6, 3),
+                          "args": event_args})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+        return len(events)
+
+
+# Profiler shared by the whole process
+PROFILER = Profiler()
+
+
+def run_traced(func, *args):
+    ## Used for run func in a worker process and return (result, events) so the
+    ## caller can PROFILER.merge(events) into its own trace
+    PROFILER.take_events()  # eventos de tareas anteriores del mismo proceso
+    result = func(*args)
+    return result, PROFILER.take_events()
+
+
+def write_trace_at_exit(path):
+    ## Used for write the trace file of this process when it ends
+    def write():
+        try:
+            count = PROFILER.write_trace(path)
+            print(f"[INFO] Traza de rendimiento ({count} eventos) escrita en {path}")
+        except OSError as e:
+            print(f"[WARN] No se pudo escribir la traza {path}: {e}")
+    atexit.register(write)
+
+
+if os.environ.get("VIEWER_TRACE") and multiprocessing.parent_process() is None:
+    write_trace_at_exit(os.environ["VIEWER_TRACE"])
@@ -0,0 +1,278 @@
+# Lectura de archivos de simulación (.out de PSSE y .csv de PSCAD)
+# Sin dependencias de Qt, se usa desde la GUI y desde los procesos de lectura
+import sys
+
+# possible_paths = [
+#     r"C:\Program Files\PTI\PSSE35\PSSBIN",
+#     r"C:\Program Files (x86)\PTI\PSSE35\PSSBIN",
+#     r'C:\Program Files\PTI\PSSE35\35.6\PSSPY39'
+# ]
+
+# psse_found = False
+
+# for path in possible_paths:
+#     if os.path.exists(path):
+#         sys.path.append(path)
+#         os.environ['PATH'] = path + ";" + os.environ['PATH']
+#         psse_found = True
+#         break
+# if not psse_found:
+#     print("Error: No se encontró la instalación de PSS®E 35 en la ruta predeterminada.")
+#     input("Presione Enter para salir...")
+#     sys.exit()
+
+# sys.path.append(r"C:\Program Files\PTI\PSSE35\35.6\PSSPY39")  # Ruta típica, verifica la tuya
+sys.path.append(r".\PSSPY39")  # 
+try:
+    import psse35
+    import dyntools as dy
+except ImportError:
+    dy = None  # sin PSSE (p. ej. exportación en un servidor Linux), solo caché y fallback
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+import pandas as pd
+from workers import get_process_pool, reset_process_pool
+from data_store import DATA_STORE, FileData
+from sidecar_cache import SIDECAR_CACHE
+from legacy_worker import LEGACY_WORKER, LegacyWorkerError
+from profiling import PROFILER
+
+
+CSV_CHUNK_ROWS = 500_000  # filas leídas por bloque en los CSV de PSCAD
+DEFAULT_CSV_INIT_TIME = 2  # tiempo de inicialización de PSCAD si la línea no lo indica
+
+def _parse_out(filepath):
+    # Parse the whole .OUT once with dyntools, the result is kept in DATA_STORE
+    # and written to the sidecar cache so later sessions skip the parse
+    with PROFILER.span("caché sidecar", "lectura", filepath):
+        cached = SIDECAR_CACHE.load(filepath)
+    if cached is not None:
+        return cached
+    if dy is None:
+        raise RuntimeError("dyntools no está disponible en este Python")
+    with PROFILER.span("dyntools.CHNF", "lectura", filepath):
+        chnfobj = dy.CHNF(filepath)
+        _, ch_id, ch_data = chnfobj.get_data()
+    # The .out keeps float32 samples: same precision at half the memory and sidecar size
+    channels = {}
+    for key, name in ch_id.items():
+        if key != 'time' and key in ch_data and name not in channels:
+            channels[name] = np.asarray(ch_data[key], dtype=np.float32)
+    data = FileData(np.asarray(ch_data['time'], dtype=np.float32), channels)
+    SIDECAR_CACHE.store(filepath, data.time, data.channels)
+    return data
+
+def get_channels_data_from_out(filepath, channel_names):
+    # Read several channels of a .OUT with a single read of the file
+    # Returns {channel: (time, values)} with the channels that were found
+    results = {}
+    try:
+        data = DATA_STORE.get(filepath, _parse_out)
+        with PROFILER.span("búsqueda de canales", "lectura", filepath, canales=len(channel_names)):
+            for channel_name in channel_names:
+                result = data.get(channel_name)  # dict nombre -> canal, sin recorrer ch_id
+                if result is not None:
+                    results[channel_name] = result
+    except Exception as e:
+        print(f"[WARN] Falló dyntools moderno: {e}")
+        print("[INFO] Intentando con Python 2.7 para extraer datos...")
+
+        # Fallback: proceso persistente de Python 2.7, el archivo se lee una sola vez
+        try:
+            with PROFILER.span("fallback Python 2.7", "lectura", filepath):
+                time, data = LEGACY_WORKER.get_data(filepath, channel_names)
+            results = {channel_name: (time, values) for channel_name, values in data.items()}
+        except LegacyWorkerError as ex:
+            print(f"[ERROR] Fallback falló: {ex}")
+            return {}
+    for channel_name in channel_names:
+        if channel_name not in results:
+            print(f"[WARN] Canal no encontrado: {channel_name} en {filepath}")
+    return results
+
+# Simulación de lectura de canales desde archivo .out
+def get_channel_data_from_out(filepath, channel_name):
+    # Read .OUT and extract time and data for a specific column
+    return get_channels_data_from_out(filepath, [channel_name]).get(channel_name, ([], []))
+
+
+def get_channels_from_out(filepath):
+    # Read .OUT and extract time and data for a specific column
+    channels = []
+    try:
+        with PROFILER.span("listar canales", "lectura", filepath):
+            channels = DATA_STORE.get(filepath, _parse_out).channel_names()
+    except Exception as e:
+        print(f"[WARN] Falló lectura con dyntools moderno: {e}")
+        print("[INFO] Intentando fallback con Python 2.7...")
+
+        # Fallback: proceso persistente de Python 2.7
+        try:
+            with PROFILER.span("fallback Python 2.7", "lectura", filepath):
+                channels = LEGACY_WORKER.get_channels(filepath)
+            print("[INFO] Lectura con Python 2.7 exitosa.")
+        except LegacyWorkerError as ex:
+            print(f"[ERROR] Python 2.7 falló: {ex}")
+    
+    return list(channels)
+
+def get_channels_from_csv(filepath):
+    # Read only the CSV header to list the channels
+    try:
+        with PROFILER.span("listar canales", "lectura", filepath):
+            header = pd.read_csv(filepath, nrows=0)
+        return list(header.columns[1:])  # Ignora la primera columna (tiempo)
+    except Exception as e:
+        print(f"Error leyendo CSV: {e}")
+        return []
+
+def _read_csv_columns(filepath, time_col, columns):
+    # Read the full time column and the given columns of a CSV in one chunked pass
+    time_parts = []
+    value_parts = {column: [] for column in columns}
+    for chunk in pd.read_csv(filepath, usecols=[time_col] + columns, chunksize=CSV_CHUNK_ROWS):
+        time_parts.append(chunk[time_col].to_numpy(dtype=float))
+        for column in columns:
+            value_parts[column].append(chunk[column].to_numpy(dtype=float))
+    time = np.concatenate(time_parts) if time_parts else np.empty(0)
+    return time, {column: np.concatenate(parts) if parts else np.empty(0)
+                  for column, parts in value_parts.items()}
+
+def get_time_and_data_from_csv_batch(filepath, columns, init_time = 2):
+    # Read the time column and the requested columns of a CSV in one chunked pass
+    # Columns already in the sidecar cache are memory-mapped instead of read
+    # Returns {column: (time, values)}, the time array is shared by all columns
+    try:
+        header = list(pd.read_csv(filepath, nrows=0).columns)
+        time_col = header[0]
+        wanted = [c for c in dict.fromkeys(columns) if c in header and c != time_col]
+        for column in columns:
+            if column not in wanted:
+                print(f"[WARN] Columna no encontrada: {column} en {filepath}")
+        if not wanted:
+            return {}
+
+        with PROFILER.span("caché sidecar", "lectura", filepath):
+            cached = SIDECAR_CACHE.load(filepath)
+        data = dict(cached.channels) if cached is not None else {}
+        time = cached.time if cached is not None else None
+        missing = [c for c in wanted if c not in data]
+        if missing:
+            with PROFILER.span("pandas.read_csv", "lectura", filepath, columnas=len(missing)):
+                time, new_data = _read_csv_columns(filepath, time_col, missing)
+            data.update(new_data)
+            SIDECAR_CACHE.store(filepath, time, new_data)
+
+        # Time of PSCAD is monotonic, the init time cut is a view of the arrays
+        start = np.searchsorted(time, init_time, side='left')
+        time = time[start:] - init_time
+        return {column: (time, data[column][start:]) for column in wanted}
+    except Exception as e:
+        print(f"Error leyendo datos de CSV: {e}")
+        return {}
+
+def get_time_and_data_from_csv(filepath, column, init_time = 2):
+    # Read CSV and extract time and data for a specific column
+    result = get_time_and_data_from_csv_batch(filepath, [column], init_time)
+    return result.get(column, ([], []))
+
+def group_requests_by_file(requests):
+    ## Used for group (file, channel, init_time) requests per file, without duplicates
+    grouped = {}
+    for request in dict.fromkeys(requests):
+        grouped.setdefault(request[0], []).append(request)
+    return grouped
+
+def load_series_batch(requests):
+    ## Used for read many (file, channel, init_time) series grouping them per file
+    ## Returns {(file, channel, init_time): (time, values)} with the series that could be read
+    grouped = {}
+    for file, channel, init_time in dict.fromkeys(requests):
+        grouped.setdefault((file, init_time), []).append(channel)
+
+    results = {}
+    for (file, init_time), channels in grouped.items():
+        if file.endswith('.out'):
+            for channel, series in get_channels_data_from_out(file, channels).items():
+                results[(file, channel, init_time)] = series
+        elif file.endswith('.csv'):
+            csv_init_time = DEFAULT_CSV_INIT_TIME if init_time is None else init_time
+            for channel, series in get_time_and_data_from_csv_batch(file, channels, csv_init_time).items():
+                results[(file, channel, init_time)] = series
+    return results
+
+
+def is_cheap_to_read(requests):
+    ## Used for know if the requests of one file are in memory or in the sidecar cache
+    ## Only meaningful in the GUI process
+    file = requests[0][0]
+    if file.endswith('.out') and DATA_STORE.is_cached(file):
+        return True
+    return SIDECAR_CACHE.has_channels(file, [channel for _, channel, _ in requests])
+
+
+def read_series_in_worker(requests):
+    ## Entry point of the reading processes: reads the series of one file
+    ## Returns (results, parse_seconds); results is None when everything was
+    ## written to the sidecar cache and can be memory-mapped by the caller
+    start = time.perf_counter()
+    try:
+        results = load_series_batch(requests)
+    finally:
+        # The process stays alive for the next jobs: the parsed file is not kept
+        # in its own DATA_STORE, the GUI process keeps what it is sent
+        DATA_STORE.clear()
+    parse = time.perf_counter() - start
+    # Dropped only when the caller can map them from a valid sidecar; if the
+    # sidecar is off or could not be written they are sent back
+    if results and SIDECAR_CACHE.has_channels(requests[0][0], [channel for _, channel, _ in results]):
+        results = None
+    return results, parse
+
+
+class LoadTimings:
+    # Accumulated times of a load, updated from several threads
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.values = {'parse': 0.0, 'transfer': 0.0, 'render': 0.0}
+        self.files = 0
+        self.start = time.perf_counter()
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.values[name] += seconds
+
+    def file_done(self):
+        with self._lock:
+            self.files += 1
+
+    def summary(self):
+        wall = time.perf_counter() - self.start
+        return (f"{self.files} archivos en {wall:.1f} s (lectura {self.values['parse']:.1f} s, "
+                f"transferencia {self.values['transfer']:.1f} s, dibujo {self.values['render']:.1f} s)")
+
+
+def read_file_parallel(requests, timings=None):
+    ## Used for read the requests of one file in the process pool
+    ## Files already in memory or in the sidecar cache are read in this process
+    start = time.perf_counter()
+    parse = 0.0
+    results = None
+    if not is_cheap_to_read(requests):
+        try:
+            results, parse = get_process_pool().submit(read_series_in_worker, requests).result()
+        except (BrokenProcessPool, OSError) as e:
+            print(f"[WARN] Falló el proceso de lectura, se lee en este proceso: {e}")
+            reset_process_pool()
+    if results is None:
+        results = load_series_batch(requests)  # mapeo de la caché o lectura directa
+    if parse:
+        # The reading process has its own profiler, its time is recorded here
+        PROFILER.add("proceso de lectura", "lectura", start, parse, requests[0][0], canales=len(requests))
+    if timings is not None:
+        timings.add('parse', parse)
+        timings.add('transfer', time.perf_counter() - start - parse)
+        timings.file_done()
+    return results
@@ -0,0 +1,47 @@
+# Coalesced redraws of the plot canvases
+# Pan, zoom and linked-xlim events only mark a plot as pending; a single-shot
+# timer running at the display refresh rate repaints every pending plot once
+# per frame, so bursts of motion events cost at most one render per canvas.
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtWidgets import QApplication
+
+
+class RedrawScheduler(QObject):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        screen = QApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None and screen.refreshRate() > 0 else 60
+        self._pending = {}  # plot -> None, conserva el orden de llegada
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(max(int(1000 / refresh_rate), 1))
+        self._timer.timeout.connect(self.flush)
+
+    def request(self, plot):
+        ## Used for ask a repaint of plot (any object with redraw_now) in the next frame
+        self._pending[plot] = None
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def is_pending(self, plot):
+        return plot in self._pending
+
+    def flush(self):
+        ## Used for repaint all the pending plots in a single pass
+        pending, self._pending = self._pending, {}
+        for plot in pending:
+            try:
+                plot.redraw_now()
+            except RuntimeError:
+                pass  # el widget ya fue eliminado
+
+
+_scheduler = None
+
+
+def get_redraw_scheduler():
+    # Created on first use, a QApplication must exist
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = RedrawScheduler()
+    return _scheduler
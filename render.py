@@ -0,0 +1,182 @@
+# Rendering of template tabs to image files without Qt
+# Uses a bare matplotlib Figure on the Agg canvas (no pyplot, no QApplication)
+# so it can run in worker processes of a headless server. A tab is first
+# turned into "views": its plots with every line already decimated for the
+# output (about 2 points per pixel in PNG, a fixed density in PDF/SVG so the
+# vector files stay small). Views are plain arrays and strings, cheap to send
+# to the export processes, which only draw them.
+import os
+import re
+from collections import namedtuple
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+
+from derived import line_requests, series_for_line
+from lod import TraceLOD
+from profiling import PROFILER
+from workers import get_process_pool, reset_process_pool
+
+
+EXPORT_FORMATS = ("png", "pdf", "svg")
+VECTOR_FORMATS = ("pdf", "svg")
+VECTOR_POINTS_PER_INCH = 60  # puntos por pulgada de ancho de las curvas en PDF/SVG
+FIGURE_WIDTH = 10  # pulgadas, tamaño automático
+PLOT_HEIGHT = 4  # pulgadas por gráfico, tamaño automático
+PAGE_SIZES = {"A4": (8.27, 11.69), "A3": (11.69, 16.54), "Carta": (8.5, 11.0)}  # pulgadas, vertical
+
+# formats: files written per tab; report: also one multi-page PDF with every
+# tab; page_size: None (10 in wide, 4 in per plot) or a key of PAGE_SIZES
+ExportOptions = namedtuple("ExportOptions", ["formats", "dpi", "page_size", "landscape", "report"])
+DEFAULT_EXPORT = ExportOptions(("png",), 100, None, False, False)
+REPORT_NAME = "informe.pdf"
+
+
+def safe_file_name(name):
+    ## Used for turn a tab or case name into a valid file name
+    return re.sub(r'[<>:"/\\|?*\s]+', "_", str(name)).strip("_") or "sin_nombre"
+
+
+def template_requests(template_data):
+    ## Used for list the (file, channel, init_time) series used by a template
+    return [request
+            for tab_data in template_data.get("tabs", [])
+            for plot_info in tab_data.get("plots", [])
+            for line_info in plot_info.get("lines", [])
+            for request in line_requests(line_info)]
+
+
+def figure_size(n_plots, page_size=None, landscape=False):
+    ## Used for the (width, height) in inches of the figure of a tab
+    if page_size is None:
+        return FIGURE_WIDTH, PLOT_HEIGHT * max(n_plots, 1)
+    width, height = PAGE_SIZES[page_size]
+    return (height, width) if landscape else (width, height)
+
+
+def export_points(fmt, width, dpi):
+    ## Used for the points per line of a figure width inches wide
+    per_inch = VECTOR_POINTS_PER_INCH if fmt in VECTOR_FORMATS else dpi
+    return int(2 * width * per_inch)
+
+
+def _series_range(lines):
+    xmins = [lod.x[0] + lod.offset for lod, _ in lines if len(lod)]
+    xmaxs = [lod.x[-1] + lod.offset for lod, _ in lines if len(lod)]
+    if not xmins:
+        return 0.0, 1.0
+    return float(np.min(xmins)), float(np.max(xmaxs))
+
+
+def template_traces(plot_info, series):
+    ## Used for the [(TraceLOD, line_info)] of a template plot, missing series are skipped
+    traces = []
+    for line_info in plot_info.get("lines", []):
+        data = series_for_line(line_info, series)
+        if data is None:
+            continue
+        time, values = data
+        traces.append((TraceLOD(time, values, line_info.get("multiplier", 1.0), line_info.get("time_offset", 0.0)),
+                       line_info))
+    return traces
+
+
+def plot_view(plot_info, traces, n_points):
+    ## Used for the axes and the decimated lines of a plot, ready to draw
+    ## traces: [(TraceLOD, line_info)]; the x window is the xlim of the plot
+    ## or the range of its data
+    xmin, xmax = plot_info.get("xlim") or _series_range(traces)
+    lines = []
+    for lod, line_info in traces:
+        x, y = lod.view(xmin, xmax, n_points)
+        lines.append({"x": np.array(x, dtype=float), "y": np.array(y, dtype=float),
+                      "label": line_info.get("label", line_info.get("channel")), "color": line_info.get("color"),
+                      "visible": line_info.get("visible", True)})
+    return {"title": plot_info.get("title", ""), "xlabel": plot_info.get("xlabel", ""),
+            "ylabel": plot_info.get("ylabel", ""), "grid": plot_info.get("grid", False),
+            "xlim": (xmin, xmax), "ylim": plot_info.get("ylim"), "lines": lines}
+
+
+def template_views(plots, series, n_points):
+    return [plot_view(plot_info, template_traces(plot_info, series), n_points) for plot_info in plots]
+
+
+def draw_views(fig, views):
+    ## Used for draw the plot views, one under the other, in a figure
+    axs = fig.subplots(len(views), 1, squeeze=False)[:, 0]
+    for ax, view in zip(axs, views):
+        for line in view["lines"]:
+            ax.plot(line["x"], line["y"], label=line["label"], color=line["color"], visible=line["visible"])
+        ax.set_xlim(view["xlim"])
+        if view["ylim"]:
+            ax.set_ylim(view["ylim"])
+        ax.set_title(view["title"])
+        ax.set_xlabel(view["xlabel"], horizontalalignment='right', x=1.02, labelpad=-10)
+        ax.set_ylabel(view["ylabel"])
+        ax.grid(view["grid"])
+        if view["lines"]:
+            ax.legend()
+
+
+def render_views(views, path, fmt="png", dpi=100, figsize=None):
+    ## Used for write the plot views of one tab into a PNG/PDF/SVG file
+    if not views:
+        return False
+    with PROFILER.span("render_tab", "dibujo", path, formato=fmt):
+        fig = Figure(figsize=figsize or figure_size(len(views)), dpi=dpi)
+        FigureCanvasAgg(fig)
+        draw_views(fig, views)
+        fig.tight_layout()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fig.savefig(path, format=fmt)
+    return True
+
+
+def render_files(jobs, dpi=100, figsize=None):
+    ## Entry point of the export processes: [(path, fmt, views)] -> written paths
+    return [path for path, fmt, views in jobs if render_views(views, path, fmt, dpi, figsize)]
+
+
+def render_report(pages, path, dpi=100, page_size=None, landscape=False):
+    ## Used for write a multi-page PDF, one page [(tab name, views)] per tab
+    ## Returns the number of pages written
+    count = 0
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with PROFILER.span("render_report", "dibujo", path, paginas=len(pages)):
+        with PdfPages(path, metadata={"Title": os.path.splitext(os.path.basename(path))[0]}) as pdf:
+            for name, views in pages:
+                if not views:
+                    continue
+                fig = Figure(figsize=figure_size(len(views), page_size, landscape), dpi=dpi)
+                FigureCanvasAgg(fig)
+                draw_views(fig, views)
+                fig.suptitle(name)
+                fig.tight_layout()
+                pdf.savefig(fig)
+                count += 1
+    return count
+
+
+def render_in_pool(func, *args):
+    ## Used for run a render function in the process pool, or in this process
+    ## if the pool broke (a worker died)
+    try:
+        return get_process_pool().submit(func, *args).result()
+    except (BrokenProcessPool, OSError) as e:
+        print(f"[WARN] Falló el proceso de exportación, se dibuja en este proceso: {e}")
+        reset_process_pool()
+        return func(*args)
+
+
+def render_tab(tab_data, series, path, fmt="png", dpi=100, page_size=None, landscape=False):
+    ## Used for draw the plots of one template tab into a PNG/PDF/SVG file
+    ## series is {(file, channel, init_time): (time, values)}, missing series are skipped
+    plots = tab_data.get("plots", [])
+    if not plots:
+        return False
+    figsize = figure_size(len(plots), page_size, landscape)
+    views = template_views(plots, series, export_points(fmt, figsize[0], dpi))
+    return render_views(views, path, fmt, dpi, figsize)
@@ -0,0 +1,271 @@
+# Columnar sidecar cache of parsed simulation files
+# After the first parse the channels of a file are written as contiguous
+# arrays in a .bin file plus a small .json index (channel -> offset). Later
+# sessions memory-map the .bin instead of parsing the source again, so only
+# the pages of the channels that are plotted are read from disk.
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from data_store import FileData
+
+
+INDEX_VERSION = 1
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+
+
+def default_cache_dir():
+    # VIEWER_CACHE_DIR overrides the per-user cache location
+    if os.environ.get("VIEWER_CACHE_DIR"):
+        return os.environ["VIEWER_CACHE_DIR"]
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "PSSE_PSCAD_VIEWER", "cache")
+
+
+class FolderLock:
+    # Lock of the cache folder shared by every process that writes to it (the
+    # GUI, the reading processes and the batch CLIs): appends to a .bin, index
+    # updates and deletions of other sources happen one process at a time
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            return self
+        while True:
+            try:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                return self
+            except OSError:
+                time.sleep(0.01)
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+
+class SidecarCache:
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, dtype=None, enabled=True):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.dtype = np.dtype(dtype) if dtype is not None else None  # None: el de los datos
+        self.enabled = enabled
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def _paths(self, filepath):
+        key = hashlib.sha1(os.path.normcase(os.path.abspath(filepath)).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def _read_index(self, filepath):
+        index_path = self._paths(filepath)
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if index.get("version") != INDEX_VERSION:
+            return None
+        # Any change of size or mtime is a miss: a re-run simulation can keep
+        # the length, the header and the last rows and change the middle
+        st = os.stat(filepath)
+        if index["size"] != st.st_size or index["mtime_ns"] != st.st_mtime_ns:
+            return None
+        return index
+
+    def _folder_lock(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        return FolderLock(os.path.join(self.cache_dir, "cache.lock"))
+
+    def _write_index(self, index_path, index):
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, index_path)
+
+    def has_channels(self, filepath, channel_names):
+        ## Used for know, reading only the index, if all the channels are cached
+        if not self.enabled:
+            return False
+        with self._lock:
+            try:
+                index = self._read_index(filepath)
+            except OSError:
+                return False
+        return index is not None and all(name in index["channels"] for name in channel_names)
+
+    def load(self, filepath):
+        ## Used for get the cached FileData of filepath (memory-mapped) or None
+        if not self.enabled:
+            return None
+        with self._lock:
+            try:
+                index = self._read_index(filepath)
+                if index is None:
+                    self.misses += 1
+                    return None
+                data_path = os.path.join(self.cache_dir, index["data_file"])
+                if index["length"] == 0:
+                    return None
+                raw = np.memmap(data_path, dtype=index["dtype"], mode="r")
+                os.utime(self._paths(filepath))  # marca de uso para el límite de tamaño
+                self.hits += 1
+            except (OSError, ValueError, KeyError) as e:
+                print(f"[WARN] Caché de {filepath} no utilizable: {e}")
+                return None
+
+        itemsize = raw.dtype.itemsize
+        length = index["length"]
+
+        def column(offset):
+            start = offset // itemsize
+            return raw[start:start + length]
+
+        channels = {name: column(offset) for name, offset in index["channels"].items()}
+        return FileData(column(index["time"]), channels, mapped=True)
+
+    def store(self, filepath, time, channels):
+        ## Used for write (or extend) the sidecar of filepath with the given channels
+        if not self.enabled:
+            return
+        with self._lock:
+            try:
+                with self._folder_lock():
+                    self._store(filepath, time, channels)
+                    self._enforce_size_limit()
+            except OSError as e:
+                print(f"[WARN] No se pudo escribir la caché de {filepath}: {e}")
+
+    def _store(self, filepath, time, channels):
+        # Called with the folder lock: the index read here is the latest one
+        index_path = self._paths(filepath)
+        index = self._read_index(filepath)
+        time = np.asarray(time)
+        # The source dtype is kept (float32 for .out), other data is stored as float64
+        dtype = self.dtype or (time.dtype if time.dtype.kind == "f" else np.dtype("float64"))
+        if index is not None and (index["length"] != len(time) or np.dtype(index["dtype"]) != dtype):
+            index = None
+
+        changed = index is None
+        if index is None:
+            st = os.stat(filepath)
+            index = {
+                "version": INDEX_VERSION,
+                "source": os.path.abspath(filepath),
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+                "dtype": dtype.str,
+                "length": len(time),
+                "data_file": f"{os.path.splitext(os.path.basename(index_path))[0]}-{uuid.uuid4().hex[:8]}.bin",
+                "time": 0,
+                "channels": {},
+            }
+            self._remove_data_files(index_path)
+            with open(os.path.join(self.cache_dir, index["data_file"]), "wb") as f:
+                f.write(np.ascontiguousarray(time, dtype=dtype).tobytes())
+
+        new_channels = [(name, values) for name, values in channels.items() if name not in index["channels"]]
+        if new_channels:
+            data_path = os.path.join(self.cache_dir, index["data_file"])
+            with open(data_path, "r+b") as f:
+                # Blocks go right after the indexed ones: bytes left by a writer
+                # that died before updating the index are overwritten
+                itemsize = np.dtype(index["dtype"]).itemsize
+                offset = (1 + len(index["channels"])) * index["length"] * itemsize
+                if os.fstat(f.fileno()).st_size > offset:
+                    f.truncate(offset)
+                f.seek(offset)
+                for name, values in new_channels:
+                    block = np.ascontiguousarray(values, dtype=index["dtype"])
+                    if len(block) != index["length"]:
+                        continue
+                    f.write(block.tobytes())
+                    index["channels"][name] = offset
+                    offset += block.nbytes
+                    changed = True
+        if changed:
+            self._write_index(index_path, index)
+
+    def _remove_data_files(self, index_path):
+        # Old .bin files of the same source; on Windows a mapped file cannot be
+        # removed, it is cleaned up in a later session
+        prefix = os.path.splitext(os.path.basename(index_path))[0] + "-"
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(prefix) and name.endswith(".bin"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def enforce_size_limit(self):
+        ## Used for delete the least recently used sidecars above max_bytes
+        with self._lock, self._folder_lock():
+            self._enforce_size_limit()
+
+    def _enforce_size_limit(self):
+        names = os.listdir(self.cache_dir)
+        sizes = {}
+        for name in names:
+            if name.endswith(".bin"):
+                key = name.rsplit("-", 1)[0]
+                sizes[key] = sizes.get(key, 0) + os.path.getsize(os.path.join(self.cache_dir, name))
+
+        entries = []
+        for name in names:
+            if name.endswith(".json"):
+                index_path = os.path.join(self.cache_dir, name)
+                key = name[:-len(".json")]
+                entries.append((os.path.getmtime(index_path), index_path, sizes.get(key, 0) + os.path.getsize(index_path)))
+        total = sum(size for _, _, size in entries)
+
+        for _, index_path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove_data_files(index_path)
+            try:
+                os.remove(index_path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            if not os.path.isdir(self.cache_dir):
+                return
+            with self._folder_lock():
+                for name in os.listdir(self.cache_dir):
+                    if name.endswith((".json", ".bin", ".tmp")):
+                        try:
+                            os.remove(os.path.join(self.cache_dir, name))
+                        except OSError:
+                            pass
+
+
+# Caché compartida; VIEWER_SIDECAR_CACHE=0 la desactiva
+SIDECAR_CACHE = SidecarCache(
+    max_bytes=int(os.environ.get("VIEWER_CACHE_MAX_MB", DEFAULT_MAX_BYTES // 1024 ** 2)) * 1024 ** 2,
+    enabled=os.environ.get("VIEWER_SIDECAR_CACHE", "1") != "0",
+)
@@ -0,0 +1,21 @@
+# Stand-in for the legacy dyntools used by the tests of lector_out_legacy.py
+# The ".out" fixtures are JSON: {"names": [...], "time": [...], "values": [[...], ...]}.
+# A file named crash.out kills the process, like a crash of PSS®E.
+import json
+import os
+
+
+class CHNF:
+    def __init__(self, outfile):
+        if os.path.basename(outfile) == "crash.out":
+            os._exit(3)
+        with open(outfile) as f:
+            self.content = json.load(f)
+
+    def get_data(self):
+        ch_id = dict((index, name) for index, name in enumerate(self.content["names"], 1))
+        ch_id["time"] = "Time(s)"
+        ch_data = {"time": self.content["time"]}
+        for index, values in enumerate(self.content["values"], 1):
+            ch_data[index] = values
+        return "", ch_id, ch_data
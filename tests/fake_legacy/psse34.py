@@ -0,0 +1 @@
+# Stand-in for the psse34 module imported by lector_out_legacy.py
@@ -0,0 +1,23 @@
+import numpy as np
+
+from alignment import align, reference_differences
+
+
+def test_differences_apply_the_multiplier_of_each_trace():
+    # The same voltage in kV (reference) and in p. u. with a 230 kV base
+    time = np.linspace(0.0, 1.0, 11)
+    kv = 230.0 * (1.0 + 0.01 * np.sin(time))
+    pu = kv / 230.0
+    grid, aligned = align([(time, kv), (time, pu)])
+
+    differences = reference_differences(aligned, [1.0, 230.0], reference=0)
+
+    assert list(differences) == [1]
+    max_abs, rms = differences[1]
+    assert max_abs < 1e-9 and rms < 1e-9
+
+
+def test_differences_with_a_scaled_reference():
+    time = np.linspace(0.0, 1.0, 5)
+    grid, aligned = align([(time, np.full(5, 2.0)), (time, np.full(5, 3.0))])
+    assert reference_differences(aligned, [10.0, 1.0], reference=0) == {1: (17.0, 17.0)}
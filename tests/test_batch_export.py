@@ -0,0 +1,36 @@
+# Headless export of a template for many cases
+import os
+
+from batch_export import retarget_template
+
+
+def derived_template(file):
+    return {"tabs": [{"name": "P", "plots": [{"lines": [
+        {"file": file, "channel": "a", "label": "a"},
+        {"expression": "a * b", "label": "p", "inputs": {
+            "a": {"file": file, "channel": "a"},
+            "b": {"file": file, "channel": "b"},
+            "c": {"file": "other.out", "channel": "VOLT 101"}}},
+    ]}]}]}
+
+
+def test_derived_inputs_are_retargeted(tmp_path):
+    case = str(tmp_path / "case2.csv")
+    retargeted = retarget_template(derived_template("case1.csv"), case)
+
+    line, derived = retargeted["tabs"][0]["plots"][0]["lines"]
+    assert line["file"] == case
+    assert derived["inputs"]["a"]["file"] == case
+    assert derived["inputs"]["b"]["file"] == case
+    assert derived["inputs"]["c"]["file"] == "other.out"  # otro tipo de archivo
+
+
+def test_only_the_replaced_file_is_retargeted(tmp_path):
+    template = derived_template(os.path.abspath("case1.csv"))
+    template["tabs"][0]["plots"][0]["lines"][1]["inputs"]["b"]["file"] = "keep.csv"
+    case = str(tmp_path / "case2.csv")
+
+    derived = retarget_template(template, case, replace="case1.csv")["tabs"][0]["plots"][0]["lines"][1]
+
+    assert derived["inputs"]["a"]["file"] == case
+    assert derived["inputs"]["b"]["file"] == "keep.csv"
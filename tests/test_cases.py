@@ -0,0 +1,122 @@
+# Cache of the series of the last cases shown
+import os
+
+import numpy as np
+
+from cases import (CaseBinding, CaseCache, bind_template, case_from_file, discover_cases, make_generic,
+    unbind_template)
+
+
+def make_case(tmp_path, name):
+    path = tmp_path / f"{name}.csv"
+    path.write_text("time,a,b\n0,1,2\n")
+    return str(path)
+
+
+def series_of(requests):
+    return {request: (np.arange(3.0), np.full(3, float(len(request[1])))) for request in requests}
+
+
+def test_only_the_loaded_requests_are_cached_and_later_tabs_are_added(tmp_path):
+    file = make_case(tmp_path, "c1")
+    first_tab, second_tab = [(file, "a", None)], [(file, "b", None)]
+    cache = CaseCache()
+
+    cache.put("c1", first_tab + second_tab, series_of(first_tab))
+    assert list(cache.get("c1", first_tab + second_tab)) == first_tab
+
+    cache.put("c1", first_tab + second_tab, series_of(second_tab))
+    assert sorted(cache.get("c1", first_tab + second_tab)) == sorted(first_tab + second_tab)
+    assert list(cache.get("c1", second_tab)) == second_tab
+
+
+def test_entry_is_dropped_when_a_file_changes(tmp_path):
+    file = make_case(tmp_path, "c1")
+    requests = [(file, "a", None)]
+    cache = CaseCache()
+    cache.put("c1", requests, series_of(requests))
+
+    st = os.stat(file)
+    os.utime(file, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert cache.get("c1", requests) is None
+    assert "c1" not in cache
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_key_is_the_case_and_the_request(tmp_path):
+    file = make_case(tmp_path, "c1")
+    cache = CaseCache()
+    cache.put("c1", [(file, "a", None)], series_of([(file, "a", None)]))
+
+    assert cache.get("c2", [(file, "a", None)]) is None
+    assert cache.get("c1", [(file, "a", 1.0)]) == {}  # otro tiempo de inicialización
+
+
+def test_least_recently_shown_cases_are_evicted(tmp_path):
+    cache = CaseCache(max_cases=1)
+    names = ["c1", "c2", "c3", "c4"]
+    for name in names[:3]:
+        requests = [(make_case(tmp_path, name), "a", None)]
+        cache.put(name, requests, series_of(requests))
+    cache.get("c1", [])  # c1 pasa a ser el más reciente
+    requests = [(make_case(tmp_path, "c4"), "a", None)]
+    cache.put("c4", requests, series_of(requests))
+
+    assert [name for name in names if name in cache] == ["c1", "c3", "c4"]
+
+
+def case_dir_with(tmp_path, names):
+    for name in names:
+        (tmp_path / f"{name}.out").write_text("")
+        (tmp_path / f"{name}_pscad").mkdir()
+        (tmp_path / f"{name}_pscad" / f"{name}.csv").write_text("time,P\n0,1\n")
+    return str(tmp_path)
+
+
+ALIASES = {"PSSE": "{case_dir}/{case}.out", "PSCAD": "{case_dir}/{case}_pscad/{case}.csv"}
+
+
+def generic_template():
+    return {"aliases": dict(ALIASES), "files": {"psse": ["PSSE"], "pscad": ["PSCAD"]},
+            "tabs": [{"name": "P", "plots": [{"lines": [
+                {"file": "PSSE", "channel": "POWR 101", "label": "psse"},
+                {"expression": "a - b", "label": "diff", "inputs": {
+                    "a": {"file": "PSSE", "channel": "POWR 101"},
+                    "b": {"file": "PSCAD", "channel": "P"}}}]}]}]}
+
+
+def test_cases_are_discovered_and_bound(tmp_path):
+    case_dir = case_dir_with(tmp_path, ["caseB", "caseA"])
+    (tmp_path / "notes.txt").write_text("")
+
+    assert discover_cases(generic_template(), case_dir) == ["caseA", "caseB"]
+    bound = bind_template(generic_template(), "caseA", case_dir)
+    line, derived = bound["tabs"][0]["plots"][0]["lines"]
+    assert line["file"] == os.path.normpath(f"{case_dir}/caseA.out")
+    assert derived["inputs"]["b"]["file"] == os.path.normpath(f"{case_dir}/caseA_pscad/caseA.csv")
+    assert bound["files"]["pscad"] == [os.path.normpath(f"{case_dir}/caseA_pscad/caseA.csv")]
+
+    binding = CaseBinding(generic_template(), case_dir)
+    assert binding.neighbors("caseA") == ["caseB"]
+    assert len(binding.requests("caseB")) == 3
+
+
+def test_concrete_template_becomes_generic_and_back(tmp_path):
+    case_dir = case_dir_with(tmp_path, ["caseA"])
+    concrete = bind_template(generic_template(), "caseA", case_dir)
+    del concrete["aliases"]
+
+    generic, case, found_dir = make_generic(concrete)
+
+    assert (case, found_dir) == ("caseA", case_dir)
+    assert generic["tabs"][0]["plots"][0]["lines"][0]["file"] == "PSSE"
+    assert bind_template(generic, "caseA", case_dir)["tabs"] == concrete["tabs"]
+    assert unbind_template(concrete, generic["aliases"], case, case_dir)["tabs"] == generic["tabs"]
+
+
+def test_case_of_a_result_file(tmp_path):
+    case_dir = case_dir_with(tmp_path, ["caseA"])
+
+    assert case_from_file(generic_template(), f"{case_dir}/caseA_pscad/caseA.csv") == ("caseA", case_dir)
+    assert case_from_file(generic_template(), f"{case_dir}/caseA.out") == ("caseA", case_dir)
+    assert case_from_file(generic_template(), f"{case_dir}/other.txt") is None
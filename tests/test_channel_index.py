@@ -0,0 +1,52 @@
+# Searchable index of the channel names of a file
+from channel_index import ChannelIndex, get_channel_index
+
+
+NAMES = ["VOLT 1012 [BUS A]", "VOLT 101 [BUS B]", "POWR 1012 TO 2000", "ANGL 1012", "Pgen_Wind", "volt_ref"]
+
+
+def found(index, query):
+    return [index.names[i] for i in index.search(query)]
+
+
+def test_prefix_matches_come_first():
+    index = ChannelIndex(NAMES)
+
+    assert found(index, "volt")[:3] == ["VOLT 101 [BUS B]", "VOLT 1012 [BUS A]", "volt_ref"]
+
+
+def test_every_query_token_must_start_a_name_token():
+    index = ChannelIndex(NAMES)
+
+    assert found(index, "1012 volt") == ["VOLT 1012 [BUS A]"]
+    assert set(found(index, "1012")) == {"VOLT 1012 [BUS A]", "POWR 1012 TO 2000", "ANGL 1012"}
+    assert found(index, "2000 angl") == []
+
+
+def test_substrings_inside_a_token_are_found_last():
+    index = ChannelIndex(NAMES)
+
+    assert found(index, "wind") == ["Pgen_Wind"]
+    assert found(index, "gen") == ["Pgen_Wind"]
+
+
+def test_empty_query_lists_every_name_in_file_order():
+    index = ChannelIndex(NAMES)
+
+    assert found(index, "  ") == NAMES
+
+
+def test_index_is_built_once_per_file_version(tmp_path):
+    path = tmp_path / "case.csv"
+    path.write_text("time,a\n")
+    calls = []
+
+    def list_channels(filepath):
+        calls.append(filepath)
+        return NAMES
+
+    first = get_channel_index(str(path), list_channels)
+    assert get_channel_index(str(path), list_channels) is first
+    path.write_text("time,a,b\n")  # nueva versión del archivo
+    assert get_channel_index(str(path), list_channels) is not first
+    assert len(calls) == 2
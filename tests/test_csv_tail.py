@@ -0,0 +1,76 @@
+# Following a PSCAD CSV that is still being written
+import numpy as np
+
+import csv_tail
+from csv_tail import CsvTail
+
+
+def write(path, text, mode="w"):
+    with open(path, mode, newline="") as f:
+        f.write(text)
+
+
+def test_only_appended_complete_rows_are_read(tmp_path):
+    path = tmp_path / "run.csv"
+    write(path, "time,a,b\n0.0,1,10\n0.1,2,20\n")
+    tail = CsvTail(str(path))
+    tail.skip_to_end()
+
+    write(path, "0.2,3,30\n0.3,4,", "a")  # la última fila aún se está escribiendo
+    time, data = tail.read_new(["b", "zz"])
+    np.testing.assert_array_equal(time, [0.2])
+    assert list(data) == ["b"]
+    np.testing.assert_array_equal(data["b"], [30.0])
+
+    time, data = tail.read_new(["b"])
+    assert len(time) == 0
+
+    write(path, "40\n", "a")
+    time, data = tail.read_new(["a", "b"])
+    np.testing.assert_array_equal(time, [0.3])
+    np.testing.assert_array_equal(data["a"], [4.0])
+    np.testing.assert_array_equal(data["b"], [40.0])
+
+
+def test_skip_to_end_stops_after_the_last_complete_row(tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_tail, "TAIL_WINDOW", 8)  # filas más largas que la ventana
+    path = tmp_path / "run.csv"
+    write(path, "time,a\n" + "".join(f"{i / 10:.6f},{i * 1000:.6f}\n" for i in range(50)) + "5.000000,12")
+    tail = CsvTail(str(path))
+    tail.skip_to_end()
+
+    write(path, "3\n", "a")
+    time, data = tail.read_new(["a"])
+    np.testing.assert_array_equal(time, [5.0])
+    np.testing.assert_array_equal(data["a"], [123.0])
+
+
+def test_rewrite_with_the_same_header_is_detected(tmp_path):
+    path = tmp_path / "run.csv"
+    write(path, "time,a\n0.0,1\n0.1,2\n")
+    tail = CsvTail(str(path))
+    tail.skip_to_end()
+
+    # Nueva simulación: mismo encabezado y ya más larga que lo leído
+    write(path, "time,a\n0.0,7\n0.1,8\n0.2,9\n")
+    assert tail.read_new(["a"]) is None
+
+    tail.skip_to_end()
+    write(path, "0.3,10\n", "a")
+    time, data = tail.read_new(["a"])
+    np.testing.assert_array_equal(data["a"], [10.0])
+
+
+def test_truncation_and_new_columns_are_detected(tmp_path):
+    path = tmp_path / "run.csv"
+    write(path, "time,a\n0.0,1\n0.1,2\n")
+    tail = CsvTail(str(path))
+    tail.skip_to_end()
+
+    write(path, "time,a,b\n")
+    assert tail.read_new(["a"]) is None
+    assert tail.header == ["time", "a", "b"]
+
+    write(path, "0.0,1,5\n", "a")
+    time, data = tail.read_new(["b"])
+    np.testing.assert_array_equal(data["b"], [5.0])
@@ -0,0 +1,20 @@
+import pytest
+
+from data_store import DataStore, FileData
+
+
+def test_failed_load_releases_the_file_lock(tmp_path):
+    path = tmp_path / "case.csv"
+    path.write_text("time,a\n0,1\n")
+    store = DataStore()
+
+    def failing(filepath):
+        raise ValueError("archivo corrupto")
+
+    with pytest.raises(ValueError):
+        store.get(str(path), failing)
+    assert store._loading == {}
+
+    data = store.get(str(path), lambda filepath: FileData([0.0], {"a": [1.0]}))
+    assert data.channel_names() == ["a"]
+    assert store._loading == {}
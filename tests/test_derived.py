@@ -0,0 +1,27 @@
+import time
+
+import numpy as np
+import pytest
+
+from derived import ExpressionError, evaluate
+
+
+def series(values):
+    return np.linspace(0.0, 1.0, len(values)), np.asarray(values, dtype=float)
+
+
+def test_expression_over_two_channels():
+    t, result = evaluate("a * b + 1", {"a": series([1, 2, 3]), "b": series([2, 2, 2])})
+    np.testing.assert_allclose(result, [3.0, 5.0, 7.0])
+
+
+@pytest.mark.parametrize("expression", ["a + 9**9**7", "a + 9**9**9**9", "a * 2**10**10"])
+def test_huge_integer_powers_fail_fast(expression):
+    start = time.perf_counter()
+    with pytest.raises(ExpressionError):
+        evaluate(expression, {"a": series([1, 2, 3])})
+    assert time.perf_counter() - start < 0.5
+
+
+def test_small_integer_powers_still_work():
+    np.testing.assert_allclose(evaluate("a ** 2 + 2**3", {"a": series([1, 2, 3])})[1], [9.0, 12.0, 17.0])
@@ -0,0 +1,124 @@
+# Export of a template to PNG/SVG/PDF and to the multi-page PDF report
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+import batch_export
+from render import REPORT_NAME, export_points, figure_size, render_files, render_report, template_views
+
+
+def write_case(path, final=2.0):
+    time = np.linspace(0.0, 10.0, 5001)
+    pd.DataFrame({"time": time, "P": np.where(time < 1.0, 1.0, final), "Q": np.sin(time)}).to_csv(path, index=False)
+
+
+def two_tab_template(file):
+    return {"tabs": [
+        {"name": "Potencia activa", "plots": [{"title": "P", "lines": [{"file": file, "channel": "P", "label": "P", "init_time": 0}]}]},
+        {"name": "Reactiva", "plots": [
+            {"title": "Q", "lines": [{"file": file, "channel": "Q", "label": "Q", "init_time": 0}]},
+            {"title": "P y Q", "xlim": [0.0, 2.0], "lines": [{"file": file, "channel": "P", "label": "P", "init_time": 0},
+                                                              {"file": file, "channel": "Q", "label": "Q", "init_time": 0}]}]},
+        {"name": "Vacía", "plots": []},
+    ]}
+
+
+def pdf_pages(path):
+    with open(path, "rb") as f:
+        return len(re.findall(rb"/Type\s*/Page\b(?!s)", f.read()))
+
+
+def check_header(path, fmt):
+    with open(path, "rb") as f:
+        head = f.read(256)
+    if fmt == "png":
+        assert head.startswith(b"\x89PNG")
+    elif fmt == "pdf":
+        assert head.startswith(b"%PDF")
+    else:
+        assert b"<svg" in head or b"<?xml" in head
+
+
+def test_export_case_writes_every_format_and_the_report(tmp_path):
+    case = tmp_path / "case1.csv"
+    write_case(case)
+    output = tmp_path / "salida"
+
+    written, _, _ = batch_export.export_case(two_tab_template("base.csv"), str(case), str(output),
+                                             ["png", "svg", "pdf"], report=True)
+
+    case_dir = output / "case1"
+    expected = [str(case_dir / f"{tab}.{fmt}") for tab in ("Potencia_activa", "Reactiva") for fmt in ("png", "svg", "pdf")]
+    assert written == expected + [str(case_dir / REPORT_NAME)]
+    for path in expected:
+        check_header(path, os.path.splitext(path)[1][1:])
+    # Una página por pestaña con gráficos, la vacía no se escribe
+    assert pdf_pages(case_dir / REPORT_NAME) == 2
+    assert sorted(os.listdir(case_dir)) == sorted(os.path.basename(path) for path in written)
+
+
+def test_views_are_decimated_to_the_export_density(tmp_path):
+    case = tmp_path / "case1.csv"
+    write_case(case)
+    template = batch_export.retarget_template(two_tab_template("base.csv"), str(case))
+    plots = template["tabs"][1]["plots"]
+    series = batch_export.load_series_batch(batch_export.template_requests(template))
+    n_points = export_points("png", figure_size(len(plots))[0], 10)
+
+    views = template_views(plots, series, n_points)
+
+    assert [view["title"] for view in views] == ["Q", "P y Q"]
+    assert views[0]["xlim"] == (0.0, 10.0)
+    assert views[1]["xlim"] == (0.0, 2.0)
+    q_time = views[0]["lines"][0]["x"]
+    assert len(q_time) < 5001
+    assert (q_time[0], q_time[-1]) == (0.0, 10.0)
+    # Only the samples of the xlim window, and one beyond each edge
+    for line in views[1]["lines"]:
+        assert line["x"][0] == 0.0 and line["x"][-2] <= 2.0 < line["x"][-1] < 2.01
+    q = views[0]["lines"][0]["y"]
+    assert q.max() == np.sin(np.linspace(0.0, 10.0, 5001)).max()  # el envolvente conserva los picos
+
+
+def test_render_skips_empty_tabs(tmp_path):
+    case = tmp_path / "case1.csv"
+    write_case(case)
+    template = batch_export.retarget_template(two_tab_template("base.csv"), str(case))
+    series = batch_export.load_series_batch(batch_export.template_requests(template))
+    views = template_views(template["tabs"][0]["plots"], series, 200)
+
+    written = render_files([(str(tmp_path / "a.png"), "png", views), (str(tmp_path / "b.png"), "png", [])])
+    pages = render_report([("A", views), ("B", []), ("C", views)], str(tmp_path / "informe.pdf"), page_size="A4")
+
+    assert written == [str(tmp_path / "a.png")]
+    assert pages == 2
+    assert pdf_pages(tmp_path / "informe.pdf") == 2
+
+
+def test_batch_export_of_two_cases(tmp_path):
+    for name, final in (("case1", 2.0), ("case2", 4.0)):
+        write_case(tmp_path / f"{name}.csv", final)
+    template = tmp_path / "template.json"
+    template.write_text(json.dumps(two_tab_template("base.csv")))
+    output = tmp_path / "exportacion"
+
+    code = batch_export.main([str(template), str(tmp_path / "case*.csv"), "--salida", str(output),
+                              "--formato", "png,svg", "--informe", "--procesos", "1"])
+
+    assert code == 0
+    for name in ("case1", "case2"):
+        assert sorted(os.listdir(output / name)) == ["Potencia_activa.png", "Potencia_activa.svg",
+                                                     "Reactiva.png", "Reactiva.svg", REPORT_NAME]
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    write_case(tmp_path / "case1.csv")
+    template = tmp_path / "template.json"
+    template.write_text(json.dumps(two_tab_template("base.csv")))
+
+    assert batch_export.main([str(template), str(tmp_path / "case1.csv"), "--salida", str(tmp_path / "out"),
+                              "--formato", "png,bmp", "--procesos", "1"]) == 2
+    assert not (tmp_path / "out").exists()
@@ -0,0 +1,108 @@
+# The persistent Python 2.7 reader and its client, with this interpreter as
+# the stand-in for Python 2.7 and tests/fake_legacy as psse34 and dyntools
+import json
+import os
+import struct
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from legacy_worker import LEGACY_SCRIPT, LegacyOutWorker, LegacyWorkerError
+
+
+FAKE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_legacy")
+
+
+@pytest.fixture(autouse=True)
+def fake_psse(monkeypatch):
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(filter(None, [FAKE_DIR, os.environ.get("PYTHONPATH")])))
+
+
+@pytest.fixture
+def out_file(tmp_path):
+    path = tmp_path / "case.out"
+    path.write_text(json.dumps({"names": ["VOLT 101", "POWR 101", "VOLT 101"], "time": [0.0, 0.5, 1.0],
+                                "values": [[1.0, 0.9, 1.0], [10.0, 20.0, 30.0], [7.0, 7.0, 7.0]]}))
+    return str(path)
+
+
+@pytest.fixture
+def worker():
+    worker = LegacyOutWorker(python=sys.executable)
+    yield worker
+    worker.close()
+
+
+def frame(obj):
+    payload = json.dumps(obj).encode("utf-8")
+    return struct.pack(">I", len(payload)) + payload
+
+
+def read_frame(stream):
+    size = struct.unpack(">I", stream.read(4))[0]
+    return stream.read(size)
+
+
+def test_framing_of_requests_and_replies(out_file):
+    process = subprocess.Popen([sys.executable, LEGACY_SCRIPT, "--server"], stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE)
+    try:
+        # A malformed request gets an error reply and the server keeps going
+        process.stdin.write(struct.pack(">I", 3) + b"{x}" + frame({"cmd": "data", "file": out_file,
+                                                                     "channels": ["POWR 101"]}))
+        process.stdin.flush()
+        assert json.loads(read_frame(process.stdout))["ok"] is False
+        header = json.loads(read_frame(process.stdout))
+        assert header == {"ok": True, "length": 3, "channels": ["POWR 101"]}
+        payload = read_frame(process.stdout)
+        assert len(payload) == 2 * 3 * 8
+        np.testing.assert_array_equal(np.frombuffer(payload, dtype="<f8"), [0.0, 0.5, 1.0, 10.0, 20.0, 30.0])
+    finally:
+        process.kill()
+        process.wait()
+
+
+def test_channels_and_multi_channel_request(worker, out_file):
+    assert sorted(worker.get_channels(out_file)) == ["POWR 101", "VOLT 101", "VOLT 101"]
+    time, channels = worker.get_data(out_file, ["VOLT 101", "POWR 101"])
+    np.testing.assert_array_equal(time, [0.0, 0.5, 1.0])
+    np.testing.assert_array_equal(channels["VOLT 101"], [1.0, 0.9, 1.0])  # el primero de los repetidos
+    np.testing.assert_array_equal(channels["POWR 101"], [10.0, 20.0, 30.0])
+
+
+def test_unknown_channel_is_left_out(worker, out_file):
+    time, channels = worker.get_data(out_file, ["POWR 101", "NO EXISTE"])
+    assert list(channels) == ["POWR 101"]
+    assert worker.get_data(out_file, ["NO EXISTE"])[1] == {}
+
+
+def test_error_reply_keeps_the_worker(worker, out_file, tmp_path):
+    with pytest.raises(LegacyWorkerError):
+        worker.get_channels(str(tmp_path / "missing.out"))
+    process = worker._process
+    assert worker.get_channels(out_file)
+    assert worker._process is process
+
+
+def test_crashed_worker_is_restarted(worker, out_file, tmp_path):
+    worker.get_channels(out_file)
+    first = worker._process
+    crash = tmp_path / "crash.out"
+    crash.write_text("{}")
+    with pytest.raises(LegacyWorkerError):
+        worker.get_channels(str(crash))
+    assert first.poll() is not None
+    assert worker.get_data(out_file, ["POWR 101"])[1]["POWR 101"][-1] == 30.0
+    assert worker._process is not first
+
+
+def test_server_exits_at_end_of_input(out_file):
+    process = subprocess.Popen([sys.executable, LEGACY_SCRIPT, "--server"], stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE)
+    process.stdin.write(frame({"cmd": "channels", "file": out_file}))
+    process.stdin.close()
+    assert json.loads(read_frame(process.stdout))["ok"] is True
+    assert process.wait(timeout=10) == 0
+    assert process.stdout.read() == b""
@@ -0,0 +1,84 @@
+# Index of the plotted lines by the file and channel they show
+import gc
+
+from line_registry import LineRegistry
+
+
+class Plot:
+    pass
+
+
+class Line:
+    pass
+
+
+def test_lines_and_plots_of_a_file():
+    registry = LineRegistry()
+    plot_a, plot_b = Plot(), Plot()
+    volt, powr, other = Line(), Line(), Line()
+    registry.register(volt, plot_a, [("a.csv", "VOLT", None)])
+    registry.register(powr, plot_b, [("a.csv", "POWR", 0.5)])
+    registry.register(other, plot_b, [("b.csv", "VOLT", None)])
+
+    assert registry.lines_of("a.csv", "VOLT") == [(plot_a, volt)]
+    assert {line for _, line in registry.lines_of("a.csv")} == {volt, powr}
+    assert registry.lines_of("c.csv") == []
+    assert registry.plots_of(["a.csv"]) == {plot_a: [volt], plot_b: [powr]}
+    assert registry.plots_of(["b.csv", "b.csv"]) == {plot_b: [other]}
+
+
+def test_derived_line_is_indexed_under_each_input():
+    registry = LineRegistry()
+    plot = Plot()
+    derived = Line()
+    registry.register(derived, plot, [("a.csv", "P", None), ("b.out", "Q", None), ("a.csv", "P", 1.0)])
+
+    assert registry.lines_of("a.csv", "P") == [(plot, derived)]
+    assert registry.lines_of("b.out", "Q") == [(plot, derived)]
+    # A line that uses both files is listed once
+    assert registry.plots_of(["a.csv", "b.out"]) == {plot: [derived]}
+
+
+def test_register_again_moves_the_line():
+    registry = LineRegistry()
+    plot = Plot()
+    line = Line()
+    registry.register(line, plot, [("a.csv", "VOLT", None)])
+    registry.register(line, plot, [("b.csv", "VOLT", None)])
+
+    assert registry.lines_of("a.csv") == []
+    assert registry.lines_of("b.csv") == [(plot, line)]
+
+
+def test_unregister():
+    registry = LineRegistry()
+    plot = Plot()
+    kept, removed = Line(), Line()
+    registry.register(kept, plot, [("a.csv", "VOLT", None)])
+    registry.register(removed, plot, [("a.csv", "POWR", None)])
+
+    registry.unregister(removed)
+    registry.unregister(Line())  # no registrada, no hace nada
+
+    assert registry.lines_of("a.csv") == [(plot, kept)]
+    assert "POWR" not in registry._index["a.csv"]
+    registry.unregister(kept)
+    assert registry._index == {}
+
+
+def test_collected_lines_and_plots_leave_the_index():
+    registry = LineRegistry()
+    plot, kept_plot = Plot(), Plot()
+    line, kept = Line(), Line()
+    registry.register(line, plot, [("a.csv", "VOLT", None)])
+    registry.register(kept, kept_plot, [("a.csv", "POWR", None)])
+
+    del line
+    gc.collect()
+    assert registry.lines_of("a.csv") == [(kept_plot, kept)]
+
+    # A line whose plot is gone is not listed
+    del kept_plot
+    gc.collect()
+    assert registry.lines_of("a.csv") == []
+    assert registry.plots_of(["a.csv"]) == {}
@@ -0,0 +1,88 @@
+# Min/max envelope level of detail of the plotted traces
+import numpy as np
+
+from lod import LOD_BASE_BUCKET, TraceLOD
+
+
+def noisy_trace(n=200_000, seed=1):
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0.0, 20.0, n)
+    y = np.sin(x) + rng.normal(0, 0.1, n)
+    y[n * 3 // 5 + 7] = 25.0  # picos de una sola muestra
+    y[n // 50 + 3] = -30.0
+    return x, y
+
+
+def test_envelope_keeps_the_extremes_of_every_bucket():
+    x, y = noisy_trace()
+    lod = TraceLOD(x, y)
+
+    vx, vy = lod.view(0.0, 20.0, 1000)
+
+    assert len(vx) <= 1000
+    assert np.all(np.diff(vx) >= 0)
+    assert vy.max() == 25.0 and vy.min() == -30.0
+    # Every point drawn is a real sample of the trace
+    np.testing.assert_array_equal(y[np.searchsorted(x, vx)], vy)
+    # and each pair of points is the min and the max of one bucket of samples
+    bucket = LOD_BASE_BUCKET
+    while len(y) / bucket > 500:
+        bucket *= 2
+    padded = np.concatenate([y, np.full(-len(y) % bucket, np.nan)]).reshape(-1, bucket)
+    pairs = vy.reshape(-1, 2)
+    np.testing.assert_array_equal(pairs.min(axis=1), np.nanmin(padded, axis=1))
+    np.testing.assert_array_equal(pairs.max(axis=1), np.nanmax(padded, axis=1))
+
+
+def test_window_is_cut_and_reaches_the_borders():
+    x, y = noisy_trace()
+    lod = TraceLOD(x, y)
+
+    vx, vy = lod.view(5.0, 6.0, 400)
+
+    assert vx[0] <= 5.0 and vx[-1] >= 6.0
+    inside = (x >= 5.0) & (x <= 6.0)
+    assert vy.max() >= y[inside].max()
+    assert vy.min() <= y[inside].min()
+
+
+def test_small_windows_use_the_raw_samples():
+    x, y = noisy_trace()
+    lod = TraceLOD(x, y)
+
+    vx, vy = lod.view(x[1000], x[1100], 2000)
+
+    np.testing.assert_array_equal(vx, x[999:1102])
+    np.testing.assert_array_equal(vy, y[999:1102])
+
+
+def test_multiplier_and_offset_are_applied_on_view():
+    x, y = noisy_trace(n=10_000)
+    lod = TraceLOD(x, y, scale=2.0, offset=1.5)
+
+    vx, vy = lod.full_data()
+
+    np.testing.assert_array_equal(vx, x + 1.5)
+    np.testing.assert_array_equal(vy, 2.0 * y)
+
+
+def test_extend_matches_a_trace_built_at_once():
+    x, y = noisy_trace()
+    split = 150_001  # no coincide con el borde de un bucket
+    assert split % LOD_BASE_BUCKET
+    grown = TraceLOD(x[:split], y[:split])
+    grown.view(0.0, 20.0, 1000)  # construye la pirámide antes de crecer
+    grown.extend(x[split:], y[split:])
+    built = TraceLOD(x, y)
+
+    for window in ((0.0, 20.0), (14.0, 16.0), (19.9, 20.0)):
+        np.testing.assert_array_equal(grown.view(*window, 800)[1], built.view(*window, 800)[1])
+
+
+def test_non_monotonic_time_is_drawn_in_full():
+    x = np.array([0.0, 1.0, 0.5, 2.0] * 1000)
+    y = np.arange(len(x), dtype=float)
+    lod = TraceLOD(x, y)
+
+    assert not lod.monotonic
+    assert len(lod.view(0.0, 1.0, 100)[0]) == len(x)
@@ -0,0 +1,87 @@
+# Compliance metrics of step responses and their headless batch table
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch_metrics
+from metrics import DEFAULT_PARAMS, MetricsCache, comparison_metrics, compute_step_metrics, step_metrics
+
+
+def first_order(time, tau=0.5, event=1.0, initial=1.0, final=2.0):
+    return np.where(time < event, initial, final + (initial - final) * np.exp(-(time - event) / tau))
+
+
+def test_step_of_a_first_order_response():
+    time = np.linspace(0.0, 10.0, 100_001)
+    params = DEFAULT_PARAMS._replace(event_time=1.0, target=2.0)
+
+    row = step_metrics(time, first_order(time), params)[0]
+
+    assert row["inicial"] == pytest.approx(1.0)
+    assert row["final"] == pytest.approx(2.0, abs=1e-6)
+    assert row["tiempo_subida_s"] == pytest.approx(0.5 * np.log(9), abs=1e-3)  # 10 % a 90 %
+    assert row["tiempo_establecimiento_s"] == pytest.approx(0.5 * np.log(20), abs=1e-3)  # banda del 5 %
+    assert row["sobrepico_pct"] == pytest.approx(0.0, abs=1e-3)
+    assert row["error_estacionario"] == pytest.approx(0.0, abs=1e-6)
+
+
+def test_overshoot_and_detected_event():
+    time = np.linspace(0.0, 10.0, 20_001)
+    values = np.where(time < 2.0, 0.0, 1.0 - np.exp(-(time - 2.0)) * np.cos(4 * (time - 2.0)))
+
+    row = step_metrics(time, values)[0]
+
+    assert row["evento_s"] == pytest.approx(2.0, abs=0.1)
+    assert row["sobrepico_pct"] == pytest.approx(100 * (values.max() - 1.0), rel=1e-3)
+
+
+def test_traces_sharing_time_are_measured_together_and_cached():
+    time = np.linspace(0.0, 10.0, 1001)
+    cache = MetricsCache()
+    traces = [("a", time, first_order(time)), ("b", time, first_order(time, final=3.0))]
+
+    rows = compute_step_metrics(traces, cache=cache)
+    again = compute_step_metrics(traces, cache=cache)
+
+    assert [row["final"] for row in rows] == pytest.approx([2.0, 3.0], abs=1e-3)
+    assert again == rows
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_error_against_a_reference_on_another_grid():
+    fine = np.linspace(0.0, 10.0, 10_001)
+    coarse = np.linspace(0.0, 10.0, 1001)
+
+    row = comparison_metrics((fine, first_order(fine)), (coarse, first_order(coarse) + 0.01))
+
+    assert row["error_max"] == pytest.approx(0.01, abs=1e-3)
+    assert row["dentro_banda_pct"] == pytest.approx(100.0)
+
+
+def write_case(path, final):
+    time = np.linspace(0.0, 10.0, 2001)
+    pd.DataFrame({"time": time, "P": first_order(time, final=final), "Q": first_order(time, final=final) + 0.5}) \
+        .to_csv(path, index=False)
+
+
+def test_batch_table_of_two_cases(tmp_path):
+    for name, final in (("case1", 2.0), ("case2", 4.0)):
+        write_case(tmp_path / f"{name}.csv", final)
+    template = tmp_path / "template.json"
+    template.write_text(json.dumps({"tabs": [{"name": "Potencia", "plots": [{"title": "P y Q", "lines": [
+        {"file": "base.csv", "channel": "P", "label": "P", "init_time": 0},
+        {"file": "base.csv", "channel": "Q", "label": "Q", "init_time": 0}]}]}]}))
+    output = tmp_path / "metricas.json"
+
+    code = batch_metrics.main([str(template), str(tmp_path / "case*.csv"), "--salida", str(output),
+                               "--evento", "1.0", "--procesos", "1"])
+
+    assert code == 0
+    rows = json.loads(output.read_text(encoding="utf-8"))
+    assert [(row["caso"], row["curva"]) for row in rows] == [("case1", "P"), ("case1", "Q"), ("case2", "P"), ("case2", "Q")]
+    assert [row["final"] for row in rows] == pytest.approx([2.0, 2.5, 4.0, 4.5], abs=1e-3)
+    assert rows[0]["error_max"] is None  # la referencia
+    assert rows[1]["error_max"] == pytest.approx(0.5, abs=1e-6)
+    assert {row["gráfico"] for row in rows} == {"P y Q"}
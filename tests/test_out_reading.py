@@ -0,0 +1,89 @@
+# Reading of .out files: channel listing and selected channels through
+# dyntools, and the Python 2.7 fallback when dyntools fails. The stand-in
+# dyntools of tests/fake_legacy serves both paths from JSON fixtures.
+import importlib.util
+import json
+import os
+import sys
+
+import pytest
+
+import readers
+from data_store import DATA_STORE
+from legacy_worker import LegacyOutWorker
+from sidecar_cache import SidecarCache
+
+
+FAKE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_legacy")
+
+
+def load_fake_dyntools():
+    spec = importlib.util.spec_from_file_location("fake_dyntools", os.path.join(FAKE_DIR, "dyntools.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def out_file(tmp_path):
+    path = tmp_path / "case.out"
+    path.write_text(json.dumps({"names": ["VOLT 101", "POWR 101", "ANGL 101"], "time": [0.0, 0.5, 1.0],
+                                "values": [[1.0, 0.9, 1.0], [10.0, 20.0, 30.0], [5.0, 6.0, 7.0]]}))
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(readers, "SIDECAR_CACHE", SidecarCache(str(tmp_path / "cache"), enabled=False))
+    DATA_STORE.clear()
+    yield
+    DATA_STORE.clear()
+
+
+@pytest.fixture
+def dyntools(monkeypatch):
+    monkeypatch.setattr(readers, "dy", load_fake_dyntools())
+
+
+@pytest.fixture
+def legacy(monkeypatch):
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(filter(None, [FAKE_DIR, os.environ.get("PYTHONPATH")])))
+    worker = LegacyOutWorker(python=sys.executable)
+    monkeypatch.setattr(readers, "LEGACY_WORKER", worker)
+    yield worker
+    worker.close()
+
+
+def test_channel_listing(dyntools, out_file):
+    assert readers.get_channels_from_out(out_file) == ["VOLT 101", "POWR 101", "ANGL 101"]
+
+
+def test_selected_channels(dyntools, out_file):
+    results = readers.get_channels_data_from_out(out_file, ["POWR 101", "ANGL 101", "FREQ 101"])
+
+    assert sorted(results) == ["ANGL 101", "POWR 101"]
+    time, values = results["POWR 101"]
+    assert list(time) == [0.0, 0.5, 1.0]
+    assert list(values) == [10.0, 20.0, 30.0]
+    assert list(readers.get_channel_data_from_out(out_file, "FREQ 101")[1]) == []
+
+
+def test_fallback_when_dyntools_is_missing(monkeypatch, legacy, out_file):
+    monkeypatch.setattr(readers, "dy", None)
+
+    assert readers.get_channels_from_out(out_file) == ["VOLT 101", "POWR 101", "ANGL 101"]
+    results = readers.get_channels_data_from_out(out_file, ["VOLT 101", "FREQ 101"])
+    assert list(results) == ["VOLT 101"]
+    assert list(results["VOLT 101"][1]) == [1.0, 0.9, 1.0]
+
+
+def test_fallback_when_dyntools_fails(monkeypatch, dyntools, legacy, out_file):
+    class BrokenCHNF:
+        def __init__(self, outfile):
+            raise OSError("no se pudo abrir el .out")
+
+    monkeypatch.setattr(readers.dy, "CHNF", BrokenCHNF)
+
+    results = readers.get_channels_data_from_out(out_file, ["ANGL 101"])
+    assert list(results["ANGL 101"][0]) == [0.0, 0.5, 1.0]
+    assert list(results["ANGL 101"][1]) == [5.0, 6.0, 7.0]
@@ -0,0 +1,84 @@
+# The reading processes parse a .out once: their results are sent back unless
+# the GUI process can memory-map them from a valid sidecar
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import readers
+from data_store import DATA_STORE
+from sidecar_cache import SidecarCache
+
+
+class CountingDyntools:
+    # dyntools whose CHNF writes one line per parse to a file shared by the processes
+    def __init__(self, counter_path):
+        counter = counter_path
+
+        class CHNF:
+            def __init__(self, outfile):
+                with open(counter, "a") as f:
+                    f.write(f"{os.getpid()}\n")
+
+            def get_data(self):
+                return "", {1: "VOLT 101", 2: "POWR 101", "time": "Time(s)"}, \
+                    {"time": [0.0, 0.5, 1.0], 1: [1.0, 0.9, 1.0], 2: [10.0, 20.0, 30.0]}
+
+        self.CHNF = CHNF
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("the stand-in dyntools reaches the pool only with fork")
+    out_file = tmp_path / "case.out"
+    out_file.write_bytes(b"no es un .out nativo")
+    counter = tmp_path / "parses.txt"
+    monkeypatch.setattr(readers, "dy", CountingDyntools(str(counter)))
+    pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("fork"))
+    monkeypatch.setattr(readers, "get_process_pool", lambda: pool)
+    DATA_STORE.clear()
+    yield str(out_file), counter
+    pool.shutdown()
+    DATA_STORE.clear()
+
+
+def parses(counter):
+    return counter.read_text().splitlines() if counter.exists() else []
+
+
+@pytest.mark.parametrize("enabled", [False, True], ids=["sin_sidecar", "con_sidecar"])
+def test_out_is_parsed_once(setup, tmp_path, monkeypatch, enabled):
+    out_file, counter = setup
+    monkeypatch.setattr(readers, "SIDECAR_CACHE", SidecarCache(str(tmp_path / "cache"), enabled=enabled))
+    requests = [(out_file, "VOLT 101", None), (out_file, "POWR 101", None)]
+
+    results = readers.read_file_parallel(requests)
+
+    assert sorted(channel for _, channel, _ in results) == ["POWR 101", "VOLT 101"]
+    assert list(results[(out_file, "POWR 101", None)][1]) == [10.0, 20.0, 30.0]
+    assert len(parses(counter)) == 1
+    assert parses(counter)[0] != str(os.getpid())  # leído en el proceso de lectura
+
+
+def test_worker_keeps_results_when_the_sidecar_cannot_be_written(setup, tmp_path, monkeypatch):
+    out_file, counter = setup
+    broken = SidecarCache(str(tmp_path / "cache"))
+    monkeypatch.setattr(broken, "_store", lambda *args: (_ for _ in ()).throw(OSError("disco lleno")))
+    monkeypatch.setattr(readers, "SIDECAR_CACHE", broken)
+
+    results, _ = readers.read_series_in_worker([(out_file, "VOLT 101", None)])
+
+    assert results is not None and (out_file, "VOLT 101", None) in results
+    assert len(parses(counter)) == 1
+
+
+def test_worker_does_not_keep_the_parsed_file(setup, tmp_path, monkeypatch):
+    out_file, counter = setup
+    monkeypatch.setattr(readers, "SIDECAR_CACHE", SidecarCache(str(tmp_path / "cache"), enabled=False))
+
+    results, _ = readers.read_series_in_worker([(out_file, "VOLT 101", None)])
+
+    assert list(results[(out_file, "VOLT 101", None)][1]) == [1.0, 0.9, 1.0]
+    assert not DATA_STORE.is_cached(out_file)
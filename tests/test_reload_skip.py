@@ -0,0 +1,134 @@
+# Reloading skips the lines and series whose files did not change on disk
+import os
+
+import pytest
+
+pytest.importorskip("PyQt5")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PSSE_PSCAD_VIEWER import PlotCanvas, TabLoadContext  # noqa: E402
+from workspace import current_signature  # noqa: E402
+
+
+class Line:
+    pass
+
+
+def make_file(tmp_path, name, text="time,VOLT\n0,1\n"):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def append_row(path):
+    with open(path, "a") as f:
+        f.write("1,0.9\n")
+
+
+def line_of(info):
+    line = Line()
+    line._source_versions = PlotCanvas.source_versions(info)
+    return line
+
+
+def test_unchanged_line_is_current(tmp_path):
+    file = make_file(tmp_path, "a.csv")
+    line = line_of({"file": file, "channel": "VOLT"})
+
+    assert PlotCanvas.line_is_current(line, {})
+    # A line without a recorded version is always reloaded
+    assert not PlotCanvas.line_is_current(Line(), {})
+
+
+def test_changed_or_missing_file_is_reloaded(tmp_path):
+    file = make_file(tmp_path, "a.csv")
+    line = line_of({"file": file, "channel": "VOLT"})
+
+    append_row(file)
+    assert not PlotCanvas.line_is_current(line, {})
+
+    line = line_of({"file": file, "channel": "VOLT"})
+    os.remove(file)
+    assert not PlotCanvas.line_is_current(line, {})
+
+
+def test_files_are_checked_once_per_reload(tmp_path):
+    file = make_file(tmp_path, "a.csv")
+    line = line_of({"file": file, "channel": "VOLT"})
+    current = {}
+    assert PlotCanvas.line_is_current(line, current)
+    assert current == {file: current_signature(file)}
+
+    # The version checked at the start of the reload is the one compared
+    append_row(file)
+    assert PlotCanvas.line_is_current(line, current)
+
+
+def test_derived_line_changes_with_any_input(tmp_path):
+    first = make_file(tmp_path, "a.csv")
+    second = make_file(tmp_path, "b.csv")
+    info = {"expression": "x - y", "inputs": {"x": {"file": first, "channel": "VOLT"},
+                                              "y": {"file": second, "channel": "VOLT", "init_time": 0.5}}}
+    line = line_of(info)
+
+    assert line._source_versions == {first: current_signature(first), second: current_signature(second)}
+    assert PlotCanvas.line_is_current(line, {})
+    append_row(second)
+    assert not PlotCanvas.line_is_current(line, {})
+
+
+def test_workspace_versions_are_compared_with_disk(tmp_path):
+    file = make_file(tmp_path, "a.csv")
+    info = {"file": file, "channel": "VOLT"}
+    request = (file, "VOLT", None)
+    line = Line()
+
+    # Data saved from this version of the file: nothing to reload
+    line._source_versions = PlotCanvas.source_versions(info, {request: current_signature(file)})
+    assert PlotCanvas.line_is_current(line, {})
+
+    # Data saved from an older version of the file
+    line._source_versions = PlotCanvas.source_versions(info, {request: (file, 0, 0)})
+    assert not PlotCanvas.line_is_current(line, {})
+
+
+def test_load_context_forgets_only_changed_files(tmp_path):
+    changed = make_file(tmp_path, "a.csv")
+    kept = make_file(tmp_path, "b.csv")
+    removed = make_file(tmp_path, "c.csv")
+    series = {(changed, "VOLT", None): "a", (kept, "VOLT", None): "b", (removed, "VOLT", None): "c"}
+    context = TabLoadContext(cached_series=series)
+    context.add_prefetched({(changed, "VOLT", 0.5): "a0"})
+
+    append_row(changed)
+    os.remove(removed)
+
+    assert context.forget_changed() == {changed}
+    # A missing file keeps its series, there is nothing newer to read
+    assert sorted(context.cached) == sorted([(kept, "VOLT", None), (removed, "VOLT", None)])
+    assert context.prefetched == {}
+
+
+def test_load_context_forgets_only_the_given_files(tmp_path):
+    first = make_file(tmp_path, "a.csv")
+    second = make_file(tmp_path, "b.csv")
+    context = TabLoadContext(cached_series={(first, "VOLT", None): "a", (second, "VOLT", None): "b"})
+
+    append_row(first)
+    append_row(second)
+
+    assert context.forget_changed([second]) == {second}
+    assert list(context.cached) == [(first, "VOLT", None)]
+
+
+def test_load_context_uses_snapshot_versions(tmp_path):
+    file = make_file(tmp_path, "a.csv")
+    request = (file, "VOLT", None)
+
+    context = TabLoadContext(cached_series={request: "a"}, signatures={request: current_signature(file)})
+    assert context.forget_changed() == set()
+
+    # Snapshot of an older version of the file
+    context = TabLoadContext(cached_series={request: "a"}, signatures={request: (file, 0, 0)})
+    assert context.forget_changed() == {file}
+    assert context.cached == {}
@@ -0,0 +1,90 @@
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+from sidecar_cache import SidecarCache
+
+
+def write_source(path, middle):
+    # Same header, length and last row; only the middle rows differ
+    path.write_text("time,a\n0,1\n1,%d\n2,3\n" % middle)
+
+
+def test_cached_channels_are_memory_mapped(tmp_path):
+    source = tmp_path / "case.csv"
+    write_source(source, 5)
+    cache = SidecarCache(str(tmp_path / "cache"))
+    cache.store(str(source), np.array([0.0, 1.0, 2.0]), {"a": np.array([1.0, 5.0, 3.0])})
+
+    assert cache.has_channels(str(source), ["a"])
+    data = cache.load(str(source))
+    assert data.mapped
+    np.testing.assert_array_equal(data.get("a")[1], [1.0, 5.0, 3.0])
+
+
+def test_changed_mtime_is_a_miss_even_with_same_size_and_edges(tmp_path):
+    source = tmp_path / "case.csv"
+    write_source(source, 5)
+    cache = SidecarCache(str(tmp_path / "cache"))
+    cache.store(str(source), np.array([0.0, 1.0, 2.0]), {"a": np.array([1.0, 5.0, 3.0])})
+
+    st = os.stat(source)
+    write_source(source, 7)  # nueva simulación, mismo tamaño
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+    assert cache.load(str(source)) is None
+    assert not cache.has_channels(str(source), ["a"])
+
+
+def test_float32_data_is_stored_as_float32(tmp_path):
+    source = tmp_path / "case.out"
+    source.write_bytes(b"x" * 64)
+    cache = SidecarCache(str(tmp_path / "cache"))
+    time = np.linspace(0.0, 1.0, 1000, dtype=np.float32)
+    cache.store(str(source), time, {"VOLT 101": np.ones(1000, dtype=np.float32)})
+
+    data = cache.load(str(source))
+    assert data.time.dtype == np.float32
+    assert data.get("VOLT 101")[1].dtype == np.float32
+    bins = [name for name in os.listdir(tmp_path / "cache") if name.endswith(".bin")]
+    assert os.path.getsize(tmp_path / "cache" / bins[0]) == 2 * 1000 * 4
+
+
+def store_sources(cache_dir, sources, worker):
+    # Every process stores the same sources, each with some channels of its own
+    cache = SidecarCache(cache_dir)
+    for source in sources:
+        time = np.arange(500, dtype=float)
+        channels = {name: np.full(len(time), hash((source, name)) % 1000, dtype=float)
+                    for name in ("common", f"w{worker}", f"w{(worker + 1) % 4}")}
+        cache.store(source, time, channels)
+
+
+def test_concurrent_writers_keep_every_channel_intact(tmp_path):
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("the writers are forked from the test process")
+    sources = []
+    for i in range(40):
+        source = tmp_path / f"case{i}.csv"
+        source.write_text(f"time,a\n{i},0\n")
+        sources.append(str(source))
+    cache_dir = str(tmp_path / "cache")
+
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=store_sources, args=(cache_dir, sources, worker)) for worker in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+
+    cache = SidecarCache(cache_dir)
+    for source in sources:
+        data = cache.load(source)
+        assert sorted(data.channels) == ["common", "w0", "w1", "w2", "w3"]
+        np.testing.assert_array_equal(data.time, np.arange(500))
+        for name, values in data.channels.items():
+            np.testing.assert_array_equal(values, np.full(500, hash((source, name)) % 1000))
+    assert not [name for name in os.listdir(cache_dir) if name.endswith(".tmp")]
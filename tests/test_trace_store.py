@@ -0,0 +1,63 @@
+# Reference-counted store of the plotted series
+import numpy as np
+
+from trace_store import TraceStore
+
+
+def make_file(tmp_path, text="time,a,b\n0,1,2\n"):
+    path = tmp_path / "case.csv"
+    path.write_text(text)
+    return str(path)
+
+
+def test_series_shown_twice_is_stored_once(tmp_path):
+    file = make_file(tmp_path)
+    store = TraceStore()
+    time, values = np.arange(5.0), np.ones(5)
+
+    first = store.acquire((file, "a", None), time, values)
+    second = store.acquire((file, "a", None), time.copy(), values.copy())
+
+    assert first[0] is second[0] and first[1] is second[1]
+    assert not first[1].flags.writeable
+    assert (store.hits, store.misses) == (1, 1)
+    store.release((file, "a", None))
+    assert len(store) == 1
+    store.release((file, "a", None))
+    assert len(store) == 0
+
+
+def test_channels_of_a_file_share_the_time_vector(tmp_path):
+    file = make_file(tmp_path)
+    store = TraceStore()
+    time = np.arange(5.0)
+
+    time_a, _ = store.acquire((file, "a", None), time, np.ones(5))
+    time_b, _ = store.acquire((file, "b", None), time.copy(), np.zeros(5))
+
+    assert time_a is time_b
+    assert store.memory_used() == 3 * 5 * 8
+
+
+def test_new_version_of_the_file_replaces_the_series(tmp_path):
+    file = make_file(tmp_path)
+    store = TraceStore()
+    store.acquire((file, "a", None), np.arange(5.0), np.ones(5))
+
+    make_file(tmp_path, "time,a,b\n0,1,2\n1,3,4\n")
+    time, values = store.acquire((file, "a", None), np.arange(6.0), np.full(6, 2.0))
+
+    np.testing.assert_array_equal(values, np.full(6, 2.0))
+    store.release((file, "a", None))
+    assert len(store) == 1  # los dos usuarios liberan el mismo pedido
+    store.release_file(file)
+    assert len(store) == 0 and store.memory_used() == 0
+
+
+def test_float32_values_keep_float64_time(tmp_path):
+    file = make_file(tmp_path)
+    store = TraceStore(float32=True)
+
+    time, values = store.acquire((file, "a", None), np.arange(5.0), np.ones(5))
+
+    assert time.dtype == np.float64 and values.dtype == np.float32
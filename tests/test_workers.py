@@ -0,0 +1,33 @@
+# The process pool is created once even when the loader threads ask for it together
+import threading
+import time
+
+import workers
+
+
+class SlowPool:
+    created = 0
+
+    def __init__(self, max_workers):
+        SlowPool.created += 1
+        time.sleep(0.05)
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def test_concurrent_requests_share_one_pool(monkeypatch):
+    monkeypatch.setattr(workers, "ProcessPoolExecutor", SlowPool)
+    monkeypatch.setattr(workers, "_pool", None)
+    SlowPool.created = 0
+    pools = []
+    threads = [threading.Thread(target=lambda: pools.append(workers.get_process_pool())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert SlowPool.created == 1
+    assert all(pool is pools[0] for pool in pools)
+    workers.reset_process_pool()
+    assert workers._pool is None
@@ -0,0 +1,70 @@
+# Workspace files: template plus a snapshot of the plotted series
+import zipfile
+
+import numpy as np
+import pytest
+
+from workspace import WorkspaceError, current_signature, open_workspace, save_workspace
+
+
+TEMPLATE = {"tabs": [{"name": "P", "plots": [{"title": "P", "lines": [
+    {"file": "a.csv", "channel": "P", "label": "P"}]}]}], "files": {"psse": [], "pscad": ["a.csv"]}}
+
+
+def snapshot(tmp_path):
+    source = tmp_path / "a.csv"
+    source.write_text("time,P,Q\n0,1,2\n")
+    time = np.linspace(0.0, 1.0, 1000)
+    series = {(str(source), "P", None): (time, np.sin(time)),
+              (str(source), "Q", 0.5): (time, np.cos(time).astype(np.float32))}
+    signatures = {request: current_signature(str(source)) for request in series}
+    return series, signatures
+
+
+@pytest.mark.parametrize("compress", [False, True], ids=["mapeado", "comprimido"])
+def test_round_trip(tmp_path, compress):
+    series, signatures = snapshot(tmp_path)
+    path = str(tmp_path / "study.vws")
+
+    assert save_workspace(path, TEMPLATE, series, signatures, compress) == 2
+    workspace = open_workspace(path)
+
+    assert workspace.template == TEMPLATE
+    assert workspace.signatures == signatures
+    assert set(workspace.series) == set(series)
+    for request, (time, values) in series.items():
+        np.testing.assert_array_equal(workspace.series[request][0], time)
+        np.testing.assert_array_equal(workspace.series[request][1], values)
+        assert workspace.series[request][1].dtype == values.dtype
+        assert isinstance(workspace.series[request][1], np.memmap) != compress
+
+
+def test_shared_time_vector_is_stored_once(tmp_path):
+    series, signatures = snapshot(tmp_path)
+    path = str(tmp_path / "study.vws")
+    save_workspace(path, TEMPLATE, series, signatures)
+
+    with zipfile.ZipFile(path) as zf:
+        assert len([name for name in zf.namelist() if name.endswith(".npy")]) == 3
+
+
+def test_failed_save_keeps_the_old_workspace(tmp_path):
+    series, signatures = snapshot(tmp_path)
+    path = str(tmp_path / "study.vws")
+    save_workspace(path, TEMPLATE, series, signatures)
+
+    broken = dict(series)
+    broken[("b.csv", "P", None)] = (np.arange(3.0), np.array([object()], dtype=object))
+    with pytest.raises(ValueError):
+        save_workspace(path, {"tabs": []}, broken, signatures)
+
+    assert open_workspace(path).template == TEMPLATE
+    assert not (tmp_path / "study.vws.tmp").exists()
+
+
+def test_invalid_file_is_reported(tmp_path):
+    path = tmp_path / "study.vws"
+    path.write_bytes(b"no es un zip")
+
+    with pytest.raises(WorkspaceError):
+        open_workspace(str(path))
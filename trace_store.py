@@ -0,0 +1,126 @@
+# Shared store of the series shown in the plots
+# A (file, channel, init_time) series is kept once as read-only arrays, no
+# matter how many plots or tabs show it, and the channels of one file share
+# their time vector. Plots acquire a series when they draw a line and release
+# it when the line goes away; the arrays are dropped with the last user.
+# With VIEWER_FLOAT32=1 the values are kept in float32 (time stays float64).
+import os
+import threading
+
+import numpy as np
+
+from data_store import file_signature
+
+
+FLOAT32_DEFAULT = os.environ.get("VIEWER_FLOAT32", "") not in ("", "0")
+
+
+def _is_mapped(arr):
+    # True if arr is backed by a memory-mapped file (sidecar cache)
+    while arr is not None:
+        if isinstance(arr, np.memmap):
+            return True
+        arr = getattr(arr, 'base', None)
+        if not isinstance(arr, np.ndarray):
+            return False
+    return False
+
+
+def _shared(values, dtype):
+    # Read-only array of dtype, without copying when possible
+    arr = np.asarray(values)
+    if arr.dtype != dtype and not (_is_mapped(arr) and arr.dtype.kind == 'f'):
+        arr = arr.astype(dtype)  # los mapeados quedan en disco, convertirlos ocuparía RAM
+    else:
+        arr = arr.view(np.ndarray)
+    arr.setflags(write=False)
+    return arr
+
+
+class TraceStore:
+    def __init__(self, float32=FLOAT32_DEFAULT):
+        self.float32 = float32
+        self._traces = {}  # (archivo, canal, init_time) -> [firma, tiempo, valores, usuarios]
+        self._times = {}  # (archivo, init_time, firma) -> vector de tiempo compartido
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, request, time, values, signature=None):
+        ## Used for get the shared (time, values) of a series and count one more user
+        ## time and values are the arrays just read, they are dropped when the
+        ## store already holds the same version of the series
+        ## signature: version of the file the arrays come from, the current one
+        ## by default (the snapshot of a workspace passes the saved one)
+        if signature is None:
+            try:
+                signature = file_signature(request[0])
+            except OSError:
+                signature = None
+        with self._lock:
+            entry = self._traces.get(request)
+            if entry is not None and signature is not None and entry[0] == signature:
+                entry[3] += 1
+                self.hits += 1
+                return entry[1], entry[2]
+            self.misses += 1
+            time_key = (request[0], request[2], signature)
+            shared_time = self._times.get(time_key)
+            if shared_time is None or len(shared_time) != len(time) or signature is None:
+                shared_time = _shared(time, np.float64)
+                self._times[time_key] = shared_time
+            shared_values = _shared(values, np.float32 if self.float32 else np.float64)
+            # A new version of the file keeps counting the users of the old one,
+            # they release the same request when they are reloaded or removed
+            users = entry[3] + 1 if entry is not None else 1
+            self._traces[request] = [signature, shared_time, shared_values, users]
+            if entry is not None:
+                self._drop_unused_times(request[0])
+            return shared_time, shared_values
+
+    def signature(self, request):
+        ## Used for the version of the file a shared series was read from
+        with self._lock:
+            entry = self._traces.get(request)
+            return entry[0] if entry is not None else None
+
+    def release(self, request):
+        ## Used for count one user less of a series, dropped with the last one
+        with self._lock:
+            entry = self._traces.get(request)
+            if entry is None:
+                return
+            entry[3] -= 1
+            if entry[3] <= 0:
+                del self._traces[request]
+                self._drop_unused_times(request[0])
+
+    def release_file(self, filepath):
+        ## Used for forget every series of a file removed from the viewer
+        with self._lock:
+            for request in [request for request in self._traces if request[0] == filepath]:
+                del self._traces[request]
+            self._drop_unused_times(filepath)
+
+    def _drop_unused_times(self, filepath):
+        used = {id(entry[1]) for request, entry in self._traces.items() if request[0] == filepath}
+        for key in [key for key, time in self._times.items() if key[0] == filepath and id(time) not in used]:
+            del self._times[key]
+
+    def __len__(self):
+        return len(self._traces)
+
+    def memory_used(self):
+        ## Used for the bytes held in RAM (memory-mapped arrays do not count)
+        with self._lock:
+            arrays = {id(arr): arr for entry in self._traces.values() for arr in entry[1:3]}
+        return sum(arr.nbytes for arr in arrays.values() if not _is_mapped(arr))
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+            self._times.clear()
+
+
+# Store shared by the whole application
+TRACE_STORE = TraceStore()
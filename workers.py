@@ -0,0 +1,30 @@
+# Process pool shared by the parallel readers
+# Sized to the machine; created on first use and shut down at exit
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+_pool = None
+_pool_lock = threading.Lock()  # los hilos de carga piden el pool a la vez
+
+
+def get_process_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return _pool
+
+
+def reset_process_pool():
+    # A broken pool (a worker died) is replaced on the next request
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(reset_process_pool)
@@ -0,0 +1,118 @@
+# Workspace files: a template plus a snapshot of the plotted series
+# A workspace is a zip with "workspace.json" (the template, the series and the
+# version of the source file each one was read from) and one .npy entry per
+# array. Time vectors shared by several channels are stored once. Arrays are
+# stored uncompressed by default so opening memory-maps them straight from the
+# zip: the tabs are restored without reading the source files, which may have
+# moved or be on a slow network share. Compressed workspaces are smaller but
+# their arrays are read into memory when opened.
+import json
+import os
+import struct
+import zipfile
+from collections import namedtuple
+
+import numpy as np
+
+from data_store import file_signature
+
+
+WORKSPACE_VERSION = 1
+WORKSPACE_FILTER = "Espacio de trabajo (*.vws)"
+INDEX_NAME = "workspace.json"
+_LOCAL_HEADER = struct.Struct("<4s5H3L2H")  # cabecera local de una entrada zip
+
+Workspace = namedtuple("Workspace", ["template", "series", "signatures"])
+
+
+class WorkspaceError(ValueError):
+    pass
+
+
+def _signature(value):
+    # JSON turns the (path, mtime_ns, size) tuples into lists
+    return tuple(value) if value is not None else None
+
+
+def current_signature(filepath):
+    try:
+        return file_signature(filepath)
+    except OSError:
+        return None  # archivo movido o borrado
+
+
+def save_workspace(path, template_data, series, signatures, compress=False):
+    ## Used for write a workspace with the template and the series it plots
+    ## series: {(file, channel, init_time): (time, values)}
+    ## signatures: {(file, channel, init_time): file_signature of the data}
+    arrays = {}  # id -> (nombre, arreglo), los vectores de tiempo compartidos una vez
+    entries = []
+    for (file, channel, init_time), (time, values) in series.items():
+        names = []
+        for arr in (time, values):
+            if id(arr) not in arrays:
+                arrays[id(arr)] = (f"arrays/{len(arrays)}.npy", arr)
+            names.append(arrays[id(arr)][0])
+        entries.append({"file": file, "channel": channel, "init_time": init_time, "time": names[0],
+                        "values": names[1], "signature": signatures.get((file, channel, init_time))})
+    index = {"version": WORKSPACE_VERSION, "template": template_data, "series": entries}
+
+    # Written next to the target and renamed, an interrupted save keeps the old file
+    tmp_path = path + ".tmp"
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    try:
+        with zipfile.ZipFile(tmp_path, "w", compression) as zf:
+            zf.writestr(INDEX_NAME, json.dumps(index, indent=2), zipfile.ZIP_DEFLATED)
+            for name, arr in arrays.values():
+                with zf.open(name, "w", force_zip64=True) as f:
+                    np.lib.format.write_array(f, np.ascontiguousarray(arr), allow_pickle=False)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return len(entries)
+
+
+def _map_entry(path, f, info):
+    # Memory-map an uncompressed .npy entry in place: its data starts after
+    # the local header of the entry and the .npy header
+    f.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(f.read(_LOCAL_HEADER.size))
+    f.seek(info.header_offset + _LOCAL_HEADER.size + header[9] + header[10])
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+    else:
+        shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+    if not shape or 0 in shape:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape, order="F" if fortran else "C")
+
+
+def open_workspace(path):
+    ## Used for read a workspace: returns Workspace(template, series, signatures)
+    ## with the arrays memory-mapped (read into memory if compressed)
+    try:
+        with zipfile.ZipFile(path, "r") as zf, open(path, "rb") as f:
+            index = json.loads(zf.read(INDEX_NAME).decode("utf-8"))
+            if index.get("version") != WORKSPACE_VERSION:
+                raise WorkspaceError(f"Versión {index.get('version')} de espacio de trabajo no soportada")
+            arrays = {}
+            series = {}
+            signatures = {}
+            for entry in index["series"]:
+                for name in (entry["time"], entry["values"]):
+                    if name not in arrays:
+                        info = zf.getinfo(name)
+                        if info.compress_type == zipfile.ZIP_STORED:
+                            arrays[name] = _map_entry(path, f, info)
+                        else:
+                            with zf.open(info) as data:
+                                arrays[name] = np.lib.format.read_array(data, allow_pickle=False)
+                request = (entry["file"], entry["channel"], entry["init_time"])
+                series[request] = (arrays[entry["time"]], arrays[entry["values"]])
+                signatures[request] = _signature(entry.get("signature"))
+    except (KeyError, zipfile.BadZipFile, json.JSONDecodeError) as e:
+        raise WorkspaceError(f"{os.path.basename(path)} no es un espacio de trabajo válido: {e}")
+    return Workspace(index["template"], series, signatures)
+